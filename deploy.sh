@@ -25,6 +25,11 @@ docker-compose exec app python manage.py migrate
 echo "Cargando datos iniciales (fixtures)..."
 docker-compose exec app python manage.py loaddata initial_data
 
+# 6. Reconstruir el modelo de lectura de libros (loaddata y las tablas que ya
+#    tenían datos antes de la migración 0005 no pasan por los servicios)
+echo "Reconstruyendo el listado de libros..."
+docker-compose exec app python manage.py rebuild_libro_listado
+
 echo ""
 echo "¡Despliegue completado!"
 echo "Tu aplicación está corriendo en http://localhost:8000"
@@ -1,8 +1,24 @@
 # src/catalog/admin.py
 
 from django.contrib import admin
+from django.db import transaction
+from core.pagination import EstimatedCountPaginator
+from . import coauthors, events, read_model, services, similar_books
 from .models import Autor, Libro
 
+
+def _record_save(entity: str, obj, form, change: bool):
+    """
+    Publica el evento de cambio de un alta o edición desde el admin, como
+    los servicios: los campos del formulario que cambiaron (una edición
+    sin cambios no publica nada).
+    """
+    if change and not form.changed_data:
+        return
+    events.record(entity, obj.pk, events.UPDATE if change else events.CREATE, form.changed_data,
+                  events.version_of(obj.updated_at))
+
+
 @admin.register(Autor)
 class AutorAdmin(admin.ModelAdmin):
     """
@@ -10,6 +26,29 @@ class AutorAdmin(admin.ModelAdmin):
     """
     list_display = ('first_name', 'last_name', 'birth_date')
     search_fields = ('first_name', 'last_name')
+    # Sin COUNT(*) en catálogos grandes: total estimado y sin el "N en total"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # Las ediciones del admin no pasan por los servicios: mantengo el
+    # modelo de lectura, el grafo de co-autoría, los similares y los
+    # eventos de cambio aquí
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change:
+            similar_books.mark_dirty(read_model.update_autor(obj))
+            coauthors.mark_dirty([obj.pk])
+        _record_save('autor', obj, form, change)
+
+    # Los borrados sí: services.delete_autor deja el registro del borrado
+    # para el feed de cambios y marca como modificados sus libros
+    def delete_model(self, request, obj):
+        services.delete_autor(autor=obj)
+
+    @transaction.atomic
+    def delete_queryset(self, request, queryset):
+        for autor in queryset:
+            services.delete_autor(autor=autor)
 
 
 @admin.register(Libro)
@@ -19,4 +58,23 @@ class LibroAdmin(admin.ModelAdmin):
     """
     list_display = ('title', 'isbn', 'publication_date')
     search_fields = ('title', 'isbn')
-    filter_horizontal = ('autores',)
\ No newline at end of file
+    filter_horizontal = ('autores',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def save_related(self, request, form, formsets, change):
+        # Después de guardar los autores (M2M) del libro
+        old_ids = set(form.instance.autores.values_list('pk', flat=True)) if change else set()
+        super().save_related(request, form, formsets, change)
+        read_model.refresh_libros([form.instance.pk])
+        coauthors.mark_dirty(old_ids ^ set(form.instance.autores.values_list('pk', flat=True)))
+        similar_books.mark_dirty([form.instance.pk])
+        _record_save('libro', form.instance, form, change)
+
+    def delete_model(self, request, obj):
+        services.delete_libro(libro=obj)
+
+    @transaction.atomic
+    def delete_queryset(self, request, queryset):
+        for libro in queryset.prefetch_related('autores'):
+            services.delete_libro(libro=libro)
@@ -0,0 +1,273 @@
+# src/catalog/author_dedup.py
+
+import itertools
+import json
+import re
+import unicodedata
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import F
+from django.utils import timezone
+
+from . import caching, services
+from .models import Autor
+
+# Últimas propuestas de fusión, para revisarlas antes de aplicarlas
+PROPOSALS_PATH = 'author_dedup/proposals.json'
+
+# Similitud de dos nombres de pila cuando uno es solo iniciales ("J. R. R.")
+# y coinciden con las del otro ("John Ronald Reuel"), todas o las primeras
+INITIALS_SCORE = 0.95
+INITIALS_PREFIX_SCORE = 0.85
+# Cuando todas las palabras de uno están en el otro ("John" / "John Ronald")
+TOKEN_SUBSET_SCORE = 0.9
+
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+
+class Candidate(NamedTuple):
+    id: uuid.UUID
+    first_name: str
+    last_name: str
+    # Nombre de pila normalizado
+    name: str
+
+
+def _conf(name):
+    return settings.AUTHOR_DEDUP[name]
+
+
+def normalize(name: str) -> str:
+    """
+    Nombre en minúsculas, sin tildes ni puntuación y con un espacio entre
+    palabras ("J.R.R." -> "j r r").
+    """
+    name = unicodedata.normalize('NFKD', name.lower()).encode('ascii', 'ignore').decode()
+    return _NON_ALNUM_RE.sub(' ', name).strip()
+
+
+# --- Bloques de candidatos ---
+
+def blocks(max_size: int) -> Iterator[List[Candidate]]:
+    """
+    Bloques de candidatos a duplicado: autores con el mismo apellido
+    normalizado y la misma fecha de nacimiento (los que no la tienen se
+    agrupan entre sí). Solo se comparan autores de un mismo bloque, así que
+    el coste crece con el tamaño de los bloques y no con el del catálogo.
+
+    Se recorre la tabla una vez ordenada por fecha (índice) y en memoria
+    solo están los autores de una fecha. Un bloque de más de 'max_size'
+    autores se parte por la inicial del nombre y, si aún lo supera, en
+    trozos consecutivos por orden alfabético.
+    """
+    queryset = (
+        Autor.objects.order_by(F('birth_date').asc(nulls_last=True))
+        .values_list('pk', 'first_name', 'last_name', 'birth_date')
+    )
+    rows = queryset.iterator(chunk_size=_conf('CHUNK_SIZE'))
+    for _, same_date in itertools.groupby(rows, key=lambda row: row[3]):
+        by_last_name = defaultdict(list)
+        for pk, first_name, last_name, _ in same_date:
+            candidate = Candidate(pk, first_name, last_name, normalize(first_name))
+            by_last_name[normalize(last_name).replace(' ', '')].append(candidate)
+        for block in by_last_name.values():
+            yield from _split(block, max_size)
+
+
+def _split(block: List[Candidate], max_size: int) -> Iterator[List[Candidate]]:
+    if len(block) <= max_size:
+        if len(block) > 1:
+            yield block
+        return
+    by_initial = defaultdict(list)
+    for candidate in block:
+        by_initial[candidate.name[:1]].append(candidate)
+    for group in by_initial.values():
+        group.sort(key=lambda candidate: candidate.name)
+        for start in range(0, len(group), max_size):
+            chunk = group[start:start + max_size]
+            if len(chunk) > 1:
+                yield chunk
+
+
+# --- Similitud ---
+
+def _trigrams(name: str) -> List[str]:
+    padded = f' {name} '
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _incidence(items: List[List[str]]) -> np.ndarray:
+    # Matriz (elementos x vocabulario) con cuántas veces aparece cada término
+    vocabulary: Dict[str, int] = {}
+    rows, cols = [], []
+    for row, terms in enumerate(items):
+        for term in terms:
+            rows.append(row)
+            cols.append(vocabulary.setdefault(term, len(vocabulary)))
+    counts = np.zeros((len(items), max(len(vocabulary), 1)), dtype=np.float32)
+    np.add.at(counts, (rows, cols), 1)
+    return counts
+
+
+def similarity(names: List[str]) -> np.ndarray:
+    """
+    Matriz de similitud (0 a 1) entre nombres de pila normalizados, la
+    mayor de: coseno de sus trigramas de caracteres, que todas las
+    palabras de uno estén en el otro, o que uno sea solo iniciales y
+    coincidan con las del otro. Un bloque entero se calcula con unas
+    pocas operaciones de matrices, sin comparar pares en Python.
+    """
+    counts = _incidence([_trigrams(name) for name in names])
+    norms = np.linalg.norm(counts, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    vectors = counts / norms
+    scores = vectors @ vectors.T
+
+    tokens = [name.split() for name in names]
+    present = _incidence([sorted(set(words)) for words in tokens])
+    sizes = present.sum(axis=1)
+    smaller = np.minimum(sizes[:, None], sizes[None, :])
+    subset = (present @ present.T == smaller) & (smaller > 0)
+    scores = np.maximum(scores, np.where(subset, TOKEN_SUBSET_SCORE, 0))
+
+    initials = np.array([''.join(word[0] for word in words) for words in tokens])
+    only_initials = np.array([bool(words) and all(len(word) == 1 for word in words) for words in tokens])
+    has_initials = initials != ''
+    comparable = (only_initials[:, None] | only_initials[None, :]) & has_initials[:, None] & has_initials[None, :]
+    equal = initials[:, None] == initials[None, :]
+    prefix = np.strings.startswith(initials[:, None], initials[None, :])
+    prefix |= prefix.T
+    scores = np.maximum(scores, np.where(comparable & prefix, INITIALS_PREFIX_SCORE, 0))
+    scores = np.maximum(scores, np.where(comparable & equal, INITIALS_SCORE, 0))
+    return scores
+
+
+def _proposals(block: List[Candidate], scores: np.ndarray, min_score: float) -> Tuple[List[Dict], List[Dict]]:
+    # Los pares parecidos se unen en grupos (union-find), pero un grupo no se
+    # fusiona entero: una cadena "John" ~ "J." ~ "Jane" uniría a personas
+    # distintas. Cada propuesta se arma alrededor de un autor (el de nombre
+    # más completo, o el más antiguo, UUIDv7) con los que se le parecen a él
+    parent = list(range(len(block)))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in np.argwhere(np.triu(scores >= min_score, k=1)).tolist():
+        parent[root(i)] = root(j)
+
+    groups = defaultdict(list)
+    for i in range(len(block)):
+        groups[root(i)].append(i)
+
+    proposals, ambiguous = [], []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        remaining = sorted(members, key=lambda i: (-len(block[i].name), block[i].id))
+        unclear = set()
+        while len(remaining) > 1:
+            target, rest = remaining[0], remaining[1:]
+            candidates = [i for i in rest if scores[target, i] >= min_score]
+            outside = [j for j in members if j != target and j not in candidates]
+            # Ambiguo: se parece tanto o más a alguien de fuera de la propuesta
+            unclear |= {i for i in candidates if any(scores[i, j] >= scores[i, target] for j in outside)}
+            duplicates = [i for i in candidates if i not in unclear]
+            if duplicates:
+                proposals.append({
+                    'target': _describe(block[target]),
+                    'duplicates': [
+                        {**_describe(block[i]), 'score': round(float(scores[target, i]), 3)} for i in duplicates
+                    ],
+                })
+            # Un ambiguo no se fusiona ni recibe fusiones: queda para revisar a mano
+            remaining = [i for i in rest if i not in duplicates and i not in unclear]
+
+        for i in sorted(unclear, key=lambda i: block[i].id):
+            ambiguous.append({
+                **_describe(block[i]),
+                'matches': [
+                    {**_describe(block[j]), 'score': round(float(scores[i, j]), 3)}
+                    for j in members if j != i and scores[i, j] >= min_score
+                ],
+            })
+    return proposals, ambiguous
+
+
+def _describe(candidate: Candidate) -> Dict[str, str]:
+    return {'id': str(candidate.id), 'name': f'{candidate.last_name}, {candidate.first_name}'}
+
+
+# --- Job ---
+
+def find_duplicates(*, min_score: Optional[float] = None, max_block_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Busca autores duplicados y devuelve las propuestas de fusión, los
+    autores ambiguos (se parecen a más de un autor distinto: no se
+    proponen, hay que revisarlos a mano) y cuántos bloques y pares se
+    compararon.
+    """
+    min_score = _conf('MIN_SCORE') if min_score is None else min_score
+    max_block_size = max_block_size or _conf('MAX_BLOCK_SIZE')
+
+    result = {'blocks': 0, 'comparisons': 0, 'proposals': [], 'ambiguous': []}
+    for block in blocks(max_block_size):
+        result['blocks'] += 1
+        result['comparisons'] += len(block) * (len(block) - 1) // 2
+        proposals, ambiguous = _proposals(block, similarity([candidate.name for candidate in block]), min_score)
+        result['proposals'] += proposals
+        result['ambiguous'] += ambiguous
+    return result
+
+
+def run(*, min_score: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Busca duplicados y guarda las propuestas en el storage (PROPOSALS_PATH),
+    reemplazando las anteriores. No fusiona nada.
+    """
+    result = find_duplicates(min_score=min_score)
+    content = json.dumps({'generated_at': timezone.now().isoformat(), **result}, ensure_ascii=False, indent=2)
+    if default_storage.exists(PROPOSALS_PATH):
+        default_storage.delete(PROPOSALS_PATH)
+    default_storage.save(PROPOSALS_PATH, ContentFile(content.encode('utf-8')))
+    return result
+
+
+def load_proposals() -> List[Dict[str, Any]]:
+    """
+    Propuestas de la última búsqueda (vacío si nunca se ejecutó).
+    """
+    if not default_storage.exists(PROPOSALS_PATH):
+        return []
+    with default_storage.open(PROPOSALS_PATH, 'rb') as f:
+        return json.loads(f.read())['proposals']
+
+
+def merge(proposal: Dict[str, Any]) -> List[uuid.UUID]:
+    """
+    Aplica una propuesta: fusiona sus duplicados en el autor elegido (los
+    que ya no existen se ignoran) e invalida el caché. Devuelve los libros
+    que cambiaron de autor.
+    """
+    duplicate_ids = [duplicate['id'] for duplicate in proposal['duplicates']]
+    autores = {
+        str(autor.pk): autor
+        for autor in services.get_autores_by_ids(ids=[proposal['target']['id']] + duplicate_ids)
+    }
+    target = autores.get(proposal['target']['id'])
+    duplicates = [autores[autor_id] for autor_id in duplicate_ids if autor_id in autores]
+    if target is None or not duplicates:
+        return []
+
+    libro_ids = services.merge_autores(target=target, duplicates=duplicates)
+    caching.invalidate_autor_merge(target, duplicates, libro_ids)
+    return libro_ids
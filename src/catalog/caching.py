@@ -0,0 +1,493 @@
+# src/catalog/caching.py
+
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import QueryDict
+from django.utils.dateparse import parse_date
+from django_redis import get_redis_connection
+from core.tiered_cache import TieredCache
+
+# Namespaces de los listados cacheados (prefijo de la clave de caché)
+AUTORES_LIST = 'autores_list'
+LIBROS_LIST = 'libros_list'
+
+# Namespaces de los detalles cacheados (datos ya serializados)
+AUTOR_DETAIL = 'autor_detail'
+LIBRO_DETAIL = 'libro_detail'
+
+# Namespaces de los fragmentos JSON por objeto de los listados
+AUTOR_FRAGMENT = 'autor_fragment'
+LIBRO_FRAGMENT = 'libro_fragment'
+
+# Un rango de fechas más amplio que esto se etiqueta como "sin filtro"
+MAX_YEAR_TAGS = 50
+
+_tiered = None
+
+# Peticiones a cada consulta contadas en el proceso y aún no sumadas al
+# ranking de Redis: {namespace: Counter(query_string)}
+_pending_hits = defaultdict(Counter)
+_hits_lock = threading.Lock()
+_hits_last_flush = time.monotonic()
+
+
+def _conf(name):
+    return settings.LIST_CACHE[name]
+
+
+def _redis():
+    return get_redis_connection('default')
+
+
+def _cache() -> TieredCache:
+    # L1 en memoria del worker delante de Redis (ver core/tiered_cache.py)
+    global _tiered
+    if _tiered is None:
+        _tiered = TieredCache('catalog')
+    return _tiered
+
+
+def _hits_key(namespace: str) -> str:
+    return f'list_cache_hits:{namespace}'
+
+
+def _generation_key(namespace: str) -> str:
+    return f'list_cache_gen:{namespace}'
+
+
+def _tag_key(tag: str) -> str:
+    return f'list_cache_tag:{tag}'
+
+
+def list_cache_key(namespace: str, query_string: str) -> str:
+    return f'{namespace}_{query_string}'
+
+
+# --- Etiquetas ---
+#
+# Cada entrada cacheada se registra en un SET de Redis por etiqueta, y una
+# escritura borra solo las entradas de las etiquetas que afecta:
+#
+# - 'autor:{id}' / 'libro:{id}': la entrada contiene esa fila (listados de
+#   autores y de libros respectivamente). 'libro_autor:{id}': la entrada
+#   muestra ese autor anidado en un libro.
+# - Etiquetas de entrada ('libros:isbn:..', 'libros:autor:..', 'libros:year:..',
+#   'libros:all', y las equivalentes de autores): una condición necesaria para
+#   que una fila NUEVA (o que cambió) entre en el listado, derivada de su
+#   filtro más selectivo. Así un libro creado después de cachear el listado
+#   lo invalida, aunque la entrada no pudiera conocer su ID.
+# - 'libros:search': listados de libros con búsqueda, que pueden cambiar
+#   cuando se renombra un autor (se busca también por su nombre).
+
+def _uuid_or_none(value):
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _year_tags(params: QueryDict):
+    exact = parse_date(params.get('publication_date') or '')
+    if exact:
+        return {f'libros:year:{exact.year}'}
+    gte = parse_date(params.get('publication_date__gte') or '')
+    lte = parse_date(params.get('publication_date__lte') or '')
+    if gte and lte and lte.year - gte.year < MAX_YEAR_TAGS:
+        return {f'libros:year:{year}' for year in range(gte.year, lte.year + 1)}
+    return None
+
+
+def _entry_tags(namespace: str, query_string: str) -> set:
+    params = QueryDict(query_string)
+    if namespace == AUTORES_LIST:
+        birth_date = parse_date(params.get('birth_date') or '')
+        if params.get('last_name'):
+            return {f"autores:last_name:{params['last_name']}"}
+        if birth_date:
+            return {f'autores:birth_date:{birth_date.isoformat()}'}
+        return {'autores:all'}
+
+    tags = {'libros:search'} if params.get('search') else set()
+    autor_id = _uuid_or_none(params.get('autores__id'))
+    if params.get('isbn'):
+        tags.add(f"libros:isbn:{params['isbn']}")
+    elif autor_id:
+        tags.add(f'libros:autor:{autor_id}')
+    else:
+        tags |= _year_tags(params) or {'libros:all'}
+    return tags
+
+
+def _item_tags(namespace: str, entries) -> set:
+    # 'entries' son services.ListEntry: IDs y autores anidados, sin consultas
+    if namespace == AUTORES_LIST:
+        return {f'autor:{entry.pk}' for entry in entries}
+    tags = set()
+    for entry in entries:
+        tags.add(f'libro:{entry.pk}')
+        tags.update(f'libro_autor:{autor_id}' for autor_id in entry.autor_ids)
+    return tags
+
+
+def _set_tagged(key: str, value, tags):
+    _set_tagged_many({key: (value, tags)})
+
+
+def _set_tagged_many(entries: dict):
+    """
+    Registra cada clave en sus etiquetas y después guarda los valores, para
+    que una invalidación concurrente nunca deje un valor sin etiquetar.
+    'entries' es {clave: (valor, etiquetas)}.
+    """
+    timeout = _conf('TIMEOUT')
+    if _conf('TAG_INVALIDATION'):
+        pipe = _redis().pipeline(transaction=False)
+        for key, (_, tags) in entries.items():
+            for tag in tags:
+                pipe.sadd(_tag_key(tag), key)
+                # Las claves de una etiqueta nunca viven más que la última entrada
+                pipe.expire(_tag_key(tag), timeout)
+        pipe.execute()
+    values = {key: value for key, (value, _) in entries.items()}
+    if len(values) == 1:
+        _cache().set(*values.popitem(), timeout=timeout)
+    else:
+        _cache().set_many(values, timeout=timeout)
+
+
+def get_list(namespace: str, query_string: str, request=None):
+    """
+    Devuelve el listado cacheado (o None) y anota la petición en el ranking
+    de consultas más pedidas, que es lo que se recalienta tras invalidar.
+    Si el limitador de concurrencia ya lo buscó para 'request'
+    (is_cached_list), reutiliza esa lectura.
+    """
+    _count_hit(namespace, query_string)
+    key = list_cache_key(namespace, query_string)
+    lookup = getattr(request, '_list_cache_lookup', None)
+    if lookup is not None and lookup[0] == key:
+        return lookup[1]
+    return _cache().get(key)
+
+
+def set_list(namespace: str, query_string: str, entries: list):
+    tags = _entry_tags(namespace, query_string) | _item_tags(namespace, entries)
+    _set_tagged(list_cache_key(namespace, query_string), entries, tags)
+
+
+def has_list(namespace: str, query_string: str) -> bool:
+    return cache.has_key(list_cache_key(namespace, query_string))
+
+
+# Namespace del listado de cada ViewSet (por su basename)
+_LIST_NAMESPACES = {'autor': AUTORES_LIST, 'libro': LIBROS_LIST}
+
+
+def is_cached_list(request, view_func) -> bool:
+    """
+    Si la petición es un listado que se responderá desde el caché. El
+    limitador de concurrencia (core/concurrency.py) la trata entonces como
+    una lectura barata y no como una consulta a la DB.
+
+    Lee la entrada por el caché de dos niveles (L1 primero) y la deja en la
+    petición para que la vista no vuelva a leerla (ver get_list).
+    """
+    namespace = _LIST_NAMESPACES.get(view_func.initkwargs.get('basename'))
+    if namespace is None or view_func.actions.get('get') != 'list':
+        return False
+    key = list_cache_key(namespace, request.GET.urlencode())
+    request._list_cache_lookup = (key, _cache().get(key))
+    return request._list_cache_lookup[1] is not None
+
+
+# --- Fragmentos JSON de los listados ---
+#
+# El JSON ya renderizado de cada objeto, con clave (ID, versión): una
+# escritura cambia la versión, así que nunca hace falta invalidarlos (los
+# viejos caducan solos). Van directos a Redis, sin el L1 ni pickle, para
+# leer los de una página con un solo MGET.
+
+def _fragment_key(namespace: str, entry) -> str:
+    return f'{namespace}:{entry.pk}:{entry.version}'
+
+
+def get_fragments(namespace: str, entries) -> dict:
+    """
+    Fragmentos cacheados de las entradas dadas en una sola lectura:
+    {pk: bytes} solo con los encontrados.
+    """
+    if not entries:
+        return {}
+    values = _redis().mget([_fragment_key(namespace, entry) for entry in entries])
+    return {entry.pk: value for entry, value in zip(entries, values) if value is not None}
+
+
+def set_fragments(namespace: str, fragments: dict):
+    """
+    Guarda fragmentos ({entrada: bytes}) en un solo pipeline.
+    """
+    if not fragments:
+        return
+    timeout = _conf('FRAGMENT_TIMEOUT')
+    pipe = _redis().pipeline(transaction=False)
+    for entry, content in fragments.items():
+        pipe.set(_fragment_key(namespace, entry), content, ex=timeout)
+    pipe.execute()
+
+
+def _detail_key(namespace: str, pk):
+    # Normalizo el UUID: '/autores/ABC.../' y '/autores/abc.../' son el mismo
+    try:
+        return f'{namespace}_{uuid.UUID(str(pk))}'
+    except ValueError:
+        return None
+
+
+def get_detail(namespace: str, pk):
+    key = _detail_key(namespace, pk)
+    return _cache().get(key) if key else None
+
+
+def get_details(namespace: str, pks) -> dict:
+    """
+    Detalles cacheados de varios objetos en una sola lectura: {pk: datos}
+    solo con los encontrados.
+    """
+    keys = {_detail_key(namespace, pk): pk for pk in pks}
+    keys.pop(None, None)
+    return {keys[key]: data for key, data in _cache().get_many(list(keys)).items()}
+
+
+def _detail_tags(namespace: str, pk, data: dict) -> set:
+    if namespace == LIBRO_DETAIL:
+        return {f'libro:{_uuid_or_none(pk)}'} | {f"libro_autor:{autor['id']}" for autor in data['autores']}
+    return set()
+
+
+def set_detail(namespace: str, pk, data: dict):
+    key = _detail_key(namespace, pk)
+    if key:
+        _set_tagged(key, data, _detail_tags(namespace, pk, data))
+
+
+def set_details(namespace: str, items: dict):
+    """
+    Cachea varios detalles ({pk: datos}) con una ida y vuelta para las
+    etiquetas y otra para los valores.
+    """
+    entries = {
+        _detail_key(namespace, pk): (data, _detail_tags(namespace, pk, data))
+        for pk, data in items.items()
+    }
+    entries.pop(None, None)
+    if entries:
+        _set_tagged_many(entries)
+
+
+def invalidate_detail(namespace: str, pk=None):
+    """
+    Borra el detalle cacheado de un objeto, o todos los del namespace
+    si no se indica 'pk'.
+    """
+    if pk is None:
+        _cache().delete_pattern(f'{namespace}_')
+    else:
+        _cache().delete(_detail_key(namespace, pk))
+
+
+def get_generation(namespace: str) -> int:
+    return int(_redis().get(_generation_key(namespace)) or 0)
+
+
+def _count_hit(namespace: str, query_string: str):
+    with _hits_lock:
+        _pending_hits[namespace][query_string] += 1
+        due = time.monotonic() - _hits_last_flush >= _conf('HITS_FLUSH_INTERVAL')
+    if due:
+        flush_hits()
+
+
+def flush_hits():
+    """
+    Suma al ranking de Redis las peticiones contadas en el proceso desde
+    el último volcado, en un solo pipeline.
+    """
+    global _pending_hits, _hits_last_flush
+    with _hits_lock:
+        pending, _pending_hits = _pending_hits, defaultdict(Counter)
+        _hits_last_flush = time.monotonic()
+    if not pending:
+        return
+    pipe = _redis().pipeline(transaction=False)
+    for namespace, counts in pending.items():
+        for query_string, hits in counts.items():
+            pipe.zincrby(_hits_key(namespace), hits, query_string)
+    pipe.execute()
+
+
+def hot_query_strings(namespace: str, limit: int):
+    """
+    Las 'limit' consultas más pedidas del namespace con su frecuencia.
+    """
+    return [
+        (query_string.decode(), hits)
+        for query_string, hits in _redis().zrevrange(_hits_key(namespace), 0, limit - 1, withscores=True)
+    ]
+
+
+def decay_hits(namespace: str):
+    """
+    Envejece el ranking (divide las frecuencias a la mitad) y lo recorta,
+    para que refleje lo que se pide ahora y no crezca sin límite.
+    """
+    key = _hits_key(namespace)
+    pipe = _redis().pipeline()
+    pipe.zunionstore(key, {key: 0.5})
+    pipe.zremrangebyrank(key, 0, -_conf('TRACK_MAX') - 1)
+    pipe.execute()
+
+
+def _schedule_warm(namespace: str):
+    """
+    Programa el recalentamiento del namespace. Las ráfagas de escrituras
+    dentro de WARM_DEBOUNCE segundos programan una sola tarea.
+    """
+    # Import diferido: tasks -> views -> caching
+    from .tasks import warm_list_cache
+
+    # La generación permite a la tarea descartar un resultado calculado
+    # antes de una escritura posterior
+    _redis().incr(_generation_key(namespace))
+    if not _conf('WARM_ENABLED'):
+        return
+    debounce = _conf('WARM_DEBOUNCE')
+    if cache.add(f'list_cache_warm_scheduled_{namespace}', 1, timeout=debounce):
+        warm_list_cache.apply_async(args=[namespace], countdown=debounce)
+
+
+def invalidate_lists(*namespaces: str):
+    """
+    Borra todos los listados cacheados de los namespaces dados y programa
+    su recalentamiento.
+    """
+    for namespace in namespaces:
+        _cache().delete_pattern(f'{namespace}_')
+        _schedule_warm(namespace)
+
+
+def invalidate_tags(tags) -> int:
+    """
+    Borra las entradas cacheadas (listados y detalles) con alguna de las
+    etiquetas dadas. Devuelve cuántas claves se borraron.
+    """
+    if not tags:
+        return 0
+    tag_keys = [_tag_key(tag) for tag in tags]
+    pipe = _redis().pipeline()
+    pipe.sunion(tag_keys)
+    pipe.delete(*tag_keys)
+    keys, _ = pipe.execute()
+
+    keys = sorted(key.decode() for key in keys)
+    _cache().delete_many(keys)
+    return len(keys)
+
+
+def invalidate_autor(autor, *, created: bool = False, deleted: bool = False, renamed: bool = False):
+    """
+    Invalida lo que puede haber cambiado al escribir un autor: las entradas
+    que lo contienen y los listados en los que podría aparecer ahora.
+    'renamed' indica que cambió su nombre (afecta a la búsqueda de libros).
+    """
+    if not _conf('TAG_INVALIDATION'):
+        if created:
+            invalidate_lists(AUTORES_LIST)
+        else:
+            invalidate_lists(AUTORES_LIST, LIBROS_LIST)
+            invalidate_detail(AUTOR_DETAIL, autor.pk)
+            invalidate_detail(LIBRO_DETAIL)
+        return
+
+    tags = set()
+    if not created:
+        tags |= {f'autor:{autor.pk}', f'libro_autor:{autor.pk}'}
+        invalidate_detail(AUTOR_DETAIL, autor.pk)
+    if not deleted:
+        tags |= {'autores:all', f'autores:last_name:{autor.last_name}'}
+        if autor.birth_date:
+            tags.add(f'autores:birth_date:{autor.birth_date.isoformat()}')
+    if renamed:
+        tags.add('libros:search')
+    invalidate_tags(tags)
+
+    # Un autor nuevo no tiene libros: no cambia ningún listado de libros
+    _schedule_warm(AUTORES_LIST)
+    if not created:
+        _schedule_warm(LIBROS_LIST)
+
+
+def invalidate_autor_merge(target, duplicates, libro_ids):
+    """
+    Invalida lo que cambia al fusionar autores (ver services.merge_autores):
+    los duplicados desaparecen, 'target' gana sus libros (book_count) y
+    esos libros cambian de autores.
+    """
+    for autor in duplicates:
+        invalidate_autor(autor, deleted=True)
+    invalidate_autor(target)
+    if libro_ids:
+        invalidate_libro_tags({f'libro:{libro_id}' for libro_id in libro_ids} | {f'libros:autor:{target.pk}'})
+
+
+def libro_tags(libro, *, autor_ids, old_autor_ids=(), created: bool = False, deleted: bool = False) -> set:
+    """
+    Etiquetas afectadas al escribir un libro. 'autor_ids' son sus autores
+    actuales (los que tenía, si se borró) y 'old_autor_ids' los que tenía
+    antes de una actualización.
+    """
+    autor_ids = set(autor_ids)
+    # book_count (listados de autores) solo cambia para los autores que
+    # ganan o pierden el libro
+    if created or deleted:
+        changed_autores = autor_ids
+    else:
+        changed_autores = autor_ids ^ set(old_autor_ids)
+
+    tags = {f'autor:{autor_id}' for autor_id in changed_autores}
+    if not created:
+        tags.add(f'libro:{libro.pk}')
+    if not deleted:
+        tags |= {'libros:all', f'libros:isbn:{libro.isbn}', f'libros:year:{libro.publication_date.year}'}
+        tags |= {f'libros:autor:{autor_id}' for autor_id in autor_ids}
+    return tags
+
+
+def invalidate_libro(libro, **kwargs):
+    """
+    Invalida lo que puede haber cambiado al escribir un libro
+    (mismos argumentos que libro_tags).
+    """
+    invalidate_libro_tags(libro_tags(libro, **kwargs))
+
+
+def invalidate_libro_tags(tags: set):
+    """
+    Invalida las etiquetas de una o varias escrituras de libros de una vez
+    (p. ej. la unión de libro_tags de un lote).
+    """
+    if not _conf('TAG_INVALIDATION'):
+        invalidate_lists(LIBROS_LIST, AUTORES_LIST)
+        for tag in tags:
+            if tag.startswith('libro:'):
+                invalidate_detail(LIBRO_DETAIL, tag.partition(':')[2])
+        return
+
+    invalidate_tags(tags)
+    _schedule_warm(LIBROS_LIST)
+    if any(tag.startswith('autor:') for tag in tags):
+        _schedule_warm(AUTORES_LIST)
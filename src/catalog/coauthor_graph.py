@@ -0,0 +1,170 @@
+# src/catalog/coauthor_graph.py
+
+import uuid
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+# UUID en bytes: se ordena y se compara byte a byte (sin el recorte de
+# ceros finales de 'S16')
+ID_DTYPE = np.dtype('V16')
+
+
+class RelatedAutor(NamedTuple):
+    id: uuid.UUID
+    full_name: str
+    # Libros compartidos (co-autores) o co-autores en común (segundo grado)
+    weight: int
+
+
+def _ids(values) -> np.ndarray:
+    return np.array([value.bytes for value in values], dtype=ID_DTYPE)
+
+
+class CoauthorGraph:
+    """
+    Grafo de co-autoría en formato CSR sobre arrays de NumPy: los vecinos
+    del nodo i son indices[indptr[i]:indptr[i + 1]], con sus libros
+    compartidos en 'weights', ya ordenados de más a menos. Los nodos (los
+    autores con algún co-autor) van ordenados por UUID, así que un autor
+    se encuentra con una búsqueda binaria, sin índices por proceso.
+
+    Se guarda como bytes (to_payload) y se reconstruye sin copiar
+    (from_payload), de modo que cargarlo por petición es O(1).
+    """
+
+    def __init__(self, ids: np.ndarray, indptr: np.ndarray, indices: np.ndarray,
+                 weights: np.ndarray, names: List[str]):
+        self.ids = ids
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.names = names
+
+    def __len__(self):
+        return len(self.ids)
+
+    # --- Construcción ---
+
+    @classmethod
+    def from_edges(cls, src: np.ndarray, dst: np.ndarray, weights: np.ndarray,
+                   names: Dict[bytes, str]) -> 'CoauthorGraph':
+        """
+        Construye el grafo a partir de aristas dirigidas (src -> dst, con
+        sus libros compartidos). Cada par debe venir en los dos sentidos.
+        """
+        ids = np.unique(np.concatenate([src, dst]))
+        rows = np.searchsorted(ids, src)
+        cols = np.searchsorted(ids, dst)
+        # Por nodo; dentro de cada nodo, de más a menos libros compartidos
+        order = np.lexsort((cols, -weights, rows))
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(ids)), out=indptr[1:])
+        return cls(
+            ids, indptr, cols[order].astype(np.int32), weights[order].astype(np.int32),
+            [names.get(node, '') for node in ids.tolist()],
+        )
+
+    @classmethod
+    def from_rows(cls, rows, names: Dict[bytes, str]) -> 'CoauthorGraph':
+        """
+        Grafo completo a partir de filas (autor, co-autor, libros compartidos)
+        en los dos sentidos, tal como salen de la DB.
+        """
+        src, dst, weights = cls._columns(rows)
+        return cls.from_edges(src, dst, weights, names)
+
+    def with_rows(self, autor_ids, rows, names: Dict[bytes, str]) -> 'CoauthorGraph':
+        """
+        Nuevo grafo en el que las aristas de 'autor_ids' se reemplazan por
+        'rows' (las que salen de esos autores, recalculadas en la DB). Las
+        aristas de vuelta de sus co-autores se obtienen por simetría, y el
+        resto del grafo se conserva. 'names' añade o renombra nodos.
+        """
+        dirty = _ids(autor_ids)
+        src, dst, weights = self._columns(rows)
+
+        old_src = np.repeat(self.ids, np.diff(self.indptr))
+        old_dst = self.ids[self.indices]
+        keep = ~(np.isin(old_src, dirty) | np.isin(old_dst, dirty))
+        # Si el co-autor también se recalculó, su arista ya viene en 'rows'
+        back = ~np.isin(dst, dirty)
+        return self.from_edges(
+            np.concatenate([old_src[keep], src, dst[back]]),
+            np.concatenate([old_dst[keep], dst, src[back]]),
+            np.concatenate([self.weights[keep], weights, weights[back]]),
+            {**dict(zip(self.ids.tolist(), self.names)), **names},
+        )
+
+    @staticmethod
+    def _columns(rows):
+        return (
+            _ids(row[0] for row in rows),
+            _ids(row[1] for row in rows),
+            np.array([row[2] for row in rows], dtype=np.int32),
+        )
+
+    # --- Serialización ---
+
+    def to_payload(self) -> dict:
+        return {
+            'ids': self.ids.tobytes(),
+            'indptr': self.indptr.tobytes(),
+            'indices': self.indices.tobytes(),
+            'weights': self.weights.tobytes(),
+            'names': self.names,
+        }
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> 'CoauthorGraph':
+        return cls(
+            np.frombuffer(payload['ids'], dtype=ID_DTYPE),
+            np.frombuffer(payload['indptr'], dtype=np.int64),
+            np.frombuffer(payload['indices'], dtype=np.int32),
+            np.frombuffer(payload['weights'], dtype=np.int32),
+            payload['names'],
+        )
+
+    # --- Consultas ---
+
+    def node(self, autor_id: uuid.UUID) -> Optional[int]:
+        """
+        Posición del autor en el grafo, o None si no tiene co-autores.
+        """
+        key = np.array([autor_id.bytes], dtype=ID_DTYPE)
+        position = int(np.searchsorted(self.ids, key)[0])
+        if position < len(self.ids) and self.ids[position] == key[0]:
+            return position
+        return None
+
+    def _related(self, nodes: np.ndarray, weights: np.ndarray) -> List[RelatedAutor]:
+        return [
+            RelatedAutor(uuid.UUID(bytes=self.ids[node].tobytes()), self.names[node], weight)
+            for node, weight in zip(nodes.tolist(), weights.tolist())
+        ]
+
+    def coauthors(self, node: int, limit: int) -> List[RelatedAutor]:
+        """
+        Co-autores del nodo, de más a menos libros compartidos.
+        """
+        start = int(self.indptr[node])
+        end = min(int(self.indptr[node + 1]), start + limit)
+        return self._related(self.indices[start:end], self.weights[start:end])
+
+    def second_degree(self, node: int, limit: int) -> List[RelatedAutor]:
+        """
+        Co-autores de sus co-autores (sin él ni sus co-autores directos),
+        de más a menos co-autores en común.
+        """
+        neighbors = self.indices[self.indptr[node]:self.indptr[node + 1]]
+        if not len(neighbors):
+            return []
+        reached = np.concatenate([
+            self.indices[start:end]
+            for start, end in zip(self.indptr[neighbors].tolist(), self.indptr[neighbors + 1].tolist())
+        ])
+        candidates, counts = np.unique(reached, return_counts=True)
+        keep = (candidates != node) & ~np.isin(candidates, neighbors)
+        candidates, counts = candidates[keep], counts[keep]
+        top = np.lexsort((candidates, -counts))[:limit]
+        return self._related(candidates[top], counts[top])
@@ -0,0 +1,178 @@
+# src/catalog/coauthors.py
+
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django_redis import get_redis_connection
+
+from core.tiered_cache import TieredCache
+from .models import Autor, Libro
+
+# Grafo precalculado (payload de CoauthorGraph) en el caché
+GRAPH_KEY = 'coauthor_graph'
+
+# SET "crudo" de Redis con los autores cuyas aristas hay que recalcular
+DIRTY_KEY = 'coauthor_graph_dirty'
+
+_LOCK_KEY = 'coauthor_graph_lock'
+_SCHEDULED_KEY = 'coauthor_graph_update_scheduled'
+_REBUILD_SCHEDULED_KEY = 'coauthor_graph_rebuild_scheduled'
+
+# Pares de co-autores con sus libros compartidos. Es el self-join que no
+# se puede hacer por petición: solo se usa al construir el grafo o, acotado
+# a unos pocos autores, al actualizarlo
+_EDGES_SQL = """
+    SELECT a.autor_id, b.autor_id, COUNT(*)
+    FROM {through} AS a
+    JOIN {through} AS b ON b.libro_id = a.libro_id AND b.autor_id <> a.autor_id
+    {where}
+    GROUP BY a.autor_id, b.autor_id
+"""
+
+_tiered = None
+
+
+def _conf(name):
+    return settings.COAUTHOR_GRAPH[name]
+
+
+def _redis():
+    return get_redis_connection('default')
+
+
+def _cache() -> TieredCache:
+    # Cada worker guarda el grafo en memoria (L1) y lo descarta cuando otro
+    # proceso publica una versión nueva
+    global _tiered
+    if _tiered is None:
+        _tiered = TieredCache('coauthors')
+    return _tiered
+
+
+# --- Marcado de cambios (desde services.py y el admin) ---
+
+def mark_dirty(autor_ids: Iterable):
+    """
+    Marca autores cuyas co-autorías (o nombre) cambiaron. Tras el commit se
+    anotan en Redis y se programa la actualización del grafo; las ráfagas
+    de escrituras dentro de UPDATE_DEBOUNCE seg se aplican en una sola tarea.
+    """
+    ids = [str(autor_id) for autor_id in autor_ids]
+    if ids:
+        transaction.on_commit(lambda: _schedule_update(ids))
+
+
+def _schedule_update(ids: List[str]):
+    # Import diferido: tasks carga Celery (ver presupuesto de arranque)
+    from .tasks import update_coauthor_graph
+
+    _redis().sadd(DIRTY_KEY, *ids)
+    debounce = _conf('UPDATE_DEBOUNCE')
+    if cache.add(_SCHEDULED_KEY, 1, timeout=debounce):
+        update_coauthor_graph.apply_async(countdown=debounce)
+
+
+# --- Construcción y actualización (tarea Celery / comando) ---
+
+def _fetch_edges(autor_ids: Optional[List[str]] = None):
+    through = connection.ops.quote_name(Libro.autores.through._meta.db_table)
+    where, params = '', []
+    if autor_ids is not None:
+        where, params = 'WHERE a.autor_id = ANY(%s::uuid[])', [autor_ids]
+    with connection.cursor() as cursor:
+        cursor.execute(_EDGES_SQL.format(through=through, where=where), params)
+        return cursor.fetchall()
+
+
+def _fetch_names(autor_ids=None) -> Dict[bytes, str]:
+    queryset = Autor.objects.all() if autor_ids is None else Autor.objects.filter(pk__in=autor_ids)
+    # Como Autor.full_name
+    return {
+        pk.bytes: f'{first_name} {last_name}'
+        for pk, first_name, last_name in queryset.values_list('pk', 'first_name', 'last_name').iterator()
+    }
+
+
+def _save(graph):
+    _cache().replace(GRAPH_KEY, graph.to_payload(), timeout=None)
+
+
+def rebuild():
+    """
+    Construye el grafo completo desde la DB y lo publica para todos los
+    workers. Devuelve el grafo.
+    """
+    # Import diferido: NumPy solo se carga donde se usa el grafo
+    from .coauthor_graph import CoauthorGraph
+
+    with cache.lock(_LOCK_KEY, timeout=_conf('LOCK_TIMEOUT')):
+        graph = CoauthorGraph.from_rows(_fetch_edges(), _fetch_names())
+        _save(graph)
+    cache.delete(_REBUILD_SCHEDULED_KEY)
+    return graph
+
+
+def _schedule_rebuild():
+    # Import diferido: tasks carga Celery (ver presupuesto de arranque)
+    from .tasks import rebuild_coauthor_graph
+
+    # Una sola tarea aunque lleguen muchas peticiones sin grafo
+    if cache.add(_REBUILD_SCHEDULED_KEY, 1, timeout=_conf('LOCK_TIMEOUT')):
+        rebuild_coauthor_graph.apply_async()
+
+
+def apply_pending() -> int:
+    """
+    Recalcula en el grafo las aristas de los autores marcados, con una
+    consulta acotada a ellos, y publica la versión nueva. Devuelve cuántos
+    autores se aplicaron.
+    """
+    from .coauthor_graph import CoauthorGraph
+
+    # Primero se libera la programación: una marca posterior a leer el SET
+    # programa otra tarea en lugar de perderse
+    cache.delete(_SCHEDULED_KEY)
+    with cache.lock(_LOCK_KEY, timeout=_conf('LOCK_TIMEOUT')):
+        pipe = _redis().pipeline()
+        pipe.smembers(DIRTY_KEY)
+        pipe.delete(DIRTY_KEY)
+        ids = sorted(member.decode() for member in pipe.execute()[0])
+        if not ids:
+            return 0
+
+        try:
+            payload = _cache().get(GRAPH_KEY)
+            if payload is None:
+                # Sin grafo previo se construye entero (ya incluye estos cambios)
+                graph = CoauthorGraph.from_rows(_fetch_edges(), _fetch_names())
+            else:
+                rows = _fetch_edges(ids)
+                names = _fetch_names({*ids, *(str(row[1]) for row in rows)})
+                graph = CoauthorGraph.from_payload(payload).with_rows(
+                    [uuid.UUID(autor_id) for autor_id in ids], rows, names
+                )
+            _save(graph)
+        except Exception:
+            # Se reintentan en la próxima actualización
+            _redis().sadd(DIRTY_KEY, *ids)
+            raise
+    return len(ids)
+
+
+def get_graph():
+    """
+    El grafo publicado (en memoria del worker si ya lo tiene), o None si
+    todavía no existe (primer despliegue, o Redis lo desalojó). Nunca se
+    construye en la petición: el self-join es justo lo que el grafo evita.
+    Sin grafo se programa su construcción en Celery.
+    """
+    from .coauthor_graph import CoauthorGraph
+
+    payload = _cache().get(GRAPH_KEY)
+    if payload is None:
+        _schedule_rebuild()
+        return None
+    return CoauthorGraph.from_payload(payload)
@@ -0,0 +1,171 @@
+# src/catalog/events.py
+
+import logging
+import os
+import socket
+import time
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+# Operaciones de un evento de cambio
+CREATE = 'create'
+UPDATE = 'update'
+DELETE = 'delete'
+
+# Atributo de la conexión a la DB con los eventos pendientes de su transacción
+_PENDING_ATTR = 'catalog_pending_change_events'
+
+
+def _conf(name):
+    return settings.CHANGE_EVENTS[name]
+
+
+def _redis():
+    return get_redis_connection('default')
+
+
+def version_of(timestamp) -> int:
+    """
+    Versión de un objeto para los consumidores: su updated_at (o la fecha
+    de borrado) en microsegundos. Crece con cada escritura.
+    """
+    return int(timestamp.timestamp() * 1_000_000)
+
+
+# --- Publicación (desde services.py) ---
+
+def record(entity: str, object_id, op: str, fields, version: int):
+    """
+    Registra un evento de cambio. Se publica en el Stream cuando la
+    transacción en curso hace commit (o en el acto, fuera de una
+    transacción); si hay rollback se descarta. Todos los eventos de una
+    misma transacción se publican juntos, en un solo pipeline, con el
+    mismo 'tx'.
+    """
+    if not _conf('ENABLED'):
+        return
+    event = {
+        'entity': entity,
+        'id': str(object_id),
+        'op': op,
+        'fields': ','.join(fields),
+        'version': str(version),
+    }
+
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        _publish(uuid.uuid4().hex, [event])
+        return
+
+    pending = getattr(connection, _PENDING_ATTR, None)
+    # El lote sigue vivo mientras su callback esté registrado; tras un
+    # commit o un rollback se empieza otro
+    if pending is None or not any(func is pending['flush'] for _, func, _ in connection.run_on_commit):
+        pending = {'tx': uuid.uuid4().hex, 'events': []}
+        pending['flush'] = lambda batch=pending: _publish(batch['tx'], batch['events'])
+        setattr(connection, _PENDING_ATTR, pending)
+        transaction.on_commit(pending['flush'])
+    pending['events'].append(event)
+
+
+def _publish(tx: str, events):
+    try:
+        pipe = _redis().pipeline(transaction=False)
+        for event in events:
+            pipe.xadd(_conf('STREAM'), {**event, 'tx': tx}, maxlen=_conf('MAXLEN'), approximate=True)
+        pipe.execute()
+    except Exception:
+        # El cambio ya está en la DB: no rompo la petición. Quien necesite no
+        # perder nada puede reconciliar con el feed de cambios (/changes/)
+        logger.exception("No se pudieron publicar %d eventos de cambio (tx=%s)", len(events), tx)
+
+
+# --- Consumo (grupos de consumidores) ---
+
+def _decode(entry_id, fields) -> dict:
+    event = {key.decode(): value.decode() for key, value in fields.items()}
+    event['stream_id'] = entry_id.decode()
+    event['fields'] = event['fields'].split(',') if event['fields'] else []
+    event['version'] = int(event['version'])
+    return event
+
+
+def ensure_group(group: str, start_id: str = '$'):
+    """
+    Crea el grupo de consumidores si no existe. Por defecto empieza a
+    recibir los eventos publicados desde ahora ('0' para todo el Stream).
+    """
+    try:
+        _redis().xgroup_create(_conf('STREAM'), group, id=start_id, mkstream=True)
+    except Exception as exc:
+        if 'BUSYGROUP' not in str(exc):
+            raise
+
+
+class ChangeEventConsumer:
+    """
+    Consumidor de un grupo: cada evento se entrega a un solo consumidor del
+    grupo y queda pendiente hasta que el handler termina sin error (XACK).
+    Los eventos que otro consumidor dejó pendientes más de 'claim_idle_ms'
+    (p. ej. porque murió) se reclaman y se vuelven a procesar, así que el
+    handler debe ser idempotente (la 'version' sirve para descartar
+    eventos viejos).
+
+    Uso:
+        consumer = ChangeEventConsumer('search-indexer')
+        consumer.run(lambda events: ...)
+    """
+
+    def __init__(self, group: str, consumer: str = None, *, count: int = 100,
+                 block_ms: int = 5000, claim_idle_ms: int = 60000):
+        self.group = group
+        self.consumer = consumer or f'{socket.gethostname()}-{os.getpid()}'
+        self.count = count
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.stream = _conf('STREAM')
+        self._claim_cursor = '0-0'
+        ensure_group(group)
+
+    def _claim_stale(self):
+        self._claim_cursor, entries, *_ = _redis().xautoclaim(
+            self.stream, self.group, self.consumer, self.claim_idle_ms,
+            start_id=self._claim_cursor, count=self.count,
+        )
+        return [(entry_id, fields) for entry_id, fields in entries if fields]
+
+    def poll(self, handler) -> int:
+        """
+        Procesa un lote: primero los eventos abandonados por otros
+        consumidores, si no hay, los nuevos (esperando hasta 'block_ms').
+        Devuelve cuántos eventos se confirmaron.
+        """
+        entries = self._claim_stale()
+        if not entries:
+            response = _redis().xreadgroup(
+                self.group, self.consumer, {self.stream: '>'}, count=self.count, block=self.block_ms
+            )
+            entries = response[0][1] if response else []
+        if not entries:
+            return 0
+
+        handler([_decode(entry_id, fields) for entry_id, fields in entries])
+        # Solo se confirman si el handler no lanzó excepción
+        return _redis().xack(self.stream, self.group, *[entry_id for entry_id, _ in entries])
+
+    def run(self, handler, stop=lambda: False):
+        """
+        Bucle de consumo hasta que 'stop()' devuelva True.
+        """
+        while not stop():
+            try:
+                self.poll(handler)
+            except Exception:
+                # Los eventos no confirmados se reclaman pasado 'claim_idle_ms'
+                logger.exception("Error procesando eventos de cambio (grupo=%s)", self.group)
+                time.sleep(1)
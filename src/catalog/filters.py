@@ -0,0 +1,42 @@
+# src/catalog/filters.py
+
+import django_filters
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.filters import SearchFilter
+
+from .models import LibroListado
+
+
+class LibroListadoFilter(django_filters.FilterSet):
+    """
+    Los filtros del listado de libros (mismos parámetros que
+    LibroViewSet.filterset_fields) sobre el modelo de lectura.
+    """
+    publication_date = django_filters.DateFilter()
+    publication_date__gte = django_filters.DateFilter(field_name='publication_date', lookup_expr='gte')
+    publication_date__lte = django_filters.DateFilter(field_name='publication_date', lookup_expr='lte')
+    isbn = django_filters.CharFilter()
+    autores__id = django_filters.UUIDFilter(method='filter_autor')
+
+    class Meta:
+        model = LibroListado
+        fields = []
+
+    def filter_autor(self, queryset, name, value):
+        # Contención JSONB: usa el índice GIN de 'autores'
+        return queryset.filter(autores__contains=[{'id': str(value)}])
+
+
+class LibroListadoFilterBackend(DjangoFilterBackend):
+    def get_filterset_class(self, view, queryset=None):
+        return LibroListadoFilter
+
+
+class LibroListadoSearchFilter(SearchFilter):
+    """
+    Búsqueda del listado de libros sobre una sola columna (título, resumen
+    y nombres de los autores), sin JOINs ni DISTINCT.
+    """
+
+    def get_search_fields(self, view, request):
+        return ['search_text']
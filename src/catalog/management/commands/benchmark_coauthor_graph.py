@@ -0,0 +1,134 @@
+# src/catalog/management/commands/benchmark_coauthor_graph.py
+
+import random
+import statistics
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from catalog import coauthors
+from catalog.models import Autor, Libro
+
+# Lo que el grafo evita: co-autores y segundo grado con self-joins por petición
+_LIVE_COAUTHORS_SQL = """
+    SELECT b.autor_id, COUNT(*) AS shared
+    FROM catalog_libro_autores a
+    JOIN catalog_libro_autores b ON b.libro_id = a.libro_id AND b.autor_id <> a.autor_id
+    WHERE a.autor_id = %(id)s
+    GROUP BY b.autor_id ORDER BY shared DESC LIMIT %(limit)s
+"""
+_LIVE_SECOND_DEGREE_SQL = """
+    WITH direct AS (
+        SELECT DISTINCT b.autor_id
+        FROM catalog_libro_autores a
+        JOIN catalog_libro_autores b ON b.libro_id = a.libro_id AND b.autor_id <> a.autor_id
+        WHERE a.autor_id = %(id)s
+    )
+    SELECT d.autor_id, COUNT(DISTINCT c.autor_id) AS common
+    FROM direct c
+    JOIN catalog_libro_autores x ON x.autor_id = c.autor_id
+    JOIN catalog_libro_autores d ON d.libro_id = x.libro_id
+    WHERE d.autor_id <> %(id)s AND d.autor_id NOT IN (SELECT autor_id FROM direct)
+    GROUP BY d.autor_id ORDER BY common DESC LIMIT %(limit)s
+"""
+
+
+class Command(BaseCommand):
+    """
+    Compara obtener los co-autores (y el segundo grado) de un autor con
+    self-joins en la DB frente al grafo precalculado en CSR. Mide también
+    la construcción completa y una actualización incremental.
+    Uso: python manage.py benchmark_coauthor_graph --autores 5000 --libros 20000
+    """
+    help = "Benchmark de co-autores: self-joins por petición vs grafo precalculado."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--autores', type=int, default=2000)
+        parser.add_argument('--libros', type=int, default=10000)
+        parser.add_argument('--lookups', type=int, default=200)
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        # Todo se hace dentro de una transacción que se revierte al final
+        with transaction.atomic():
+            autores = self._dataset(options['autores'], options['libros'], rng)
+            sample = [autor.pk for autor in rng.choices(autores, k=options['lookups'])]
+
+            started = time.perf_counter()
+            graph = coauthors.rebuild()
+            self.stdout.write(
+                f"construcción: {len(graph)} autores, {len(graph.indices) // 2} pares "
+                f"en {(time.perf_counter() - started) * 1000:.0f} ms"
+            )
+            self._incremental(graph, autores, rng)
+
+            self._run('self-join', sample, lambda autor_id: self._live(autor_id, options['limit']))
+            self._run('grafo', sample, lambda autor_id: self._graph(autor_id, options['limit']))
+
+            transaction.set_rollback(True)
+
+        # El grafo publicado era el de los datos de prueba
+        coauthors.rebuild()
+
+    def _dataset(self, num_autores, num_libros, rng):
+        autores = Autor.objects.bulk_create([
+            Autor(first_name=f'Nombre {i}', last_name=f'Apellido {i}', birth_date=date(1900 + i % 80, 1, 1))
+            for i in range(num_autores)
+        ])
+        libros = Libro.objects.bulk_create([
+            Libro(title=f'Libro {i}', isbn=f'{9990000000000 + i}', publication_date=date(1950, 1, 1))
+            for i in range(num_libros)
+        ])
+        LibroAutor = Libro.autores.through
+        LibroAutor.objects.bulk_create([
+            LibroAutor(libro_id=libro.pk, autor_id=autor.pk)
+            for libro in libros
+            for autor in rng.sample(autores, rng.choice((1, 2, 2, 3, 4)))
+        ])
+        return autores
+
+    def _incremental(self, graph, autores, rng):
+        # Un libro nuevo con dos autores: se recalculan solo sus aristas
+        libro = Libro.objects.create(title='Libro nuevo', isbn='9989999999999', publication_date=date(2000, 1, 1))
+        pair = rng.sample(autores, 2)
+        libro.autores.add(*pair)
+        ids = [str(autor.pk) for autor in pair]
+
+        started = time.perf_counter()
+        rows = coauthors._fetch_edges(ids)
+        graph.with_rows([autor.pk for autor in pair], rows, coauthors._fetch_names(ids))
+        self.stdout.write(f"actualización incremental (2 autores): {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def _live(self, autor_id, limit):
+        with connection.cursor() as cursor:
+            params = {'id': autor_id, 'limit': limit}
+            cursor.execute(_LIVE_COAUTHORS_SQL, params)
+            cursor.fetchall()
+            cursor.execute(_LIVE_SECOND_DEGREE_SQL, params)
+            cursor.fetchall()
+
+    def _graph(self, autor_id, limit):
+        graph = coauthors.get_graph()
+        node = graph.node(autor_id)
+        if node is not None:
+            graph.coauthors(node, limit)
+            graph.second_degree(node, limit)
+
+    def _run(self, name, sample, lookup):
+        timings = []
+        for autor_id in sample:
+            started = time.perf_counter()
+            lookup(autor_id)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        self.stdout.write(
+            f"{name:<10} consultas={len(timings)} "
+            f"media={statistics.mean(timings):.3f} ms "
+            f"p50={timings[len(timings) // 2]:.3f} ms "
+            f"p99={timings[int(len(timings) * 0.99)]:.3f} ms"
+        )
@@ -0,0 +1,130 @@
+# src/catalog/management/commands/benchmark_list_fragments.py
+
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from catalog import caching, read_model
+from catalog.models import Autor, Libro
+from catalog.views import AutorViewSet, LibroViewSet
+
+
+class Command(BaseCommand):
+    """
+    Compara el tiempo de respuesta de los listados re-serializando cada
+    objeto de la página frente a montarla con los fragmentos JSON cacheados.
+    Recorre muchas combinaciones de orden, filtro y página sobre los mismos
+    objetos: una pasada en frío (listados sin cachear) y otra en caliente.
+    Uso: python manage.py benchmark_list_fragments --libros 2000 --pages 10
+    """
+    help = "Benchmark de los listados: re-serializar la página vs fragmentos JSON cacheados."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--autores', type=int, default=100)
+        parser.add_argument('--libros', type=int, default=1000)
+        parser.add_argument('--pages', type=int, default=5, help="Páginas que se piden de cada consulta.")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        # Todo se hace dentro de una transacción que se revierte al final
+        with transaction.atomic():
+            user = User.objects.create_user(username='benchmark_fragments_user', password='x')
+            self._dataset(options['autores'], options['libros'], options['seed'])
+            requests = self._requests(options)
+
+            for name, fragments in (('serializar', False), ('fragmentos', True)):
+                self._run(name, fragments, user, requests)
+
+            transaction.set_rollback(True)
+
+        self._flush()
+
+    def _dataset(self, num_autores, num_libros, seed):
+        rng = random.Random(seed)
+        autores = Autor.objects.bulk_create([
+            Autor(first_name=f'Nombre {i}', last_name=f'Apellido {i}', birth_date=date(1900 + i % 80, 1, 1),
+                  biography=f'Biografía del autor {i}. ' * 5)
+            for i in range(num_autores)
+        ])
+        libros = Libro.objects.bulk_create([
+            Libro(
+                title=f'Libro {i}', isbn=f'{9990000000000 + i}', summary=f'Resumen del libro {i}. ' * 5,
+                publication_date=date(1900, 1, 1) + timedelta(days=rng.randrange(120 * 365)),
+            )
+            for i in range(num_libros)
+        ])
+        LibroAutor = Libro.autores.through
+        LibroAutor.objects.bulk_create([
+            LibroAutor(libro_id=libro.pk, autor_id=autor.pk)
+            for libro in libros
+            for autor in rng.sample(autores, rng.choice((1, 1, 2)))
+        ])
+        # bulk_create no pasa por los servicios: el listado lee el modelo de lectura
+        for _ in read_model.rebuild():
+            pass
+
+    def _requests(self, options):
+        """
+        Las mismas filas vistas con distintos órdenes, filtros y páginas.
+        """
+        pages = [{'page': page} for page in range(1, options['pages'] + 1)]
+        variants = [
+            (caching.LIBROS_LIST, {'ordering': ordering})
+            for ordering in ('title', '-title', 'publication_date', '-publication_date')
+        ]
+        variants += [
+            (caching.LIBROS_LIST, {'publication_date__gte': f'{year}-01-01', 'ordering': 'title'})
+            for year in range(1900, 1960, 20)
+        ]
+        variants += [
+            (caching.AUTORES_LIST, {'ordering': ordering})
+            for ordering in ('last_name', '-last_name', 'birth_date', '-book_count')
+        ]
+        return [(namespace, {**params, **page}) for namespace, params in variants for page in pages]
+
+    def _flush(self):
+        conf = {**settings.LIST_CACHE, 'WARM_ENABLED': False}
+        with override_settings(LIST_CACHE=conf):
+            caching.invalidate_lists(caching.AUTORES_LIST, caching.LIBROS_LIST)
+        redis = caching._redis()
+        for namespace in (caching.AUTOR_FRAGMENT, caching.LIBRO_FRAGMENT):
+            keys = list(redis.scan_iter(f'{namespace}:*'))
+            if keys:
+                redis.delete(*keys)
+
+    def _run(self, name, fragments, user, requests):
+        factory = APIRequestFactory()
+        list_views = {
+            caching.AUTORES_LIST: AutorViewSet.as_view({'get': 'list'}, throttle_classes=[]),
+            caching.LIBROS_LIST: LibroViewSet.as_view({'get': 'list'}, throttle_classes=[]),
+        }
+
+        self._flush()
+        conf = {**settings.LIST_CACHE, 'FRAGMENTS': fragments, 'WARM_ENABLED': False}
+        with override_settings(LIST_CACHE=conf):
+            for phase in ('frío', 'caliente'):
+                timings = []
+                for namespace, params in requests:
+                    request = factory.get('/', params)
+                    force_authenticate(request, user=user)
+                    started = time.perf_counter()
+                    response = list_views[namespace](request)
+                    response.render()
+                    timings.append((time.perf_counter() - started) * 1000)
+                    assert response.status_code == 200, response.content
+
+                timings.sort()
+                self.stdout.write(
+                    f"{name:<11} {phase:<9} peticiones={len(timings)} "
+                    f"media={statistics.mean(timings):.2f} ms "
+                    f"p50={timings[len(timings) // 2]:.2f} ms "
+                    f"p95={timings[int(len(timings) * 0.95)]:.2f} ms"
+                )
@@ -0,0 +1,136 @@
+# src/catalog/management/commands/benchmark_list_invalidation.py
+
+import random
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from catalog import caching, read_model
+from catalog.models import Autor, Libro
+from catalog.views import AutorViewSet, LibroViewSet
+
+
+class Command(BaseCommand):
+    """
+    Compara la tasa de aciertos del caché de listados con una carga mixta de
+    lecturas y escrituras, vaciando el namespace en cada escritura frente a
+    invalidar por etiquetas.
+    Uso: python manage.py benchmark_list_invalidation --operations 3000 --write-ratio 0.1
+    """
+    help = "Benchmark de la tasa de aciertos: invalidación por namespace vs por etiquetas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--operations', type=int, default=2000)
+        parser.add_argument('--write-ratio', type=float, default=0.1)
+        parser.add_argument('--autores', type=int, default=30)
+        parser.add_argument('--libros', type=int, default=300)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        # Todo se hace dentro de una transacción que se revierte al final
+        with transaction.atomic():
+            user = User.objects.create_user(username='benchmark_list_user', password='x')
+            autores, libros = self._dataset(options['autores'], options['libros'], options['seed'])
+            queries = self._queries(autores, libros)
+
+            for name, tags in (('namespace', False), ('etiquetas', True)):
+                self._run(name, tags, user, autores, libros, queries, options)
+
+            transaction.set_rollback(True)
+
+        self._flush()
+
+    def _dataset(self, num_autores, num_libros, seed):
+        rng = random.Random(seed)
+        autores = Autor.objects.bulk_create([
+            Autor(first_name=f'Nombre {i}', last_name=f'Apellido {i}', birth_date=date(1900 + i % 80, 1, 1))
+            for i in range(num_autores)
+        ])
+        libros = Libro.objects.bulk_create([
+            Libro(
+                title=f'Libro {i}', isbn=f'{9990000000000 + i}',
+                publication_date=date(1900, 1, 1) + timedelta(days=rng.randrange(120 * 365)),
+            )
+            for i in range(num_libros)
+        ])
+        LibroAutor = Libro.autores.through
+        LibroAutor.objects.bulk_create([
+            LibroAutor(libro_id=libro.pk, autor_id=autor.pk)
+            for libro in libros
+            for autor in rng.sample(autores, rng.choice((1, 1, 2)))
+        ])
+        # bulk_create no pasa por los servicios: el listado lee el modelo de lectura
+        for _ in read_model.rebuild():
+            pass
+        return autores, libros
+
+    def _queries(self, autores, libros):
+        """
+        Consultas típicas de los clientes: por autor, por década, búsquedas
+        y algunos listados sin filtro.
+        """
+        queries = [(caching.LIBROS_LIST, {}), (caching.AUTORES_LIST, {})]
+        queries += [(caching.LIBROS_LIST, {'autores__id': str(autor.pk)}) for autor in autores]
+        queries += [(caching.AUTORES_LIST, {'last_name': autor.last_name}) for autor in autores[:10]]
+        queries += [
+            (caching.LIBROS_LIST, {'publication_date__gte': f'{year}-01-01', 'publication_date__lte': f'{year + 9}-12-31'})
+            for year in range(1900, 2020, 10)
+        ]
+        queries += [(caching.LIBROS_LIST, {'search': libro.title}) for libro in libros[:10]]
+        return queries
+
+    def _flush(self):
+        conf = {**settings.LIST_CACHE, 'WARM_ENABLED': False}
+        with override_settings(LIST_CACHE=conf):
+            caching.invalidate_lists(caching.AUTORES_LIST, caching.LIBROS_LIST)
+            caching.invalidate_detail(caching.AUTOR_DETAIL)
+            caching.invalidate_detail(caching.LIBRO_DETAIL)
+
+    def _run(self, name, tags, user, autores, libros, queries, options):
+        rng = random.Random(options['seed'])
+        factory = APIRequestFactory()
+        list_views = {
+            caching.AUTORES_LIST: AutorViewSet.as_view({'get': 'list'}, throttle_classes=[]),
+            caching.LIBROS_LIST: LibroViewSet.as_view({'get': 'list'}, throttle_classes=[]),
+        }
+        autor_view = AutorViewSet.as_view({'patch': 'partial_update'}, throttle_classes=[])
+        libro_view = LibroViewSet.as_view({'patch': 'partial_update'}, throttle_classes=[])
+
+        self._flush()
+        conf = {**settings.LIST_CACHE, 'TAG_INVALIDATION': tags, 'WARM_ENABLED': False}
+        reads = hits = writes = 0
+        with override_settings(LIST_CACHE=conf):
+            for i in range(options['operations']):
+                if rng.random() < options['write_ratio']:
+                    # Escrituras que no cambian la pertenencia a los listados
+                    if rng.random() < 0.5:
+                        autor = rng.choice(autores)
+                        request = factory.patch('/', {'biography': f'Biografía {i}'}, format='json')
+                        force_authenticate(request, user=user)
+                        response = autor_view(request, pk=str(autor.pk))
+                    else:
+                        libro = rng.choice(libros)
+                        request = factory.patch('/', {'summary': f'Resumen {i}'}, format='json')
+                        force_authenticate(request, user=user)
+                        response = libro_view(request, pk=str(libro.pk))
+                    assert response.status_code == 200, response.data
+                    writes += 1
+                    continue
+
+                namespace, params = rng.choice(queries)
+                request = factory.get('/', params)
+                force_authenticate(request, user=user)
+                hits += caching.has_list(namespace, request.GET.urlencode())
+                response = list_views[namespace](request)
+                assert response.status_code == 200, response.data
+                reads += 1
+
+        self.stdout.write(
+            f"{name:<10} lecturas={reads} escrituras={writes} "
+            f"aciertos={hits} tasa={hits / reads if reads else 0:.1%}"
+        )
@@ -0,0 +1,168 @@
+# src/catalog/management/commands/benchmark_load_shedding.py
+
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from catalog import caching, read_model
+from catalog.models import Autor, Libro
+from core import concurrency
+
+# Prefijo de los ISBN del dataset, para borrarlo al terminar
+_ISBN_PREFIX = '997'
+
+# Mezcla de peticiones de la carga: (tipo, peso)
+_MIX = [('detalle', 50), ('escritura', 10), ('listado', 20), ('búsqueda', 20)]
+
+
+class Command(BaseCommand):
+    """
+    Prueba de carga: muchos clientes concurrentes con una mezcla de
+    lecturas de detalle, escrituras y listados/búsquedas que no están en
+    caché, sin y con el límite de concurrencia adaptativo. Muestra, por
+    tipo de petición, las atendidas, las rechazadas (503) y su latencia.
+    Los datos se crean (y borran) en la DB: los clientes corren en hilos,
+    cada uno con su conexión.
+    Uso: python manage.py benchmark_load_shedding --clients 32 --seconds 10
+    """
+    help = "Prueba de carga: latencia por tipo de petición sin y con el límite de concurrencia."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=32)
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--autores', type=int, default=2000)
+        parser.add_argument('--libros', type=int, default=50000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(username='benchmark_load_user', password='x')
+        try:
+            autores, libros = self._dataset(options['autores'], options['libros'], options['seed'])
+            token = str(RefreshToken.for_user(user).access_token)
+            # Sin recalentar el caché ni throttling: se mide la DB, no el rate limit
+            list_cache = {**settings.LIST_CACHE, 'WARM_ENABLED': False}
+            with override_settings(LIST_CACHE=list_cache), mock.patch.object(APIView, 'get_throttles', return_value=[]):
+                for name, enabled in (('sin límite', False), ('con límite', True)):
+                    limits = {**settings.CONCURRENCY_LIMIT, 'ENABLED': enabled}
+                    with override_settings(CONCURRENCY_LIMIT=limits):
+                        self._run(name, token, autores, libros, options)
+        finally:
+            Libro.objects.filter(isbn__startswith=_ISBN_PREFIX).delete()
+            Autor.objects.filter(last_name__startswith='Carga ').delete()
+            user.delete()
+            concurrency.reset_limiters()
+            self._flush()
+
+    def _dataset(self, num_autores, num_libros, seed):
+        rng = random.Random(seed)
+        autores = Autor.objects.bulk_create([
+            Autor(first_name=f'Nombre {i}', last_name=f'Carga {i}', birth_date=date(1900 + i % 80, 1, 1))
+            for i in range(num_autores)
+        ])
+        words = [f'palabra{i}' for i in range(2000)]
+        libros = Libro.objects.bulk_create([
+            Libro(
+                title=f'Libro {i} {rng.choice(words)}', isbn=f'{_ISBN_PREFIX}{i:010d}',
+                summary=' '.join(rng.choices(words, k=30)),
+                publication_date=date(1900, 1, 1) + timedelta(days=rng.randrange(120 * 365)),
+            )
+            for i in range(num_libros)
+        ], batch_size=5000)
+        LibroAutor = Libro.autores.through
+        LibroAutor.objects.bulk_create([
+            LibroAutor(libro_id=libro.pk, autor_id=autor.pk)
+            for libro in libros
+            for autor in rng.sample(autores, rng.choice((1, 1, 2)))
+        ], batch_size=5000)
+        # bulk_create no pasa por los servicios: el listado lee el modelo de lectura
+        read_model.refresh_libros([libro.pk for libro in libros])
+        return [autor.pk for autor in autores], [libro.pk for libro in libros]
+
+    def _flush(self):
+        conf = {**settings.LIST_CACHE, 'WARM_ENABLED': False}
+        with override_settings(LIST_CACHE=conf):
+            caching.invalidate_lists(caching.AUTORES_LIST, caching.LIBROS_LIST)
+            caching.invalidate_detail(caching.AUTOR_DETAIL)
+            caching.invalidate_detail(caching.LIBRO_DETAIL)
+
+    def _request(self, client, kind, rng, autores, libros):
+        if kind == 'detalle':
+            return client.get(f'/api/v1/catalog/libros/{rng.choice(libros)}/')
+        if kind == 'escritura':
+            return client.patch(
+                f'/api/v1/catalog/autores/{rng.choice(autores)}/', {'biography': f'Bio {rng.random()}'},
+                content_type='application/json',
+            )
+        if kind == 'listado':
+            # Un rango de fechas al azar: nunca está en caché
+            start = date(1900, 1, 1) + timedelta(days=rng.randrange(100 * 365))
+            return client.get('/api/v1/catalog/libros/', {
+                'publication_date__gte': start.isoformat(),
+                'publication_date__lte': (start + timedelta(days=rng.randrange(30, 3650))).isoformat(),
+                'ordering': 'title',
+            })
+        # Búsqueda de una palabra, acotada a partir de una fecha al azar (para no repetir consulta)
+        return client.get('/api/v1/catalog/libros/', {
+            'search': f'palabra{rng.randrange(2000)}',
+            'publication_date__gte': (date(1900, 1, 1) + timedelta(days=rng.randrange(60 * 365))).isoformat(),
+        })
+
+    def _run(self, name, token, autores, libros, options):
+        concurrency.reset_limiters()
+        self._flush()
+        kinds, weights = zip(*_MIX)
+        results = defaultdict(list)
+        shed = defaultdict(int)
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['seconds']
+
+        def worker(seed):
+            rng = random.Random(seed)
+            client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+            try:
+                while time.monotonic() < deadline:
+                    kind = rng.choices(kinds, weights)[0]
+                    started = time.perf_counter()
+                    response = self._request(client, kind, rng, autores, libros)
+                    elapsed = (time.perf_counter() - started) * 1000
+                    with lock:
+                        if response.status_code == 503:
+                            shed[kind] += 1
+                        else:
+                            results[kind].append(elapsed)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(options['seed'] + i,)) for i in range(options['clients'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.stdout.write(f"--- {name} ({options['clients']} clientes, {options['seconds']:.0f}s) ---")
+        for kind in kinds:
+            timings = sorted(results[kind])
+            if not timings:
+                self.stdout.write(f"{kind:<10} atendidas=0 rechazadas={shed[kind]}")
+                continue
+            self.stdout.write(
+                f"{kind:<10} atendidas={len(timings)} rechazadas={shed[kind]} "
+                f"p50={timings[len(timings) // 2]:.0f} ms "
+                f"p99={timings[int(len(timings) * 0.99)]:.0f} ms "
+                f"media={statistics.mean(timings):.0f} ms"
+            )
+        if settings.CONCURRENCY_LIMIT['ENABLED']:
+            limits = ', '.join(f"{cls}={stats['limit']}" for cls, stats in concurrency.stats().items())
+            self.stdout.write(f"límites finales: {limits}")
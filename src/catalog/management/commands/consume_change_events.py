@@ -0,0 +1,39 @@
+# src/catalog/management/commands/consume_change_events.py
+
+from django.core.management.base import BaseCommand
+
+from catalog import events
+
+
+class Command(BaseCommand):
+    """
+    Consumidor de ejemplo del Stream de eventos de cambio: imprime cada
+    evento. Sirve para inspeccionar el Stream y como plantilla de un
+    consumidor real.
+    Uso: python manage.py consume_change_events --group mi-servicio [--from-start] [--once]
+    """
+    help = "Lee los eventos de cambio del catálogo como miembro de un grupo de consumidores."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group', required=True, help="Grupo de consumidores.")
+        parser.add_argument('--consumer', help="Nombre del consumidor (por defecto host-pid).")
+        parser.add_argument('--from-start', action='store_true',
+                            help="Si el grupo no existe, crearlo desde el principio del Stream.")
+        parser.add_argument('--once', action='store_true', help="Procesa un solo lote y termina.")
+
+    def handle(self, *args, **options):
+        if options['from_start']:
+            events.ensure_group(options['group'], start_id='0')
+        consumer = events.ChangeEventConsumer(options['group'], options['consumer'])
+
+        def handler(batch):
+            for event in batch:
+                self.stdout.write(
+                    f"{event['stream_id']} {event['op']} {event['entity']} {event['id']} "
+                    f"v{event['version']} [{','.join(event['fields'])}] tx={event['tx']}"
+                )
+
+        if options['once']:
+            consumer.poll(handler)
+        else:
+            consumer.run(handler)
@@ -0,0 +1,49 @@
+# src/catalog/management/commands/find_duplicate_autores.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from catalog import author_dedup
+
+
+class Command(BaseCommand):
+    """
+    Busca autores duplicados (mismo apellido y fecha de nacimiento, nombre
+    parecido) y guarda las propuestas de fusión, como la tarea semanal
+    'find-duplicate-autores'. Una vez revisadas, --apply las aplica.
+    Uso: python manage.py find_duplicate_autores [--min-score 0.9]
+         python manage.py find_duplicate_autores --apply
+    """
+    help = "Busca autores duplicados y propone su fusión (o aplica las propuestas guardadas)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-score', type=float, default=None)
+        parser.add_argument(
+            '--apply', action='store_true',
+            help="Fusiona los duplicados de las propuestas guardadas en la última búsqueda.",
+        )
+
+    def handle(self, *args, **options):
+        if options['apply']:
+            proposals = author_dedup.load_proposals()
+            libros = sum(len(author_dedup.merge(proposal)) for proposal in proposals)
+            self.stdout.write(self.style.SUCCESS(
+                f"{len(proposals)} fusiones aplicadas ({libros} libros reasignados)."
+            ))
+            return
+
+        started = time.perf_counter()
+        result = author_dedup.run(min_score=options['min_score'])
+        for proposal in result['proposals']:
+            self.stdout.write(proposal['target']['name'])
+            for duplicate in proposal['duplicates']:
+                self.stdout.write(f"  <- {duplicate['name']} ({duplicate['score']:.2f})")
+        for autor in result['ambiguous']:
+            matches = ', '.join(f"{match['name']} ({match['score']:.2f})" for match in autor['matches'])
+            self.stdout.write(self.style.WARNING(f"Ambiguo, sin proponer: {autor['name']} ~ {matches}"))
+        self.stdout.write(
+            f"{len(result['proposals'])} propuestas y {len(result['ambiguous'])} ambiguos ({result['blocks']} bloques, "
+            f"{result['comparisons']} pares comparados, {time.perf_counter() - started:.2f}s), "
+            f"guardadas en {author_dedup.PROPOSALS_PATH}."
+        )
@@ -0,0 +1,316 @@
+# src/catalog/management/commands/index_advisor.py
+
+import hashlib
+import json
+import os
+import random
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, migrations, models, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.http import HttpRequest, QueryDict
+from rest_framework.request import Request
+
+from catalog import read_model
+from catalog.models import Autor, Libro, LibroListado
+from catalog.urls import router
+
+# Lookups de filtro que se resuelven como igualdad (el resto son rangos)
+EQUALITY_LOOKUPS = {'exact', 'iexact', 'in'}
+
+
+class Command(BaseCommand):
+    """
+    Recorre las "formas" de consulta que declaran los ViewSets del catálogo
+    (filterset_fields x ordering_fields, más el orden por defecto), ejecuta
+    EXPLAIN (ANALYZE, BUFFERS) de cada una y reporta Seq Scans y Sorts que
+    se van a disco. Propone índices compuestos/cubrientes y, con
+    --write-migration, los escribe como una migración lista para aplicar.
+
+    Uso: python manage.py index_advisor --seed-libros 200000 --write-migration
+
+    Con --seed-* genera un dataset sintético dentro de una transacción que
+    se revierte al final (igual que las estadísticas del ANALYZE).
+    """
+    help = "Asesor de índices basado en los filtros y ordenamientos de los ViewSets."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed-autores', type=int, default=0)
+        parser.add_argument('--seed-libros', type=int, default=0)
+        parser.add_argument('--min-rows', type=int, default=1000,
+                            help="Ignora Seq Scans sobre menos filas que esto.")
+        parser.add_argument('--write-migration', action='store_true')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['seed_autores'] or options['seed_libros']:
+                self._seed(options['seed_autores'] or max(options['seed_libros'] // 20, 1), options['seed_libros'])
+            with connection.cursor() as cursor:
+                for model in (Autor, Libro, Libro.autores.through, LibroListado):
+                    cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+            proposals = {}
+            for prefix, viewset_class, _ in router.registry:
+                if not hasattr(viewset_class, 'get_list_queryset'):
+                    continue
+                for field_filter, params in self._shapes(viewset_class):
+                    self._analyze(viewset_class, prefix, field_filter, params, options, proposals)
+
+            transaction.set_rollback(True)
+
+        proposals = [p for p in proposals.values() if not self._covered(p) and not self._redundant(p, proposals)]
+        if not proposals:
+            self.stdout.write(self.style.SUCCESS("Sin índices que proponer."))
+            return
+
+        self.stdout.write("\nÍndices propuestos:")
+        for proposal in proposals:
+            self.stdout.write(f"  - {proposal['table']} ({', '.join(proposal['columns'])})"
+                              + (f" INCLUDE ({', '.join(proposal['include'])})" if proposal['include'] else '')
+                              + f"  <- {', '.join(sorted(proposal['reasons']))}")
+            if proposal['model'] is not None:
+                self.stdout.write(f"      Meta.indexes de {proposal['model'].__name__}: {self._index_repr(proposal)}")
+
+        if options['write_migration']:
+            path = self._write_migration(proposals)
+            self.stdout.write(self.style.SUCCESS(f"\nMigración escrita en {path}"))
+            self.stdout.write("Añade los índices a Meta.indexes de cada modelo para que makemigrations no los borre.")
+
+    # --- Dataset sintético ---
+
+    def _seed(self, num_autores, num_libros):
+        rng = random.Random(42)
+        autores = Autor.objects.bulk_create([
+            Autor(first_name=f'Nombre {i}', last_name=f'Apellido {i % 2000}', birth_date=date(1850, 1, 1) + timedelta(days=i % 50000))
+            for i in range(num_autores)
+        ], batch_size=5000)
+        libros = Libro.objects.bulk_create([
+            Libro(title=f'Libro {rng.randrange(10 ** 9)}', isbn=f'{8000000000000 + i}',
+                  publication_date=date(1900, 1, 1) + timedelta(days=rng.randrange(125 * 365)))
+            for i in range(num_libros)
+        ], batch_size=5000)
+        LibroAutor = Libro.autores.through
+        LibroAutor.objects.bulk_create([
+            LibroAutor(libro_id=libro.pk, autor_id=autor.pk)
+            for libro in libros
+            for autor in rng.sample(autores, min(rng.choice((1, 1, 2)), len(autores)))
+        ], batch_size=5000)
+        for _ in read_model.rebuild():
+            pass
+        self.stdout.write(f"Dataset sintético: {len(autores)} autores, {len(libros)} libros.")
+
+    # --- Formas de consulta declaradas ---
+
+    def _shapes(self, viewset_class):
+        """
+        Combinaciones (filtro, ordenamiento) declaradas por el ViewSet, con
+        un valor representativo tomado de los datos para cada filtro.
+        """
+        fields = viewset_class.filterset_fields
+        if isinstance(fields, dict):
+            filters = [(field, lookup) for field, lookups in fields.items() for lookup in lookups]
+        else:
+            filters = [(field, 'exact') for field in fields]
+
+        model = viewset_class.queryset.model
+        orderings = [None] + list(viewset_class.ordering_fields)
+        for field_filter in [None] + filters:
+            params = {}
+            if field_filter is not None:
+                field, lookup = field_filter
+                value = self._sample_value(model, field)
+                if value is None:
+                    continue
+                params[field if lookup == 'exact' else f'{field}__{lookup}'] = value
+            for ordering in orderings:
+                yield field_filter, ({**params, 'ordering': ordering} if ordering else params)
+
+    def _sample_value(self, model, field):
+        # Mediana de la columna: un valor real y de selectividad típica
+        values = model.objects.exclude(**{f'{field}__isnull': True}).order_by(field).values_list(field, flat=True)
+        count = values.count()
+        if not count:
+            return None
+        return str(values[count // 2])
+
+    # --- EXPLAIN y heurísticas ---
+
+    def _analyze(self, viewset_class, prefix, field_filter, params, options, proposals):
+        http_request = HttpRequest()
+        http_request.method = 'GET'
+        http_request.GET = QueryDict(mutable=True)
+        http_request.GET.update(params)
+        viewset = viewset_class()
+        queryset = viewset.get_list_queryset(Request(http_request))
+
+        plan = json.loads(queryset.explain(format='json', analyze=True, buffers=True))[0]
+        nodes = list(self._walk(plan['Plan']))
+        label = f"/{prefix}/?{http_request.GET.urlencode()}"
+
+        problems = []
+        for node in nodes:
+            scanned = node.get('Actual Rows', 0) + node.get('Rows Removed by Filter', 0)
+            if node['Node Type'] == 'Seq Scan' and scanned >= options['min_rows']:
+                problems.append(f"Seq Scan en {node['Relation Name']} ({scanned} filas)")
+            if node['Node Type'] == 'Sort':
+                if node.get('Sort Space Type') == 'Disk':
+                    problems.append(f"Sort a disco ({node.get('Sort Space Used')}kB, {node.get('Sort Method')})")
+                elif node.get('Actual Rows', 0) >= options['min_rows']:
+                    problems.append(f"Sort de {node['Actual Rows']} filas")
+
+        self.stdout.write(
+            f"{label:<70} {plan['Execution Time']:>8.1f}ms  buffers={self._buffers(plan['Plan'])}"
+            + (f"  [{'; '.join(problems)}]" if problems else '')
+        )
+        if not problems:
+            return
+
+        # --- Propuestas ---
+        model = queryset.model
+        order_columns = self._order_columns(queryset)
+        sorts = any(problem.startswith('Sort') for problem in problems)
+        if field_filter is None:
+            # Sin filtro: solo un índice en el orden pedido evita ordenar la tabla
+            if sorts and order_columns:
+                self._propose(proposals, model, model._meta.db_table, order_columns, [], label)
+            return
+
+        field, lookup = field_filter
+        relation = model._meta.get_field(field.split('__')[0])
+        if isinstance(relation, models.JSONField):
+            # Contención en JSONB (autores del modelo de lectura): la cubre
+            # un índice GIN, no uno B-tree
+            return
+        if relation.many_to_many:
+            # Filtro por M2M: índice cubriente en la tabla intermedia para un
+            # Index Only Scan (sin visitar la tabla por cada fila)
+            through = relation.remote_field.through
+            table = through._meta.db_table
+            if any(n.get('Relation Name') == table and n['Node Type'] != 'Index Only Scan' for n in nodes):
+                self._propose(proposals, None, table,
+                              [through._meta.get_field(relation.m2m_reverse_field_name()).column],
+                              [through._meta.get_field(relation.m2m_field_name()).column], label)
+            return
+
+        others = [c for c in order_columns if c.lstrip('-') != relation.column]
+        if lookup in EQUALITY_LOOKUPS:
+            # Igualdad + orden: el índice (filtro, orden) evita el Sort
+            columns = [relation.column] + others
+        elif sorts and others:
+            # Rango + orden por otra columna: se recorre el índice en el orden
+            # pedido y el rango se evalúa en el propio índice, sin ir a la tabla
+            columns = others + [relation.column]
+        else:
+            columns = [relation.column]
+        self._propose(proposals, model, model._meta.db_table, columns, [], label)
+
+    def _walk(self, node):
+        yield node
+        for child in node.get('Plans', []):
+            yield from self._walk(child)
+
+    def _buffers(self, node):
+        return node.get('Shared Hit Blocks', 0) + node.get('Shared Read Blocks', 0)
+
+    def _order_columns(self, queryset):
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        columns = []
+        for name in ordering:
+            if not isinstance(name, str):
+                continue
+            descending = name.startswith('-')
+            try:
+                field = queryset.model._meta.get_field(name.lstrip('-'))
+            except Exception:
+                # Orden por una anotación (book_count): no es indexable
+                return []
+            columns.append(('-' if descending else '') + field.column)
+        return columns
+
+    def _propose(self, proposals, model, table, columns, include, reason):
+        key = (table, tuple(columns), tuple(include))
+        proposal = proposals.setdefault(key, {
+            'model': model, 'table': table, 'columns': columns, 'include': include, 'reasons': set(),
+        })
+        proposal['reasons'].add(reason)
+
+    def _covered(self, proposal):
+        """
+        Una propuesta sobra si un índice existente empieza por las mismas
+        columnas (y ya incluye las columnas cubiertas).
+        """
+        wanted = [c.lstrip('-') for c in proposal['columns']] + proposal['include']
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, proposal['table'])
+        return any(
+            (constraint['index'] or constraint['unique'] or constraint['primary_key'])
+            and constraint['columns'][:len(wanted)] == wanted
+            for constraint in constraints.values()
+        )
+
+    def _redundant(self, proposal, proposals):
+        # (title) sobra si también se propone (title, publication_date)
+        return any(
+            other is not proposal and other['table'] == proposal['table'] and not proposal['include']
+            and len(other['columns']) > len(proposal['columns'])
+            and other['columns'][:len(proposal['columns'])] == proposal['columns']
+            for other in proposals.values()
+        )
+
+    # --- Migración ---
+
+    def _index_name(self, proposal):
+        digest = hashlib.sha1(
+            f"{proposal['table']}{proposal['columns']}{proposal['include']}".encode()
+        ).hexdigest()[:6]
+        columns = '_'.join(c.lstrip('-')[:8] for c in proposal['columns'])
+        return f"{proposal['table'].split('_', 1)[-1][:8]}_{columns}"[:22] + f"_{digest}"
+
+    def _index_repr(self, proposal):
+        fields = [c for c in proposal['columns']]
+        return f"models.Index(fields={fields!r}, name={self._index_name(proposal)!r})"
+
+    def _write_migration(self, proposals):
+        operations = []
+        for proposal in proposals:
+            name = self._index_name(proposal)
+            if proposal['model'] is not None:
+                operations.append(AddIndexConcurrently(
+                    model_name=proposal['model']._meta.model_name,
+                    index=models.Index(fields=proposal['columns'], name=name),
+                ))
+            else:
+                # Tabla intermedia auto-creada: no tiene Meta propio, va como SQL
+                quote = connection.ops.quote_name
+                include = ', '.join(quote(c) for c in proposal['include'])
+                operations.append(migrations.RunSQL(
+                    sql=(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {quote(name)} ON {quote(proposal['table'])} "
+                        f"({', '.join(quote(c) for c in proposal['columns'])})"
+                        + (f" INCLUDE ({include})" if include else '')
+                    ),
+                    reverse_sql=f"DROP INDEX CONCURRENTLY IF EXISTS {quote(name)}",
+                ))
+
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        leaf = loader.graph.leaf_nodes('catalog')[0]
+        number = int(leaf[1].split('_', 1)[0]) + 1
+
+        migration = type('Migration', (migrations.Migration,), {
+            # CREATE INDEX CONCURRENTLY no puede ir dentro de una transacción
+            'atomic': False,
+            'dependencies': [leaf],
+            'operations': operations,
+        })(f'{number:04d}_index_advisor', 'catalog')
+        writer = MigrationWriter(migration)
+        # MigrationWriter no serializa 'atomic'
+        content = writer.as_string().replace(
+            'class Migration(migrations.Migration):\n',
+            'class Migration(migrations.Migration):\n    atomic = False\n', 1
+        )
+        with open(writer.path, 'w') as fh:
+            fh.write(content)
+        return os.path.relpath(writer.path)
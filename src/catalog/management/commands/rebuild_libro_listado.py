@@ -0,0 +1,28 @@
+# src/catalog/management/commands/rebuild_libro_listado.py
+
+from django.core.management.base import BaseCommand
+
+from catalog import caching, read_model
+
+
+class Command(BaseCommand):
+    """
+    Reconstruye el modelo de lectura del listado de libros (LibroListado)
+    a partir de Libro y sus autores. Necesario tras crear la tabla y tras
+    cargar datos sin pasar por los servicios (loaddata, SQL a mano).
+    Uso: python manage.py rebuild_libro_listado [--chunk-size 1000]
+    """
+    help = "Reconstruye la tabla desnormalizada del listado de libros."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=read_model.DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        total = 0
+        for written in read_model.rebuild(chunk_size=options['chunk_size']):
+            total += written
+            self.stdout.write(f"  {total} libros...")
+
+        # Las entradas cacheadas pueden referirse a filas que no existían
+        caching.invalidate_lists(caching.LIBROS_LIST)
+        self.stdout.write(self.style.SUCCESS(f"Modelo de lectura reconstruido: {total} libros."))
@@ -0,0 +1,24 @@
+# src/catalog/management/commands/rebuild_similar_books.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from catalog import similar_books
+
+
+class Command(BaseCommand):
+    """
+    Recalcula el índice TF-IDF y los libros similares de todo el catálogo
+    (lo mismo que la tarea diaria 'rebuild-similar-books'). Los libros
+    nuevos o modificados se incorporan solos, sin reconstruir.
+    Uso: python manage.py rebuild_similar_books
+    """
+    help = "Recalcula los libros similares de todo el catálogo."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = similar_books.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Similares recalculados para {total} libros ({time.perf_counter() - started:.2f}s)."
+        ))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:33
+
+import core.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Solo cambia el default (se genera en Python): no hay SQL ni reescritura.
+    # Las filas existentes conservan su ID uuid4, así que los IDs externos no
+    # cambian; las nuevas se insertan al final del índice. Para compactar los
+    # índices ya inflados: REINDEX TABLE CONCURRENTLY catalog_libro (y
+    # catalog_autor, catalog_libro_autores) en una ventana de baja carga.
+
+    dependencies = [
+        ('catalog', '0002_alter_autor_birth_date_alter_autor_last_name_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='autor',
+            name='id',
+            field=models.UUIDField(default=core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='libro',
+            name='id',
+            field=models.UUIDField(default=core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
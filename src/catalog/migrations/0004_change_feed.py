@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:40
+
+import core.ids
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.UUIDField(default=core.ids.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('model', models.CharField(choices=[('autor', 'Autor'), ('libro', 'Libro')], max_length=10, verbose_name='Modelo')),
+                ('object_id', models.UUIDField(verbose_name='ID del objeto borrado')),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha de borrado')),
+            ],
+            options={
+                'verbose_name': 'Borrado',
+                'verbose_name_plural': 'Borrados',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='autor',
+            index=models.Index(fields=['updated_at', 'id'], name='autor_updated_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='libro',
+            index=models.Index(fields=['updated_at', 'id'], name='libro_updated_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['model', 'deleted_at', 'object_id'], name='tombstone_cursor_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:04
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_change_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LibroListado',
+            fields=[
+                ('libro', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='listado', serialize=False, to='catalog.libro')),
+                ('title', models.CharField(max_length=255)),
+                ('summary', models.TextField(blank=True, null=True)),
+                ('isbn', models.CharField(max_length=13, unique=True)),
+                ('publication_date', models.DateField()),
+                ('created_at', models.DateTimeField()),
+                ('version_at', models.DateTimeField()),
+                ('autores', models.JSONField(default=list)),
+                ('search_text', models.TextField(default='')),
+            ],
+            options={
+                'verbose_name': 'Libro (listado)',
+                'verbose_name_plural': 'Libros (listado)',
+                'ordering': ['-publication_date'],
+                'indexes': [models.Index(fields=['publication_date'], name='libro_listado_pub_date_idx'), models.Index(fields=['title'], name='libro_listado_title_idx'), django.contrib.postgres.indexes.GinIndex(fields=['autores'], name='libro_listado_autores_gin', opclasses=['jsonb_path_ops'])],
+            },
+        ),
+    ]
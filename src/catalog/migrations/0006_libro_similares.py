@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_libro_listado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LibroSimilares',
+            fields=[
+                ('libro', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='similares', serialize=False, to='catalog.libro')),
+                ('vecinos', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Libros similares',
+                'verbose_name_plural': 'Libros similares',
+            },
+        ),
+    ]
@@ -1,14 +1,17 @@
 # src/catalog/models.py
 
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
-import uuid
+from django.utils import timezone
+from core.ids import uuid7
 
 class Autor(models.Model):
     """
     Modelo para representar a un Autor.
     """
     #  Hago uso de UUID como Primary de manera a evitar posibles ataques en la secuencialidad del ID
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    #  UUIDv7: ordenado por tiempo (inserciones al final del índice), con 48 bits de timestamp, 12 de contador y 62 aleatorios
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     first_name = models.CharField(max_length=100, verbose_name="Nombre")
     last_name = models.CharField(max_length=100, verbose_name="Apellido", db_index=True)
     biography = models.TextField(blank=True, null=True, verbose_name="Biografía")
@@ -21,6 +24,10 @@ class Autor(models.Model):
         verbose_name = "Autor"
         verbose_name_plural = "Autores"
         ordering = ['last_name', 'first_name']
+        indexes = [
+            # Cursor del feed de cambios (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='autor_updated_at_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.last_name}, {self.first_name}"
@@ -35,7 +42,7 @@ class Libro(models.Model):
     Modelo para representar un Libro.
     La relación con Autor es Muchos a Muchos.
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     title = models.CharField(max_length=255, verbose_name="Título")
     summary = models.TextField(blank=True, null=True, verbose_name="Resumen")
     isbn = models.CharField(max_length=13, unique=True, verbose_name="ISBN", db_index=True)
@@ -55,6 +62,91 @@ class Libro(models.Model):
         verbose_name = "Libro"
         verbose_name_plural = "Libros"
         ordering = ['-publication_date']
+        indexes = [
+            # Cursor del feed de cambios (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='libro_updated_at_id_idx'),
+        ]
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+
+class LibroListado(models.Model):
+    """
+    Modelo de lectura del listado de libros: una fila por libro con sus
+    autores ya unidos (JSONB) y las columnas por las que se filtra, busca y
+    ordena, para que el listado lea una sola tabla sin JOINs.
+    Lo mantienen los servicios de escritura (ver catalog/read_model.py).
+    """
+    libro = models.OneToOneField(Libro, primary_key=True, on_delete=models.CASCADE, related_name='listado')
+    title = models.CharField(max_length=255)
+    summary = models.TextField(blank=True, null=True)
+    isbn = models.CharField(max_length=13, unique=True)
+    publication_date = models.DateField()
+    created_at = models.DateTimeField()
+    # El más reciente entre el updated_at del libro y los de sus autores
+    version_at = models.DateTimeField()
+    # Autores como los muestra el listado (AutorOutputSerializer), en orden
+    autores = models.JSONField(default=list)
+    # Título, resumen y nombres de los autores: la búsqueda es una sola columna
+    search_text = models.TextField(default='')
+
+    class Meta:
+        verbose_name = "Libro (listado)"
+        verbose_name_plural = "Libros (listado)"
+        ordering = ['-publication_date']
+        indexes = [
+            models.Index(fields=['publication_date'], name='libro_listado_pub_date_idx'),
+            models.Index(fields=['title'], name='libro_listado_title_idx'),
+            # Filtro por autor: autores @> '[{"id": ...}]'
+            GinIndex(fields=['autores'], opclasses=['jsonb_path_ops'], name='libro_listado_autores_gin'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class LibroSimilares(models.Model):
+    """
+    Libros más parecidos a un libro (similitud coseno de TF-IDF sobre
+    título, resumen y autores), precalculados por un job de Celery para
+    servir /libros/{id}/similar/ con una lectura por clave primaria.
+    Lo mantiene catalog/similar_books.py.
+    """
+    libro = models.OneToOneField(Libro, primary_key=True, on_delete=models.CASCADE, related_name='similares')
+    # [{'id': ..., 'score': ...}] de más a menos parecido
+    vecinos = models.JSONField(default=list)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Libros similares"
+        verbose_name_plural = "Libros similares"
+
+    def __str__(self):
+        return f"Similares a {self.libro_id}"
+
+
+class Tombstone(models.Model):
+    """
+    Registro de un borrado (Autor o Libro), para que el feed de cambios
+    pueda informarlo aunque la fila ya no exista.
+    """
+    AUTOR = 'autor'
+    LIBRO = 'libro'
+    MODEL_CHOICES = [(AUTOR, 'Autor'), (LIBRO, 'Libro')]
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    model = models.CharField(max_length=10, choices=MODEL_CHOICES, verbose_name="Modelo")
+    object_id = models.UUIDField(verbose_name="ID del objeto borrado")
+    deleted_at = models.DateTimeField(default=timezone.now, verbose_name="Fecha de borrado")
+
+    class Meta:
+        verbose_name = "Borrado"
+        verbose_name_plural = "Borrados"
+        indexes = [
+            # Cursor del feed de cambios (deleted_at, object_id) por modelo
+            models.Index(fields=['model', 'deleted_at', 'object_id'], name='tombstone_cursor_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} ({self.deleted_at:%Y-%m-%d %H:%M})"
@@ -0,0 +1,143 @@
+# src/catalog/read_model.py
+
+import json
+from typing import Iterable, Iterator, List
+
+from django.db import connection
+
+from .models import Autor, Libro, LibroListado
+
+# Columnas que se reescriben al refrescar una fila
+_FIELDS = ['title', 'summary', 'isbn', 'publication_date', 'created_at', 'version_at', 'autores', 'search_text']
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Reemplaza (o quita, con autor NULL) un autor en las filas de sus libros
+# sin leerlas: reordena el array como el listado (apellido, nombre) y
+# recalcula el texto de búsqueda. Usa el índice GIN de 'autores'.
+_UPDATE_AUTOR_SQL = """
+    UPDATE {table} AS listado
+    SET (autores, search_text) = (
+            SELECT COALESCE(jsonb_agg(e ORDER BY e->>'last_name', e->>'first_name'), '[]'::jsonb),
+                   listado.title || chr(10) || COALESCE(listado.summary, '') || COALESCE(string_agg(
+                       chr(10) || (e->>'first_name') || chr(10) || (e->>'last_name'), ''
+                       ORDER BY e->>'last_name', e->>'first_name'), '')
+            FROM (
+                SELECT CASE WHEN elem->>'id' = %(id)s THEN %(autor)s::jsonb ELSE elem END AS e
+                FROM jsonb_array_elements(listado.autores) AS elem
+                WHERE %(autor)s::jsonb IS NOT NULL OR elem->>'id' <> %(id)s
+            ) AS t
+        ),
+        version_at = GREATEST(listado.version_at, %(version_at)s)
+    WHERE listado.autores @> %(match)s::jsonb
+    RETURNING listado.libro_id
+"""
+
+
+def autor_payload(autores: List[Autor]) -> List:
+    """
+    Autores anidados tal como los muestra el listado de libros.
+    """
+    # Import diferido: serializers -> services -> read_model
+    from .serializers import AutorOutputSerializer
+
+    data = AutorOutputSerializer(autores, many=True).data
+    for item in data:
+        # Solo existe si el autor venía anotado: el listado no lo muestra
+        item.pop('book_count', None)
+    return data
+
+
+def _search_text(libro: Libro, autores: List[Autor]) -> str:
+    # Un campo por línea: un término de búsqueda nunca cruza dos campos
+    return '\n'.join([libro.title, libro.summary or ''] + [f'{a.first_name}\n{a.last_name}' for a in autores])
+
+
+def _row(libro: Libro) -> LibroListado:
+    autores = list(libro.autores.all())
+    return LibroListado(
+        libro_id=libro.pk,
+        title=libro.title,
+        summary=libro.summary,
+        isbn=libro.isbn,
+        publication_date=libro.publication_date,
+        created_at=libro.created_at,
+        version_at=max([libro.updated_at] + [autor.updated_at for autor in autores]),
+        autores=autor_payload(autores),
+        search_text=_search_text(libro, autores),
+    )
+
+
+def write_libros(libros: Iterable[Libro]) -> int:
+    """
+    Escribe las filas de los libros dados (con sus autores ya cargados,
+    como los devuelven los servicios) con un solo INSERT .. ON CONFLICT.
+    Se llama dentro de la transacción de la escritura, así que el listado
+    nunca ve un libro a medio actualizar. Los borrados de libros se
+    propagan solos (ON DELETE CASCADE).
+    """
+    rows = [_row(libro) for libro in libros]
+    if rows:
+        LibroListado.objects.bulk_create(rows, update_conflicts=True, unique_fields=['libro'], update_fields=_FIELDS)
+    return len(rows)
+
+
+def refresh_libros(libro_ids: Iterable) -> int:
+    """
+    Relee los libros dados (y sus autores) y reescribe sus filas.
+    """
+    libro_ids = list(libro_ids)
+    if not libro_ids:
+        return 0
+    return write_libros(Libro.objects.filter(pk__in=libro_ids).prefetch_related('autores'))
+
+
+def _update_autor(autor_id, payload, version_at) -> List:
+    table = connection.ops.quote_name(LibroListado._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(_UPDATE_AUTOR_SQL.format(table=table), {
+            'id': str(autor_id),
+            'autor': json.dumps(payload) if payload is not None else None,
+            'version_at': version_at,
+            'match': json.dumps([{'id': str(autor_id)}]),
+        })
+        return [row[0] for row in cursor.fetchall()]
+
+
+def update_autor(autor: Autor) -> List:
+    """
+    Actualiza los datos anidados de un autor en las filas de sus libros,
+    con una sola sentencia. Devuelve los IDs de los libros que cambió.
+    """
+    return _update_autor(autor.pk, autor_payload([autor])[0], autor.updated_at)
+
+
+def remove_autor(autor_id, version_at) -> List:
+    """
+    Quita un autor borrado de las filas de sus libros. Devuelve los IDs
+    de los libros que cambió.
+    """
+    return _update_autor(autor_id, None, version_at)
+
+
+def _chunked_ids(chunk_size: int) -> Iterator[List]:
+    # Paginación por clave (keyset): cada lote empieza tras el último ID
+    last = None
+    while True:
+        queryset = Libro.objects.order_by('pk').values_list('pk', flat=True)
+        if last is not None:
+            queryset = queryset.filter(pk__gt=last)
+        ids = list(queryset[:chunk_size])
+        if not ids:
+            return
+        yield ids
+        last = ids[-1]
+
+
+def rebuild(chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[int]:
+    """
+    Reconstruye el modelo de lectura completo por lotes de libros. Devuelve
+    (generador) cuántas filas se escribieron en cada lote.
+    """
+    for ids in _chunked_ids(chunk_size):
+        yield refresh_libros(ids)
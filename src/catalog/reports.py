@@ -0,0 +1,176 @@
+# src/catalog/reports.py
+
+import hashlib
+import json
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Iterator, List
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Autor, Libro
+
+# Los reportes se guardan en el storage por defecto (disco local o un
+# object store si se configura, p. ej. django-storages con S3)
+REPORTS_DIR = 'reports/autores'
+
+# Autores por lote en el modo batch: unas pocas consultas por lote,
+# no por autor
+DEFAULT_CHUNK_SIZE = 500
+
+LibroAutor = Libro.autores.through
+
+
+def report_path(author_id, fingerprint: str) -> str:
+    return f'{REPORTS_DIR}/{author_id}/{fingerprint}.json'
+
+
+def _fingerprint(autor: Autor) -> str:
+    """
+    Huella de los datos de los que depende el reporte: el autor, sus libros
+    y los co-autores. Si no cambia, el reporte guardado sigue siendo válido.
+    """
+    parts = [
+        autor.updated_at.isoformat(),
+        str(autor.book_count),
+        autor.books_updated_at.isoformat() if autor.books_updated_at else '',
+        autor.coautores_updated_at.isoformat() if autor.coautores_updated_at else '',
+    ]
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()[:16]
+
+
+def _chunk_autores(author_ids: List) -> List[Autor]:
+    """
+    Una sola consulta agrupada para todo el lote con lo necesario
+    para calcular la huella de cada autor.
+    """
+    return list(
+        Autor.objects.filter(pk__in=author_ids).annotate(
+            book_count=Count('libros', distinct=True),
+            books_updated_at=Max('libros__updated_at'),
+            coautores_updated_at=Max('libros__autores__updated_at'),
+        ).order_by()
+    )
+
+
+def _build_chunk_reports(autores: List[Autor]) -> Dict:
+    """
+    Construye los reportes de un lote de autores con dos consultas:
+    libros de los autores y autores de esos libros (para los co-autores).
+    """
+    ids = [autor.pk for autor in autores]
+    libros_por_autor = defaultdict(list)
+    libro_ids = set()
+
+    rows = LibroAutor.objects.filter(autor_id__in=ids).values_list(
+        'autor_id', 'libro_id', 'libro__title', 'libro__isbn', 'libro__publication_date'
+    ).order_by('libro__publication_date', 'libro__title')
+    for autor_id, libro_id, title, isbn, publication_date in rows.iterator(chunk_size=2000):
+        libros_por_autor[autor_id].append({
+            'id': libro_id,
+            'title': title,
+            'isbn': isbn,
+            'publication_date': publication_date,
+        })
+        libro_ids.add(libro_id)
+
+    autores_por_libro = defaultdict(list)
+    nombres = {}
+    rows = LibroAutor.objects.filter(libro_id__in=libro_ids).values_list(
+        'libro_id', 'autor_id', 'autor__first_name', 'autor__last_name'
+    )
+    for libro_id, autor_id, first_name, last_name in rows.iterator(chunk_size=2000):
+        autores_por_libro[libro_id].append(autor_id)
+        nombres[autor_id] = f'{first_name} {last_name}'
+
+    reports = {}
+    for autor in autores:
+        libros = libros_por_autor[autor.pk]
+
+        coautores = Counter(
+            coautor_id
+            for libro in libros
+            for coautor_id in autores_por_libro[libro['id']]
+            if coautor_id != autor.pk
+        )
+        timeline = Counter(libro['publication_date'].year for libro in libros)
+
+        reports[autor.pk] = {
+            'autor': {
+                'id': autor.pk,
+                'first_name': autor.first_name,
+                'last_name': autor.last_name,
+                'full_name': autor.full_name,
+                'birth_date': autor.birth_date,
+                'biography': autor.biography,
+            },
+            'libros': libros,
+            'coautores': [
+                {'id': coautor_id, 'full_name': nombres[coautor_id], 'shared_books': shared}
+                for coautor_id, shared in coautores.most_common()
+            ],
+            'timeline': [
+                {'year': year, 'libros': count} for year, count in sorted(timeline.items())
+            ],
+        }
+    return reports
+
+
+def _save_report(path: str, report: Dict, fingerprint: str):
+    report = {**report, 'fingerprint': fingerprint, 'generated_at': timezone.now()}
+    content = json.dumps(report, cls=DjangoJSONEncoder, ensure_ascii=False).encode()
+    # El nombre es determinista: si otro worker ya lo escribió, es el mismo contenido
+    if not default_storage.exists(path):
+        default_storage.save(path, ContentFile(content))
+
+    # Borro las versiones anteriores del reporte de este autor
+    directory, filename = path.rsplit('/', 1)
+    _, files = default_storage.listdir(directory)
+    for old in files:
+        if old != filename:
+            default_storage.delete(f'{directory}/{old}')
+
+
+def _chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate_reports(author_ids: Iterable = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict]:
+    """
+    Genera (o reutiliza) los reportes de los autores dados, por lotes.
+    Sin 'author_ids' recorre todos los autores.
+    Por cada autor devuelve {'author_id', 'path', 'cached'}.
+    """
+    if author_ids is None:
+        author_ids = Autor.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=chunk_size)
+
+    for chunk in _chunked(author_ids, chunk_size):
+        autores = _chunk_autores(chunk)
+
+        pendientes = []
+        for autor in autores:
+            fingerprint = _fingerprint(autor)
+            path = report_path(autor.pk, fingerprint)
+            if default_storage.exists(path):
+                # --- Reporte reutilizado: nada cambió desde la última vez ---
+                yield {'author_id': str(autor.pk), 'path': path, 'cached': True}
+            else:
+                pendientes.append((autor, fingerprint, path))
+
+        if not pendientes:
+            continue
+
+        reports = _build_chunk_reports([autor for autor, _, _ in pendientes])
+        for autor, fingerprint, path in pendientes:
+            _save_report(path, reports[autor.pk], fingerprint)
+            yield {'author_id': str(autor.pk), 'path': path, 'cached': False}
@@ -1,7 +1,12 @@
 # src/catalog/serializers.py
 
+import uuid
+
+from django.conf import settings
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
-from .models import Autor, Libro 
+from .models import Autor, Libro, LibroListado
+from . import services
 
 # --- Serializers de SALIDA (Output) ---
 
@@ -49,6 +54,115 @@ class LibroOutputSerializer(serializers.ModelSerializer):
             'created_at'
         )
 
+class LibroListadoOutputSerializer(serializers.ModelSerializer):
+    """
+    Libro del listado leído del modelo de lectura. Produce el mismo JSON
+    que LibroOutputSerializer: los autores ya vienen serializados en la
+    fila y solo se restablece el orden de sus claves (JSONB no lo guarda).
+    """
+    id = serializers.UUIDField(source='pk', read_only=True)
+    autores = serializers.SerializerMethodField()
+
+    class Meta:
+        model = LibroListado
+        fields = LibroOutputSerializer.Meta.fields
+
+    @extend_schema_field(AutorOutputSerializer(many=True))
+    def get_autores(self, obj):
+        keys = AutorOutputSerializer.Meta.fields
+        return [{key: autor[key] for key in keys if key in autor} for autor in obj.autores]
+
+class LibroUpsertOutputSerializer(serializers.Serializer):
+    """
+    Resultado de un upsert por ISBN: el libro y si se creó o se actualizó.
+    """
+    created = serializers.BooleanField()
+    libro = LibroOutputSerializer()
+
+class AutorBatchItemOutputSerializer(serializers.Serializer):
+    """
+    Un elemento de /autores/batch/: 'found' es False (y 'data' null) si no existe.
+    """
+    id = serializers.UUIDField()
+    found = serializers.BooleanField()
+    data = AutorOutputSerializer(allow_null=True)
+
+class LibroBatchItemOutputSerializer(serializers.Serializer):
+    """
+    Un elemento de /libros/batch/: 'found' es False (y 'data' null) si no existe.
+    """
+    id = serializers.UUIDField()
+    found = serializers.BooleanField()
+    data = LibroOutputSerializer(allow_null=True)
+
+class AutorChangeOutputSerializer(serializers.Serializer):
+    """
+    Un cambio del feed de autores: op='upsert' con el autor en 'data',
+    u op='delete' con 'data' null.
+    """
+    op = serializers.ChoiceField(choices=['upsert', 'delete'])
+    id = serializers.UUIDField()
+    data = AutorOutputSerializer(allow_null=True)
+
+class LibroChangeOutputSerializer(serializers.Serializer):
+    """
+    Un cambio del feed de libros: op='upsert' con el libro en 'data',
+    u op='delete' con 'data' null.
+    """
+    op = serializers.ChoiceField(choices=['upsert', 'delete'])
+    id = serializers.UUIDField()
+    data = LibroOutputSerializer(allow_null=True)
+
+class AutorChangeFeedOutputSerializer(serializers.Serializer):
+    results = AutorChangeOutputSerializer(many=True)
+    next_cursor = serializers.CharField()
+    has_more = serializers.BooleanField()
+
+class LibroChangeFeedOutputSerializer(serializers.Serializer):
+    results = LibroChangeOutputSerializer(many=True)
+    next_cursor = serializers.CharField()
+    has_more = serializers.BooleanField()
+
+class CoautorOutputSerializer(serializers.Serializer):
+    """
+    Un co-autor directo, con los libros que comparte con el autor.
+    """
+    id = serializers.UUIDField()
+    full_name = serializers.CharField()
+    libros_compartidos = serializers.IntegerField(source='weight')
+
+class CoautorSegundoGradoOutputSerializer(serializers.Serializer):
+    """
+    Un co-autor de sus co-autores, con cuántos co-autores tienen en común.
+    """
+    id = serializers.UUIDField()
+    full_name = serializers.CharField()
+    coautores_en_comun = serializers.IntegerField(source='weight')
+
+class CoautoresOutputSerializer(serializers.Serializer):
+    coautores = CoautorOutputSerializer(many=True)
+    segundo_grado = CoautorSegundoGradoOutputSerializer(many=True)
+
+class LibroSimilarOutputSerializer(serializers.Serializer):
+    """
+    Un libro parecido, con su similitud (coseno, de 0 a 1).
+    """
+    score = serializers.FloatField()
+    libro = LibroListadoOutputSerializer()
+
+class ReportJobOutputSerializer(serializers.Serializer):
+    """
+    Serializer para mostrar el estado de un job de reporte.
+    """
+    job_id = serializers.CharField()
+    status = serializers.CharField()
+    author_id = serializers.CharField(allow_null=True)
+    progress = serializers.DictField(allow_null=True)
+    cached = serializers.BooleanField(allow_null=True)
+    error = serializers.CharField(allow_null=True)
+    status_url = serializers.CharField()
+    result_url = serializers.CharField()
+
 
 # --- Serializers de ENTRADA (Input) ---
 # Defino los campos que se aceptam para crear/actualizar
@@ -77,4 +191,78 @@ class LibroInputSerializer(serializers.Serializer):
         child=serializers.UUIDField(),
         allow_empty=False, 
         write_only=True
-    )
\ No newline at end of file
+    )
+
+
+# Máximo de libros por petición en el upsert en lote
+LIBRO_UPSERT_MAX_BATCH = 500
+
+class LibroUpsertBatchInputSerializer(serializers.Serializer):
+    """
+    Valida el lote de libros a crear/actualizar por ISBN.
+    """
+    libros = LibroInputSerializer(many=True, allow_empty=False, max_length=LIBRO_UPSERT_MAX_BATCH)
+
+
+class BatchIdsInputSerializer(serializers.Serializer):
+    """
+    Valida el query param 'ids' de los endpoints batch: UUIDs separados
+    por comas, como mucho CATALOG_BATCH['MAX_IDS'].
+    """
+    ids = serializers.CharField()
+
+    def validate_ids(self, value):
+        parts = [part.strip() for part in value.split(',') if part.strip()]
+        max_ids = settings.CATALOG_BATCH['MAX_IDS']
+        if not parts:
+            raise serializers.ValidationError("Indica al menos un ID.")
+        if len(parts) > max_ids:
+            raise serializers.ValidationError(f"Como máximo {max_ids} IDs por petición.")
+        try:
+            return [uuid.UUID(part) for part in parts]
+        except ValueError:
+            raise serializers.ValidationError("Todos los IDs deben ser UUIDs válidos.")
+
+class ChangeFeedInputSerializer(serializers.Serializer):
+    """
+    Valida los query params del feed de cambios: 'since' (el next_cursor
+    de la página anterior; sin él se empieza desde el principio) y 'limit'.
+    """
+    since = serializers.CharField(required=False)
+    limit = serializers.IntegerField(required=False, min_value=1)
+
+    def validate_since(self, value):
+        try:
+            return services.decode_change_cursor(value)
+        except ValueError:
+            raise serializers.ValidationError("Cursor inválido.")
+
+    def validate_limit(self, value):
+        max_limit = settings.CHANGE_FEED['MAX_LIMIT']
+        if value > max_limit:
+            raise serializers.ValidationError(f"Como máximo {max_limit} cambios por página.")
+        return value
+
+class CoautoresInputSerializer(serializers.Serializer):
+    """
+    Valida el query param 'limit' (máximo de resultados de cada lista).
+    """
+    limit = serializers.IntegerField(required=False, min_value=1)
+
+    def validate_limit(self, value):
+        max_limit = settings.COAUTHOR_GRAPH['MAX_LIMIT']
+        if value > max_limit:
+            raise serializers.ValidationError(f"Como máximo {max_limit} autores por lista.")
+        return value
+
+class SimilaresInputSerializer(serializers.Serializer):
+    """
+    Valida el query param 'limit' (como mucho los TOP_K precalculados).
+    """
+    limit = serializers.IntegerField(required=False, min_value=1)
+
+    def validate_limit(self, value):
+        max_limit = settings.SIMILAR_BOOKS['TOP_K']
+        if value > max_limit:
+            raise serializers.ValidationError(f"Como máximo {max_limit} libros similares.")
+        return value
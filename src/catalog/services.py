@@ -1,12 +1,25 @@
 # src/catalog/services.py
 
-from django.db import transaction
-from django.db.models import Count
-from .models import Autor, Libro
-from core.exceptions import ResourceNotFoundError, BusinessValidationError, DuplicateResourceError
-from typing import List, Dict, Any
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, Exists, F, Func, JSONField, Value
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from .models import Autor, Libro, LibroListado, LibroSimilares, Tombstone
+from . import coauthors, events, read_model, similar_books
+from core.ids import uuid7
+from core.exceptions import (
+    ResourceNotFoundError, BusinessValidationError, DuplicateResourceError, ResourceNotReadyError,
+    CursorExpiredError, ServiceWarmingUpError
+)
+from typing import List, Dict, Any, NamedTuple, Tuple
+from datetime import datetime, timedelta
+import base64
 import uuid
 
+LibroAutor = Libro.autores.through
+
 # --- Servicios de AUTOR ---
 
 def list_autores():
@@ -26,6 +39,7 @@ def create_autor(*, data: Dict[str, Any]) -> Autor:
     'data' es un diccionario ya validado por el serializer.
     """
     autor = Autor.objects.create(**data)
+    events.record('autor', autor.pk, events.CREATE, data.keys(), events.version_of(autor.updated_at))
     return autor
 
 def get_autor(*, pk: uuid.UUID) -> Autor:
@@ -38,23 +52,145 @@ def get_autor(*, pk: uuid.UUID) -> Autor:
     except Autor.DoesNotExist:
         raise ResourceNotFoundError(detail=f"Autor con id={pk} no encontrado.")
 
+def get_autores_by_ids(*, ids) -> List[Autor]:
+    """
+    Servicio para obtener varios autores por PK en una sola consulta.
+    Los que no existen simplemente no aparecen.
+    """
+    return list(Autor.objects.filter(pk__in=ids))
+
+def get_coautores(*, pk, limit: int) -> Dict[str, List]:
+    """
+    Servicio para obtener los co-autores de un autor (por libros
+    compartidos) y sus conexiones de segundo grado (por co-autores en
+    común), desde el grafo precalculado: sin consultas a la DB salvo para
+    un autor sin co-autores. Los cambios llegan al grafo con unos segundos
+    de retraso (ver coauthors.mark_dirty).
+    Lanza ResourceNotFoundError si el autor no existe y ServiceWarmingUpError
+    si el grafo aún no está construido (ya se programó su construcción).
+    """
+    try:
+        autor_id = uuid.UUID(str(pk))
+    except ValueError:
+        raise ResourceNotFoundError(detail=f"Autor con id={pk} no encontrado.")
+
+    graph = coauthors.get_graph()
+    if graph is None:
+        if not Autor.objects.filter(pk=autor_id).exists():
+            raise ResourceNotFoundError(detail=f"Autor con id={pk} no encontrado.")
+        raise ServiceWarmingUpError()
+    node = graph.node(autor_id)
+    if node is None:
+        # Fuera del grafo: o no tiene co-autores o no existe
+        if not Autor.objects.filter(pk=autor_id).exists():
+            raise ResourceNotFoundError(detail=f"Autor con id={pk} no encontrado.")
+        return {'coautores': [], 'segundo_grado': []}
+    return {'coautores': graph.coauthors(node, limit), 'segundo_grado': graph.second_degree(node, limit)}
+
+@transaction.atomic
 def update_autor(*, autor: Autor, data: Dict[str, Any]) -> Autor:
     """
     Servicio para actualizar un autor existente.
     Recibe la instancia del autor y los datos validados.
+    Solo escribe las columnas que cambian (un único UPDATE), más el UPDATE
+    de sus datos anidados en el modelo de lectura de sus libros.
     """
-    autor.first_name = data.get('first_name', autor.first_name)
-    autor.last_name = data.get('last_name', autor.last_name)
-    autor.biography = data.get('biography', autor.biography)
-    autor.birth_date = data.get('birth_date', autor.birth_date)
-    autor.save()
+    changed = _apply_changes(autor, data, ('first_name', 'last_name', 'biography', 'birth_date'))
+    if changed:
+        autor.save(update_fields=changed + ['updated_at'])
+        libro_ids = read_model.update_autor(autor)
+        if {'first_name', 'last_name'} & set(changed):
+            # El grafo de co-autoría guarda los nombres, y el texto de los
+            # libros (similares) incluye a sus autores
+            coauthors.mark_dirty([autor.pk])
+            similar_books.mark_dirty(libro_ids)
+        events.record('autor', autor.pk, events.UPDATE, changed, events.version_of(autor.updated_at))
     return autor
 
+@transaction.atomic
 def delete_autor(*, autor: Autor):
     """
     Servicio para eliminar un autor.
+    Deja un registro del borrado para el feed de cambios, y marca como
+    modificados sus libros (pierden al autor).
     """
+    now = timezone.now()
+    libro_ids = list(Libro.objects.filter(autores=autor).values_list('pk', flat=True))
+    if libro_ids:
+        Libro.objects.filter(pk__in=libro_ids).update(updated_at=now)
+    tombstone = Tombstone.objects.create(model=Tombstone.AUTOR, object_id=autor.pk, deleted_at=now)
+    autor_id = autor.pk
     autor.delete()
+    if libro_ids:
+        read_model.remove_autor(autor_id, now)
+        coauthors.mark_dirty([autor_id])
+        similar_books.mark_dirty(libro_ids)
+
+    version = events.version_of(tombstone.deleted_at)
+    events.record('autor', autor_id, events.DELETE, [], version)
+    for libro_id in libro_ids:
+        events.record('libro', libro_id, events.UPDATE, ['autores'], version)
+
+
+# Fusión de autores: los pares de los duplicados se borran y se insertan
+# con el autor que queda, dos sentencias sin importar cuántos libros haya;
+# ON CONFLICT descarta los libros que ya tenía (co-autores de sí mismo)
+_DELETE_MERGED_AUTORES_SQL = """
+    DELETE FROM {through}
+    WHERE autor_id = ANY(%s::uuid[])
+    RETURNING libro_id
+"""
+_INSERT_MERGED_AUTORES_SQL = """
+    INSERT INTO {through} (libro_id, autor_id)
+    SELECT DISTINCT libro_id, %s::uuid FROM unnest(%s::uuid[]) AS libro_id
+    ON CONFLICT (libro_id, autor_id) DO NOTHING
+"""
+
+@transaction.atomic
+def merge_autores(*, target: Autor, duplicates: List[Autor]) -> List[uuid.UUID]:
+    """
+    Servicio para fusionar autores duplicados en 'target': sus libros pasan
+    a 'target' en bloque (sobre la tabla intermedia) y los duplicados se
+    eliminan, con su registro de borrado para el feed de cambios.
+    Devuelve los IDs de los libros que cambiaron de autor.
+    Lanza BusinessValidationError si 'target' está entre los duplicados.
+    """
+    duplicate_ids = [autor.pk for autor in duplicates]
+    if target.pk in duplicate_ids:
+        raise BusinessValidationError(detail="Un autor no puede fusionarse consigo mismo.")
+    if not duplicate_ids:
+        return []
+
+    through_table = connection.ops.quote_name(LibroAutor._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(_DELETE_MERGED_AUTORES_SQL.format(through=through_table), [[str(pk) for pk in duplicate_ids]])
+        libro_ids = sorted({row[0] for row in cursor.fetchall()})
+        if libro_ids:
+            cursor.execute(
+                _INSERT_MERGED_AUTORES_SQL.format(through=through_table),
+                [str(target.pk), [str(pk) for pk in libro_ids]],
+            )
+
+    now = timezone.now()
+    if libro_ids:
+        Libro.objects.filter(pk__in=libro_ids).update(updated_at=now)
+    Tombstone.objects.bulk_create([
+        Tombstone(model=Tombstone.AUTOR, object_id=autor_id, deleted_at=now) for autor_id in duplicate_ids
+    ])
+    Autor.objects.filter(pk__in=duplicate_ids).delete()
+
+    if libro_ids:
+        read_model.refresh_libros(libro_ids)
+        coauthors.mark_dirty(duplicate_ids + [target.pk])
+        # El texto de los libros incluye a sus autores
+        similar_books.mark_dirty(libro_ids)
+
+    version = events.version_of(now)
+    for autor_id in duplicate_ids:
+        events.record('autor', autor_id, events.DELETE, [], version)
+    for libro_id in libro_ids:
+        events.record('libro', libro_id, events.UPDATE, ['autores'], version)
+    return libro_ids
 
 
 # --- Servicios de LIBRO ---
@@ -67,32 +203,98 @@ def list_libros():
     queryset = Libro.objects.all().prefetch_related('autores')
     return queryset
 
-@transaction.atomic
-def create_libro(*, data: Dict[str, Any]) -> Libro:
+def list_libros_listado():
     """
-    Servicio para crear un nuevo libro.
-    Maneja la lógica M2M y validaciones de negocio.
+    Servicio para el listado de libros: lee el modelo de lectura
+    (una fila por libro con sus autores ya unidos), sin JOINs.
     """
-    # --- Validación de Negocio 1: ISBN Único ---
-    isbn = data.get('isbn')
-    if Libro.objects.filter(isbn=isbn).exists():
+    return LibroListado.objects.all()
+
+def get_libros_listado_by_ids(*, ids) -> List[LibroListado]:
+    return list(LibroListado.objects.filter(pk__in=ids))
+
+def _apply_changes(instance, data: Dict[str, Any], fields) -> List[str]:
+    """
+    Asigna a la instancia los campos presentes en 'data' y devuelve
+    los que realmente cambiaron.
+    """
+    changed = []
+    for field in fields:
+        if field in data and getattr(instance, field) != data[field]:
+            setattr(instance, field, data[field])
+            changed.append(field)
+    return changed
+
+def _validate_libro_write(*, isbn: str, autores_ids, exclude_pk=None) -> List[Autor]:
+    """
+    Valida en una sola consulta que el ISBN esté libre y que existan los
+    autores, y devuelve esos autores (para no volver a leerlos después).
+    Con 'autores_ids=None' solo valida el ISBN, y con 'isbn=None' solo los autores.
+    """
+    isbn_taken = Libro.objects.filter(isbn=isbn).exclude(pk=exclude_pk)
+
+    if autores_ids is None:
+        if isbn is not None and isbn_taken.exists():
+            raise DuplicateResourceError(detail=f"Ya existe un libro con el ISBN {isbn}.")
+        return None
+
+    requested = set(autores_ids)
+    autores = list(Autor.objects.filter(id__in=requested).annotate(
+        isbn_taken=Exists(isbn_taken) if isbn is not None else Value(False)
+    ))
+
+    # Si ningún autor existe, la consulta no trae la marca del ISBN:
+    # en ese camino (de error) la compruebo aparte
+    if autores[0].isbn_taken if autores else (isbn is not None and isbn_taken.exists()):
         raise DuplicateResourceError(detail=f"Ya existe un libro con el ISBN {isbn}.")
 
-    autores_ids = data.pop('autores', [])
-    
-    # --- Validación de Negocio 2: Autores existen ---
-    autores = Autor.objects.filter(id__in=autores_ids)
-    if autores.count() != len(autores_ids):
-        found_ids = set(autores.values_list('id', flat=True))
+    if len(autores) != len(requested):
+        found_ids = {autor.id for autor in autores}
         invalid_ids = [str(uid) for uid in autores_ids if uid not in found_ids]
         raise BusinessValidationError(detail=f"IDs de autor no encontrados: {invalid_ids}")
-    
-    # Creamos el libro
+    return autores
+
+def _set_prefetched_autores(libro: Libro, autores: List[Autor]):
+    """
+    Deja los autores en la caché de prefetch del libro, como si vinieran de
+    prefetch_related('autores'): el serializer de salida no vuelve a consultar.
+    """
+    queryset = libro.autores.all()
+    queryset._result_cache = autores
+    queryset._prefetch_done = True
+    libro._prefetched_objects_cache = {'autores': queryset}
+
+def create_libro(*, data: Dict[str, Any]) -> Libro:
+    """
+    Servicio para crear un nuevo libro.
+    Maneja la lógica M2M y validaciones de negocio.
+    Una consulta de validación, el INSERT del libro y un INSERT en bloque
+    de la tabla intermedia. Devuelve el libro con sus autores ya cargados.
+    """
+    data = dict(data)
+    autores_ids = data.pop('autores', [])
+    try:
+        return _create_libro(data=data, autores_ids=autores_ids)
+    except IntegrityError:
+        # Otro libro con el mismo ISBN se creó entre la validación y el INSERT
+        raise DuplicateResourceError(detail=f"Ya existe un libro con el ISBN {data.get('isbn')}.")
+
+@transaction.atomic
+def _create_libro(*, data: Dict[str, Any], autores_ids) -> Libro:
+    # --- Validaciones de Negocio: ISBN único y autores existen ---
+    autores = _validate_libro_write(isbn=data.get('isbn'), autores_ids=autores_ids)
+
+    # El UUID y las fechas se generan en Python: la instancia ya está completa
+    # tras el INSERT, no hace falta RETURNING ni releerla
     libro = Libro.objects.create(**data)
-    
-    # Asignamos autores
-    libro.autores.set(autores)
-    
+
+    LibroAutor.objects.bulk_create([LibroAutor(libro_id=libro.pk, autor_id=autor.pk) for autor in autores])
+    _set_prefetched_autores(libro, autores)
+    read_model.write_libros([libro])
+    if len(autores) > 1:
+        coauthors.mark_dirty(autor.pk for autor in autores)
+    similar_books.mark_dirty([libro.pk])
+    events.record('libro', libro.pk, events.CREATE, [*data.keys(), 'autores'], events.version_of(libro.updated_at))
     return libro
 
 def get_libro(*, pk: uuid.UUID) -> Libro:
@@ -106,40 +308,480 @@ def get_libro(*, pk: uuid.UUID) -> Libro:
     except Libro.DoesNotExist:
         raise ResourceNotFoundError(detail=f"Libro con id={pk} no encontrado.")
 
-@transaction.atomic
+def get_libros_by_ids(*, ids) -> List[Libro]:
+    """
+    Servicio para obtener varios libros por PK: una consulta y un prefetch
+    de autores para todo el lote.
+    """
+    return list(Libro.objects.filter(pk__in=ids).prefetch_related('autores'))
+
+def get_libros_similares(*, pk, limit: int) -> List[Dict[str, Any]]:
+    """
+    Servicio para obtener los libros más parecidos a uno (TF-IDF de título,
+    resumen y autores), precalculados por el job de similares: una lectura
+    por clave primaria más la de esos libros en el modelo de lectura.
+    Un libro recién creado devuelve una lista vacía hasta que el job lo
+    procesa (unos segundos).
+    Lanza ResourceNotFoundError si el libro no existe.
+    """
+    try:
+        libro_id = uuid.UUID(str(pk))
+    except ValueError:
+        raise ResourceNotFoundError(detail=f"Libro con id={pk} no encontrado.")
+
+    vecinos = LibroSimilares.objects.filter(libro_id=libro_id).values_list('vecinos', flat=True).first()
+    if vecinos is None:
+        if not Libro.objects.filter(pk=libro_id).exists():
+            raise ResourceNotFoundError(detail=f"Libro con id={pk} no encontrado.")
+        return []
+
+    # Los libros borrados desde el último cálculo simplemente no aparecen
+    listados = {listado.pk: listado for listado in get_libros_listado_by_ids(ids=[v['id'] for v in vecinos])}
+    similares = [
+        {'score': vecino['score'], 'libro': listados[uuid.UUID(vecino['id'])]}
+        for vecino in vecinos if uuid.UUID(vecino['id']) in listados
+    ]
+    return similares[:limit]
+
 def update_libro(*, libro: Libro, data: Dict[str, Any]) -> Libro:
     """
     Servicio para actualizar un libro.
+    Una consulta de validación, un UPDATE de las columnas que cambian y,
+    si cambian los autores, solo el DELETE/INSERT de las filas intermedias
+    que difieren. Se espera el libro con sus autores precargados (get_libro).
     """
-    # --- Validación de Negocio 1: ISBN Único (si cambia) ---
+    data = dict(data)
+    autores_ids = data.pop('autores', None)
+    try:
+        return _update_libro(libro=libro, data=data, autores_ids=autores_ids)
+    except IntegrityError:
+        raise DuplicateResourceError(detail=f"Ya existe otro libro con el ISBN {data.get('isbn')}.")
+
+@transaction.atomic
+def _update_libro(*, libro: Libro, data: Dict[str, Any], autores_ids) -> Libro:
+    # --- Validaciones de Negocio: ISBN único (si cambia) y autores existen ---
     isbn = data.get('isbn', libro.isbn)
-    if isbn != libro.isbn and Libro.objects.filter(isbn=isbn).exists():
-        raise DuplicateResourceError(detail=f"Ya existe otro libro con el ISBN {isbn}.")
+    autores = _validate_libro_write(
+        isbn=isbn if isbn != libro.isbn else None,
+        autores_ids=autores_ids,
+        exclude_pk=libro.pk,
+    )
 
-    autores_ids = data.pop('autores', None)
+    changed = _apply_changes(libro, data, ('title', 'summary', 'isbn', 'publication_date'))
+    old_ids = {autor.pk for autor in libro.autores.all()}
+    new_ids = {autor.pk for autor in autores} if autores is not None else old_ids
+    # Cambiar solo los autores también cuenta como modificación (feed de cambios)
+    if changed or old_ids != new_ids:
+        libro.save(update_fields=changed + ['updated_at'])
 
-    # Actualizamos campos simples
-    libro.title = data.get('title', libro.title)
-    libro.summary = data.get('summary', libro.summary)
-    libro.isbn = isbn
-    libro.publication_date = data.get('publication_date', libro.publication_date)
-    
-    # Si se proporcionó una nueva lista de autores, la actualizamos
-    if autores_ids is not None:
-        # --- Validación de Negocio 2: Autores existen ---
-        autores = Autor.objects.filter(id__in=autores_ids)
-        if autores.count() != len(autores_ids):
-            found_ids = set(autores.values_list('id', flat=True))
-            invalid_ids = [str(uid) for uid in autores_ids if uid not in found_ids]
-            raise BusinessValidationError(detail=f"IDs de autor no encontrados: {invalid_ids}")
-        
-        libro.autores.set(autores)
-        
-    libro.save()
+    # Si se proporcionó una nueva lista de autores, solo toco lo que cambia
+    if autores is not None:
+        if old_ids - new_ids:
+            LibroAutor.objects.filter(libro_id=libro.pk, autor_id__in=old_ids - new_ids).delete()
+        if new_ids - old_ids:
+            LibroAutor.objects.bulk_create([
+                LibroAutor(libro_id=libro.pk, autor_id=autor_id) for autor_id in new_ids - old_ids
+            ])
+        _set_prefetched_autores(libro, autores)
+
+    if old_ids != new_ids:
+        changed.append('autores')
+        # Solo cambian los pares en los que está un autor que entra o sale
+        coauthors.mark_dirty(old_ids ^ new_ids)
+    if changed:
+        read_model.write_libros([libro])
+        if {'title', 'summary', 'autores'} & set(changed):
+            similar_books.mark_dirty([libro.pk])
+        events.record('libro', libro.pk, events.UPDATE, changed, events.version_of(libro.updated_at))
     return libro
 
+@transaction.atomic
 def delete_libro(*, libro: Libro):
     """
     Servicio para eliminar un libro.
+    Deja un registro del borrado para el feed de cambios.
+    """
+    tombstone = Tombstone.objects.create(model=Tombstone.LIBRO, object_id=libro.pk)
+    libro_id = libro.pk
+    autor_ids = [autor.pk for autor in libro.autores.all()]
+    libro.delete()
+    if len(autor_ids) > 1:
+        coauthors.mark_dirty(autor_ids)
+    events.record('libro', libro_id, events.DELETE, [], events.version_of(tombstone.deleted_at))
+
+
+# --- Upsert de libros por ISBN (ingesta idempotente) ---
+
+# Un solo INSERT ... ON CONFLICT sobre el índice único de isbn: no hay
+# ventana entre comprobar e insertar, y repetir la petición da el mismo
+# resultado. updated_at solo cambia si cambian los datos, y (xmax = 0)
+# distingue las filas insertadas de las actualizadas.
+_UPSERT_LIBROS_SQL = """
+    INSERT INTO {libro} (id, title, summary, isbn, publication_date, created_at, updated_at)
+    VALUES {values}
+    ON CONFLICT (isbn) DO UPDATE SET
+        title = EXCLUDED.title,
+        summary = EXCLUDED.summary,
+        publication_date = EXCLUDED.publication_date,
+        updated_at = CASE
+            WHEN ({libro}.title, {libro}.summary, {libro}.publication_date)
+                 IS DISTINCT FROM (EXCLUDED.title, EXCLUDED.summary, EXCLUDED.publication_date)
+            THEN EXCLUDED.updated_at
+            ELSE {libro}.updated_at
+        END
+    RETURNING id, title, summary, isbn, publication_date, created_at, updated_at, (xmax = 0) AS created
+"""
+
+# Reconciliación de autores en bloque: se borran los pares que sobran y se
+# insertan los que faltan; ambos devuelven qué filas tocaron
+_DELETE_STALE_AUTORES_SQL = """
+    DELETE FROM {through}
+    WHERE libro_id = ANY(%s::uuid[])
+      AND (libro_id, autor_id) NOT IN (SELECT * FROM unnest(%s::uuid[], %s::uuid[]))
+    RETURNING libro_id, autor_id
+"""
+_INSERT_MISSING_AUTORES_SQL = """
+    INSERT INTO {through} (libro_id, autor_id)
+    SELECT * FROM unnest(%s::uuid[], %s::uuid[])
+    ON CONFLICT (libro_id, autor_id) DO NOTHING
+    RETURNING libro_id, autor_id
+"""
+
+def upsert_libros(*, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Servicio para crear o actualizar libros por ISBN (idempotente).
+    Cada item trae title, summary, isbn, publication_date y autores
+    (la lista completa: los autores que no estén se quitan del libro).
+    Devuelve, en el orden recibido, {'libro', 'created', 'old_autor_ids'}
+    con los autores del libro ya cargados.
+    """
+    isbns = [item['isbn'] for item in items]
+    repetidos = sorted({isbn for isbn in isbns if isbns.count(isbn) > 1})
+    if repetidos:
+        raise BusinessValidationError(detail=f"ISBN repetidos en el lote: {repetidos}")
+    if not items:
+        return []
+
+    # --- Validación de Negocio: autores existen (una consulta para todo el lote) ---
+    requested = {uid for item in items for uid in item['autores']}
+    autores = {autor.pk: autor for autor in Autor.objects.filter(id__in=requested)}
+    invalid_ids = sorted(str(uid) for uid in requested if uid not in autores)
+    if invalid_ids:
+        raise BusinessValidationError(detail=f"IDs de autor no encontrados: {invalid_ids}")
+
+    return _upsert_libros(items=items, autores=autores)
+
+@transaction.atomic
+def _upsert_libros(*, items: List[Dict[str, Any]], autores: Dict) -> List[Dict[str, Any]]:
+    now = timezone.now()
+    params = []
+    for item in items:
+        params += [uuid7(), item['title'], item.get('summary'), item['isbn'],
+                   item['publication_date'], now, now]
+    libro_table = connection.ops.quote_name(Libro._meta.db_table)
+    through_table = connection.ops.quote_name(LibroAutor._meta.db_table)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _UPSERT_LIBROS_SQL.format(
+                libro=libro_table, values=', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(items))
+            ),
+            params,
+        )
+        rows = {row[3]: row for row in cursor.fetchall()}
+
+        # Pares (libro, autor) deseados, en columnas para unnest()
+        libros_por_isbn = {}
+        desired = {}
+        for item in items:
+            libro_id, title, summary, isbn, publication_date, created_at, updated_at, created = rows[item['isbn']]
+            libro = Libro(id=libro_id, title=title, summary=summary, isbn=isbn,
+                          publication_date=publication_date, created_at=created_at, updated_at=updated_at)
+            libros_por_isbn[isbn] = (libro, created)
+            desired[libro_id] = set(item['autores'])
+        pairs = [(libro_id, autor_id) for libro_id, ids in desired.items() for autor_id in ids]
+        libro_col = [str(libro_id) for libro_id, _ in pairs]
+        autor_col = [str(autor_id) for _, autor_id in pairs]
+
+        cursor.execute(
+            _DELETE_STALE_AUTORES_SQL.format(through=through_table),
+            [[str(libro_id) for libro_id in desired], libro_col, autor_col],
+        )
+        removed = cursor.fetchall()
+        cursor.execute(_INSERT_MISSING_AUTORES_SQL.format(through=through_table), [libro_col, autor_col])
+        inserted = cursor.fetchall()
+
+    # Los libros existentes a los que solo les cambiaron los autores también
+    # cuentan como modificados (feed de cambios)
+    created_ids = {libro.pk for libro, created in libros_por_isbn.values() if created}
+    touched = {libro_id for libro_id, _ in removed + inserted} - created_ids
+    # El UPSERT solo avanza updated_at si cambió alguna columna
+    fields_changed = {libro.pk for libro, created in libros_por_isbn.values()
+                      if not created and libro.updated_at == now}
+    if touched:
+        Libro.objects.filter(pk__in=touched).update(updated_at=now)
+        for libro, _ in libros_por_isbn.values():
+            if libro.pk in touched:
+                libro.updated_at = now
+
+    for libro, created in libros_por_isbn.values():
+        if created:
+            events.record('libro', libro.pk, events.CREATE,
+                          ['title', 'summary', 'isbn', 'publication_date', 'autores'], events.version_of(now))
+        elif libro.pk in fields_changed or libro.pk in touched:
+            # No se sabe cuál de las columnas cambió: se informan las que pudo cambiar
+            changed = ['title', 'summary', 'publication_date'] if libro.pk in fields_changed else []
+            changed += ['autores'] if libro.pk in touched else []
+            events.record('libro', libro.pk, events.UPDATE, changed, events.version_of(now))
+
+    # Autores que tenía cada libro antes del upsert (para invalidar el caché)
+    old_autor_ids = {libro_id: set(ids) for libro_id, ids in desired.items()}
+    for libro_id, autor_id in inserted:
+        old_autor_ids[libro_id].discard(autor_id)
+    for libro_id, autor_id in removed:
+        old_autor_ids[libro_id].add(autor_id)
+
+    results = []
+    for item in items:
+        libro, created = libros_por_isbn[item['isbn']]
+        libro_autores = sorted((autores[uid] for uid in desired[libro.pk]),
+                               key=lambda autor: (autor.last_name, autor.first_name))
+        _set_prefetched_autores(libro, libro_autores)
+        results.append({'libro': libro, 'created': created, 'old_autor_ids': old_autor_ids[libro.pk]})
+
+    coauthors.mark_dirty({autor_id for _, autor_id in removed + inserted})
+    similar_books.mark_dirty(created_ids | fields_changed | touched)
+
+    # Modelo de lectura: solo los libros creados o que cambiaron
+    read_model.write_libros(
+        libro for libro, created in libros_por_isbn.values()
+        if created or libro.pk in fields_changed or libro.pk in touched
+    )
+    return results
+
+
+# --- Entradas de los listados (IDs en orden + versión) ---
+#
+# Los listados cacheados guardan solo el orden de los IDs y la versión de
+# cada fila; el JSON de cada objeto se cachea aparte por (ID, versión) y se
+# reutiliza entre todos los filtros/órdenes (ver views._render_fragments).
+
+class ListEntry(NamedTuple):
+    pk: uuid.UUID
+    # Cambia siempre que cambia el JSON del objeto en el listado
+    version: str
+    # Autores anidados (solo libros), para las etiquetas del caché
+    autor_ids: Tuple[uuid.UUID, ...] = ()
+
+def list_autor_entries(queryset) -> List[ListEntry]:
     """
-    libro.delete()
\ No newline at end of file
+    Entradas del listado de autores: una consulta de IDs, updated_at y
+    book_count (que también forma parte del JSON).
+    """
+    return [
+        ListEntry(pk, f'{events.version_of(updated_at)}.{book_count}')
+        for pk, updated_at, book_count in queryset.values_list('pk', 'updated_at', 'book_count')
+    ]
+
+def list_libro_entries(queryset) -> List[ListEntry]:
+    """
+    Entradas del listado de libros, sobre el modelo de lectura (una sola
+    consulta). La versión ya incluye la de sus autores (van anidados en su
+    JSON), y los IDs de los autores salen del propio JSONB.
+    """
+    rows = queryset.annotate(
+        autor_ids=Func(F('autores'), Value('$[*].id'), function='jsonb_path_query_array', output_field=JSONField())
+    ).values_list('pk', 'version_at', 'autor_ids')
+    return [
+        ListEntry(pk, str(events.version_of(version_at)), tuple(uuid.UUID(autor_id) for autor_id in autor_ids))
+        for pk, version_at, autor_ids in rows
+    ]
+
+# --- Servicios del FEED DE CAMBIOS (sincronización incremental) ---
+#
+# Los cambios se ordenan por (updated_at, id) y los borrados por
+# (deleted_at, object_id). El cursor lleva la última posición entregada y el
+# "horizonte": hasta cuándo el cliente tiene una copia completa. Si los
+# borrados posteriores al horizonte ya se purgaron, el cursor expiró.
+
+def encode_change_cursor(timestamp, object_id, horizon) -> str:
+    raw = f'{timestamp.isoformat()}|{object_id}|{horizon.isoformat()}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_change_cursor(cursor: str):
+    """
+    Devuelve (timestamp, id, horizonte) del cursor. Lanza ValueError si no es válido.
+    """
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    timestamp, object_id, horizon = raw.split('|')
+    timestamp, horizon = datetime.fromisoformat(timestamp), datetime.fromisoformat(horizon)
+    if timezone.is_naive(timestamp) or timezone.is_naive(horizon):
+        raise ValueError('timestamp sin zona horaria')
+    return timestamp, uuid.UUID(object_id), horizon
+
+def _oldest_open_write():
+    """
+    Inicio de la transacción más antigua, de otra conexión a esta DB, que
+    escribió y aún no terminó (None si no hay ninguna). No depende de los
+    statement_timeout: cubre también los lotes largos, los jobs de Celery
+    y los comandos de mantenimiento.
+    """
+    with connection.cursor() as cursor:
+        # pg_stat_activity se fotografía una vez por transacción: se descarta la foto
+        cursor.execute(
+            "SELECT pg_stat_clear_snapshot(); "
+            "SELECT min(xact_start) FROM pg_stat_activity "
+            "WHERE datname = current_database() AND backend_xid IS NOT NULL AND pid <> pg_backend_pid()"
+        )
+        return cursor.fetchone()[0]
+
+def list_changes(*, model, since=None, limit: int) -> Dict[str, Any]:
+    """
+    Servicio del feed de cambios de Autor o Libro: altas, modificaciones
+    (incluidos cambios de autores de un libro) y borrados posteriores a
+    'since' (un cursor ya decodificado), como mucho 'limit'.
+    Devuelve {'changes': [(op, id, objeto|None)], 'next': cursor, 'has_more'}.
+    Lanza CursorExpiredError si el cursor es anterior a la retención de borrados.
+    """
+    conf = settings.CHANGE_FEED
+    now = timezone.now()
+    if since is not None and since[2] < now - timedelta(days=conf['TOMBSTONE_RETENTION_DAYS']):
+        raise CursorExpiredError()
+
+    # No sirvo nada posterior al inicio de la transacción con escrituras más
+    # antigua aún abierta: al hacer commit, sus filas (con updated_at de antes
+    # del commit) quedarían detrás del cursor. SETTLE_SECONDS es el margen
+    # entre el reloj de la app, que pone updated_at, y el de Postgres
+    settle = timedelta(seconds=conf['SETTLE_SECONDS'])
+    upper = now - settle
+    oldest_write = _oldest_open_write()
+    if oldest_write is not None:
+        upper = min(upper, oldest_write - settle)
+    objects = model.objects.filter(updated_at__lte=upper)
+    tombstones = Tombstone.objects.filter(model=model._meta.model_name, deleted_at__lte=upper)
+    if since is not None:
+        timestamp, object_id, _ = since
+        # Rango sobre el índice (updated_at, id) y desempate en el mismo timestamp
+        objects = objects.filter(updated_at__gte=timestamp).exclude(updated_at=timestamp, id__lte=object_id)
+        tombstones = tombstones.filter(deleted_at__gte=timestamp).exclude(
+            deleted_at=timestamp, object_id__lte=object_id
+        )
+    objects = objects.order_by('updated_at', 'id')[:limit + 1]
+    if model is Libro:
+        objects = objects.prefetch_related('autores')
+    tombstones = tombstones.order_by('deleted_at', 'object_id').values_list('deleted_at', 'object_id')[:limit + 1]
+
+    merged = sorted(
+        [(obj.updated_at, obj.pk, 'upsert', obj) for obj in objects]
+        + [(deleted_at, object_id, 'delete', None) for deleted_at, object_id in tombstones],
+        key=lambda change: (change[0], change[1]),
+    )
+    page = merged[:limit]
+    has_more = len(merged) > limit
+
+    # El cliente queda completo hasta su horizonte anterior (o el inicio de la
+    # sincronización), hasta lo último entregado y, si no queda nada, hasta 'upper'
+    horizon = since[2] if since is not None else now
+    if page:
+        horizon = max(horizon, page[-1][0])
+    if not has_more:
+        horizon = max(horizon, upper)
+
+    if page:
+        position = (page[-1][0], page[-1][1])
+    elif since is not None:
+        position = since[:2]
+    else:
+        # Catálogo vacío: el cliente sigue desde aquí
+        position = (upper, uuid.UUID(int=0))
+    return {
+        'changes': [(op, object_id, obj) for _, object_id, op, obj in page],
+        'next': (*position, horizon),
+        'has_more': has_more,
+    }
+
+
+# --- Servicios de REPORTES (jobs asíncronos) ---
+
+# Tiempo máximo que una petición nueva se "engancha" a un job en curso
+REPORT_JOB_DEDUP_TIMEOUT = 60 * 60
+
+def _report_job_key(author_id) -> str:
+    return f'report_job_autor_{author_id}'
+
+def _job_result(job_id: str):
+    # Import diferido: Celery solo hace falta para los reportes, no para
+    # arrancar un worker web que solo sirve el catálogo. Con la app del
+    # proyecto explícita (y no la "actual", que podría no estar cargada)
+    from config.celery import app
+    return app.AsyncResult(job_id)
+
+def get_report_job(*, job_id: str) -> Dict[str, Any]:
+    """
+    Servicio para consultar el estado de un job de reporte.
+    El estado vive en el CELERY_RESULT_BACKEND (expira con CELERY_RESULT_EXPIRES).
+    """
+    from celery import states
+
+    result = _job_result(job_id)
+    # Un ID desconocido también figura como PENDING, pero sin metadatos
+    if result.state == states.PENDING and result.info is None:
+        raise ResourceNotFoundError(detail=f"Job de reporte con id={job_id} no encontrado.")
+
+    job = {'job_id': job_id, 'status': result.state, 'author_id': None, 'progress': None,
+           'cached': None, 'error': None}
+    info = result.info
+    if result.state == states.FAILURE:
+        job['error'] = str(info)
+    elif isinstance(info, dict):
+        job['author_id'] = info.get('author_id')
+        job['progress'] = info.get('progress')
+        job['cached'] = info.get('cached')
+        job['error'] = info.get('error')
+    return job
+
+def enqueue_author_report(*, autor: Autor) -> Dict[str, Any]:
+    """
+    Servicio para encolar el reporte de un autor.
+    Si ya hay un job en curso para ese autor, devuelve ese mismo job
+    en lugar de encolar otra tarea.
+    """
+    from celery import states
+    from . import tasks
+
+    author_id = str(autor.id)
+    key = _report_job_key(author_id)
+
+    # Lock corto para que dos peticiones simultáneas no encolen dos tareas
+    with cache.lock(f'{key}_lock', timeout=10):
+        job_id = cache.get(key)
+        if job_id and not _job_result(job_id).ready():
+            return get_report_job(job_id=job_id)
+
+        job_id = str(uuid.uuid4())
+        # Registro el job como PENDING antes de encolarlo, así es consultable
+        # aunque el worker todavía no lo haya tomado
+        result = _job_result(job_id)
+        result.backend.store_result(job_id, {'author_id': author_id}, states.PENDING)
+        cache.set(key, job_id, timeout=REPORT_JOB_DEDUP_TIMEOUT)
+
+    tasks.generate_author_report.apply_async(args=[author_id], task_id=job_id)
+    return get_report_job(job_id=job_id)
+
+def open_report_result(*, job_id: str):
+    """
+    Servicio que devuelve el archivo del reporte terminado (abierto).
+    Lanza ResourceNotReadyError si el job no terminó.
+    """
+    from celery import states
+
+    result = _job_result(job_id)
+    job = get_report_job(job_id=job_id)
+    if job['status'] != states.SUCCESS:
+        raise ResourceNotReadyError(detail=f"El job {job_id} está en estado {job['status']}.")
+
+    path = result.result.get('path') if isinstance(result.result, dict) else None
+    if not path or not default_storage.exists(path):
+        # El autor no existía, o cambió y el reporte fue reemplazado
+        raise ResourceNotFoundError(detail=f"El reporte del job {job_id} no está disponible.")
+    return default_storage.open(path)
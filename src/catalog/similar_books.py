@@ -0,0 +1,169 @@
+# src/catalog/similar_books.py
+
+import uuid
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django_redis import get_redis_connection
+
+from .models import LibroListado, LibroSimilares
+
+# Índice TF-IDF (vocabulario, IDF y vectores) del último cálculo
+INDEX_PATH = 'similar_books/tfidf.npz'
+
+# SET "crudo" de Redis con los libros pendientes de (re)vectorizar
+DIRTY_KEY = 'similar_books_dirty'
+
+_LOCK_KEY = 'similar_books_lock'
+_SCHEDULED_KEY = 'similar_books_update_scheduled'
+
+
+def _conf(name):
+    return settings.SIMILAR_BOOKS[name]
+
+
+def _redis():
+    return get_redis_connection('default')
+
+
+def _text(title: str, search_text: str) -> str:
+    # search_text ya trae título, resumen y autores: el título cuenta doble
+    return f'{title}\n{search_text}'
+
+
+def _vecinos(neighbors) -> List[Dict]:
+    return [{'id': str(libro_id), 'score': round(score, 4)} for libro_id, score in neighbors]
+
+
+# --- Marcado de cambios (desde services.py) ---
+
+def mark_dirty(libro_ids: Iterable):
+    """
+    Marca libros nuevos o cuyo texto (título, resumen, autores) cambió.
+    Tras el commit se anotan en Redis y se programa su vectorización; las
+    ráfagas dentro de UPDATE_DEBOUNCE seg se aplican en una sola tarea.
+    """
+    ids = [str(libro_id) for libro_id in libro_ids]
+    if ids:
+        transaction.on_commit(lambda: _schedule_update(ids))
+
+
+def _schedule_update(ids: List[str]):
+    # Import diferido: tasks carga Celery (ver presupuesto de arranque)
+    from .tasks import update_similar_books
+
+    _redis().sadd(DIRTY_KEY, *ids)
+    debounce = _conf('UPDATE_DEBOUNCE')
+    if cache.add(_SCHEDULED_KEY, 1, timeout=debounce):
+        update_similar_books.apply_async(countdown=debounce)
+
+
+# --- Índice (tarea Celery / comando) ---
+
+def _load_index():
+    # Import diferido: NumPy/SciPy solo se cargan en el job
+    from .tfidf import TfidfIndex
+
+    if not default_storage.exists(INDEX_PATH):
+        return None
+    with default_storage.open(INDEX_PATH, 'rb') as f:
+        return TfidfIndex.from_bytes(f.read())
+
+
+def _save_index(index):
+    if default_storage.exists(INDEX_PATH):
+        default_storage.delete(INDEX_PATH)
+    default_storage.save(INDEX_PATH, ContentFile(index.to_bytes()))
+
+
+def _write(neighbors_by_libro: Dict[uuid.UUID, list]):
+    LibroSimilares.objects.bulk_create(
+        [LibroSimilares(libro_id=libro_id, vecinos=_vecinos(neighbors))
+         for libro_id, neighbors in neighbors_by_libro.items()],
+        update_conflicts=True, unique_fields=['libro'], update_fields=['vecinos', 'computed_at'],
+    )
+
+
+def rebuild() -> int:
+    """
+    Recalcula el índice TF-IDF y los vecinos de todos los libros (a partir
+    del modelo de lectura, sin JOINs). Devuelve cuántos libros indexó.
+    """
+    with cache.lock(_LOCK_KEY, timeout=_conf('LOCK_TIMEOUT')):
+        return _rebuild()
+
+
+def _rebuild() -> int:
+    from .tfidf import TfidfIndex
+
+    rows = list(LibroListado.objects.values_list('libro_id', 'title', 'search_text').iterator())
+    index = TfidfIndex.fit([row[0] for row in rows], [_text(row[1], row[2]) for row in rows])
+    for chunk in index.all_neighbors(_conf('TOP_K'), _conf('MIN_SCORE'), _conf('CHUNK_CELLS')):
+        _write(chunk)
+    _save_index(index)
+    return len(index)
+
+
+def apply_pending() -> int:
+    """
+    Vectoriza los libros marcados con el vocabulario del índice actual,
+    calcula sus vecinos y los añade a las listas de los libros a los que
+    se parecen más que su k-ésimo vecino, sin recalcular el resto.
+    Devuelve cuántos libros se aplicaron.
+
+    Las listas en las que un libro modificado ya estaba conservan su
+    similitud anterior hasta la siguiente reconstrucción (tarea diaria).
+    """
+    cache.delete(_SCHEDULED_KEY)
+    with cache.lock(_LOCK_KEY, timeout=_conf('LOCK_TIMEOUT')):
+        pipe = _redis().pipeline()
+        pipe.smembers(DIRTY_KEY)
+        pipe.delete(DIRTY_KEY)
+        ids = sorted(member.decode() for member in pipe.execute()[0])
+        if not ids:
+            return 0
+
+        try:
+            index = _load_index()
+            if index is None:
+                # Sin índice previo se construye entero (ya incluye estos libros)
+                _rebuild()
+            else:
+                _apply(index, ids)
+        except Exception:
+            # Se reintentan en la próxima actualización
+            _redis().sadd(DIRTY_KEY, *ids)
+            raise
+    return len(ids)
+
+
+def _apply(index, ids: List[str]):
+    k, min_score = _conf('TOP_K'), _conf('MIN_SCORE')
+    rows = list(LibroListado.objects.filter(libro_id__in=ids).values_list('libro_id', 'title', 'search_text'))
+    if not rows:
+        return
+    own, others = index.update([row[0] for row in rows], [_text(row[1], row[2]) for row in rows], k, min_score)
+
+    with transaction.atomic():
+        current = {
+            item.libro_id: item
+            for item in LibroSimilares.objects.select_for_update().filter(libro_id__in=list(others))
+        }
+        merged = dict(own)
+        for libro_id, entering in others.items():
+            if libro_id not in current:
+                continue
+            replaced = {entry_id for entry_id, _ in entering}
+            neighbors = [
+                (uuid.UUID(item['id']), item['score'])
+                for item in current[libro_id].vecinos if uuid.UUID(item['id']) not in replaced
+            ]
+            neighbors = sorted(neighbors + entering, key=lambda entry: -entry[1])[:k]
+            index.set_kth_score(libro_id, neighbors[-1][1] if len(neighbors) == k else min_score)
+            merged[libro_id] = neighbors
+        _write(merged)
+    _save_index(index)
@@ -1,25 +1,157 @@
 # src/catalog/tasks.py
 
+from datetime import timedelta
+
 from celery import shared_task
-from .models import Autor
-import time
+from config.celery import app  # noqa: F401  (registra la app antes de encolar)
+from django.conf import settings
+from django.utils import timezone
+from .models import Autor, Tombstone
+from . import coauthors, reports, similar_books
 
-@shared_task
-def generate_author_report(author_id: str):
-    """
-    Simula una tarea pesada de generación de reporte (tarda 10 seg).
-    """
-    print(f"Iniciando reporte para el autor: {author_id}...")
-    
-    try:
-        # La tarea necesita consultar la DB
-        autor = Autor.objects.get(id=author_id)
-        
-        # Simulación de trabajo pesado 
-        time.sleep(10) 
-        
-        print(f"¡REPORTE COMPLETADO! Autor: {autor.full_name}")
-        return f"Reporte para {autor.full_name} generado."
-    except Autor.DoesNotExist:
+def _report_progress(task, meta):
+    """
+    Publica el progreso en el result backend (solo si corre como tarea
+    Celery; llamada directa no tiene ID de job).
+    """
+    if task.request.id:
+        task.update_state(state='PROGRESS', meta=meta)
+
+@shared_task(bind=True)
+def generate_author_report(self, author_id: str):
+    """
+    Genera el reporte de un autor (libros, co-autores y línea de tiempo)
+    y lo guarda en el storage. Si el autor y sus libros no cambiaron desde
+    el último reporte, devuelve el existente sin recalcularlo.
+    """
+    _report_progress(self, {'author_id': author_id, 'progress': {'done': 0, 'total': 1}})
+    result = next(reports.generate_reports([author_id]), None)
+    if result is None:
         print(f"Error: Autor con ID {author_id} no encontrado.")
-        return "Error: Autor no encontrado."
\ No newline at end of file
+        return {'author_id': author_id, 'error': 'Autor no encontrado.'}
+
+    print(f"¡REPORTE COMPLETADO! Autor: {author_id} -> {result['path']} (cacheado={result['cached']})")
+    return result
+
+@shared_task(bind=True)
+def generate_author_reports_batch(self, author_ids: list = None, chunk_size: int = reports.DEFAULT_CHUNK_SIZE):
+    """
+    Modo batch: genera los reportes de muchos autores (o de todos si no se
+    indican IDs) con unas pocas consultas agrupadas por lote.
+    """
+    total = len(author_ids) if author_ids is not None else Autor.objects.count()
+    generated = reused = 0
+    for done, result in enumerate(reports.generate_reports(author_ids, chunk_size=chunk_size), start=1):
+        if result['cached']:
+            reused += 1
+        else:
+            generated += 1
+        if done % chunk_size == 0:
+            _report_progress(self, {'progress': {'done': done, 'total': total}})
+
+    print(f"¡REPORTES COMPLETADOS! Generados: {generated}, reutilizados: {reused}")
+    return {'generated': generated, 'reused': reused}
+
+@shared_task
+def warm_list_cache(namespace: str):
+    """
+    Recalienta los listados más pedidos de un namespace tras una invalidación,
+    para que el siguiente usuario no pague la consulta en frío. También
+    renderiza los fragmentos JSON que falten de la primera página.
+    """
+    # Import diferido: views importa services, que importa este módulo
+    from django.http import HttpRequest, QueryDict
+    from rest_framework.request import Request
+    from rest_framework.settings import api_settings
+    from . import caching
+    from .views import AutorViewSet, LibroViewSet
+
+    viewset = {caching.AUTORES_LIST: AutorViewSet, caching.LIBROS_LIST: LibroViewSet}[namespace]()
+    generation = caching.get_generation(namespace)
+    # Lo que este proceso haya contado y aún no esté en el ranking
+    caching.flush_hits()
+
+    warmed = 0
+    for query_string, _ in caching.hot_query_strings(namespace, settings.LIST_CACHE['WARM_TOP_N']):
+        # Con invalidación por etiquetas, las entradas no afectadas siguen ahí
+        if caching.has_list(namespace, query_string):
+            continue
+        http_request = HttpRequest()
+        http_request.method = 'GET'
+        http_request.GET = QueryDict(query_string)
+        items = viewset.get_list_items(Request(http_request))
+
+        # Si hubo otra escritura mientras calculaba, este resultado ya es viejo
+        # (la escritura programó su propio recalentamiento)
+        if caching.get_generation(namespace) != generation:
+            break
+        caching.set_list(namespace, query_string, items)
+        viewset.get_list_fragments(items[:api_settings.PAGE_SIZE])
+        warmed += 1
+
+    caching.decay_hits(namespace)
+    return f"{warmed} listados recalentados en {namespace}."
+
+
+@shared_task
+def update_coauthor_graph():
+    """
+    Aplica al grafo de co-autoría los autores marcados por las escrituras
+    (ver coauthors.mark_dirty).
+    """
+    updated = coauthors.apply_pending()
+    return f"{updated} autores actualizados en el grafo de co-autoría."
+
+
+@shared_task
+def rebuild_coauthor_graph():
+    """
+    Construye el grafo de co-autoría completo (lo programa la primera
+    consulta que no lo encuentra, ver coauthors.get_graph).
+    """
+    graph = coauthors.rebuild()
+    return f"Grafo de co-autoría construido con {len(graph)} autores."
+
+
+@shared_task
+def update_similar_books():
+    """
+    Vectoriza los libros nuevos o modificados y los añade a los similares
+    (ver similar_books.mark_dirty), sin recalcular todo el índice.
+    """
+    updated = similar_books.apply_pending()
+    return f"{updated} libros añadidos al índice de similares."
+
+
+@shared_task
+def rebuild_similar_books():
+    """
+    Recalcula el índice TF-IDF (vocabulario incluido) y los similares de
+    todos los libros.
+    """
+    total = similar_books.rebuild()
+    return f"Similares recalculados para {total} libros."
+
+
+@shared_task
+def find_duplicate_autores(min_score: float = None):
+    """
+    Busca autores duplicados y guarda las propuestas de fusión para
+    revisarlas (python manage.py find_duplicate_autores --apply las aplica).
+    """
+    # Import diferido: NumPy solo se carga en el job
+    from . import author_dedup
+
+    result = author_dedup.run(min_score=min_score)
+    return {'blocks': result['blocks'], 'comparisons': result['comparisons'], 'proposals': len(result['proposals'])}
+
+
+@shared_task
+def prune_tombstones():
+    """
+    Borra los registros de borrados más viejos que la retención del feed
+    de cambios (los cursores anteriores ya reciben 410).
+    """
+    cutoff = timezone.now() - timedelta(days=settings.CHANGE_FEED['TOMBSTONE_RETENTION_DAYS'])
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return f"{deleted} borrados antiguos eliminados."
@@ -0,0 +1,110 @@
+# src/catalog/tests/test_author_dedup.py
+
+from datetime import date
+from unittest import mock
+
+from django.test import TestCase
+
+from catalog import author_dedup, services, tasks
+from catalog.models import Autor, LibroListado, Tombstone
+from core.exceptions import BusinessValidationError
+
+BIRTH = date(1892, 1, 3)
+
+
+@mock.patch.object(tasks.warm_list_cache, 'apply_async')
+class AuthorDedupTests(TestCase):
+    """
+    Tests de la búsqueda de autores duplicados y de su fusión.
+    """
+
+    def _autor(self, first_name, last_name='Tolkien', birth_date=BIRTH):
+        return Autor.objects.create(first_name=first_name, last_name=last_name, birth_date=birth_date)
+
+    def _libro(self, i, autores):
+        return services.create_libro(data={
+            'title': f'Libro {i}', 'isbn': f'978200000{i:04d}', 'publication_date': date(2000, 1, 1),
+            'autores': [autor.pk for autor in autores],
+        })
+
+    def test_similitud_de_nombres(self, *_):
+        names = [author_dedup.normalize(name) for name in ('John Ronald Reuel', 'J.R.R.', 'J.', 'John', 'Christopher')]
+        scores = author_dedup.similarity(names)
+        self.assertEqual(scores[0, 1], author_dedup.INITIALS_SCORE)
+        self.assertEqual(scores[0, 2], author_dedup.INITIALS_PREFIX_SCORE)
+        self.assertAlmostEqual(float(scores[0, 3]), author_dedup.TOKEN_SUBSET_SCORE)
+        self.assertLess(scores[0, 4], 0.5)
+        self.assertAlmostEqual(float(scores[4, 4]), 1.0, places=5)
+
+    def test_propuestas_por_bloques(self, *_):
+        completo = self._autor('John Ronald Reuel')
+        iniciales = self._autor('J.R.R.')
+        acentos = self._autor('J. R. R.', last_name='TOLKIÉN')
+        self._autor('Christopher')
+        # Otra fecha de nacimiento u otro apellido: bloques distintos
+        self._autor('J.R.R.', birth_date=date(1900, 1, 1))
+        self._autor('J.R.R.', last_name='Lewis')
+        self._autor('Ana', last_name='Sola', birth_date=None)
+        self._autor('Ana María', last_name='Sola', birth_date=None)
+
+        result = author_dedup.find_duplicates()
+        # Solo se comparan los pares dentro de cada bloque
+        self.assertEqual(result['blocks'], 2)
+        self.assertEqual(result['comparisons'], 6 + 1)
+
+        proposals = {proposal['target']['id']: proposal for proposal in result['proposals']}
+        self.assertEqual(len(proposals), 2)
+        self.assertEqual(
+            {duplicate['id'] for duplicate in proposals[str(completo.pk)]['duplicates']},
+            {str(iniciales.pk), str(acentos.pk)},
+        )
+
+    def test_las_iniciales_no_encadenan_personas_distintas(self, *_):
+        john, jane, inicial = self._autor('John', 'Smith'), self._autor('Jane', 'Smith'), self._autor('J.', 'Smith')
+        jose_luis, iniciales = self._autor('Jose Luis', 'Smith'), self._autor('J L', 'Smith')
+
+        result = author_dedup.find_duplicates()
+
+        # "J." se parece a John y a Jane: no se fusiona con nadie
+        [proposal] = result['proposals']
+        self.assertEqual(proposal['target']['id'], str(jose_luis.pk))
+        self.assertEqual([duplicate['id'] for duplicate in proposal['duplicates']], [str(iniciales.pk)])
+        self.assertTrue(all(duplicate['score'] >= author_dedup._conf('MIN_SCORE')
+                            for duplicate in proposal['duplicates']))
+        [ambiguous] = result['ambiguous']
+        self.assertEqual(ambiguous['id'], str(inicial.pk))
+        self.assertTrue({str(john.pk), str(jane.pk)} <= {match['id'] for match in ambiguous['matches']})
+
+    def test_bloques_grandes_se_parten(self, *_):
+        for name in ('Ana', 'Ana B', 'Bea', 'Bea C', 'Carla'):
+            self._autor(name, last_name='Garcia')
+        blocks = list(author_dedup.blocks(max_size=2))
+        self.assertEqual(sorted(len(block) for block in blocks), [2, 2])
+
+    def test_fusion_reasigna_los_libros(self, *_):
+        completo = self._autor('John Ronald Reuel')
+        iniciales = self._autor('J.R.R.')
+        otro = self._autor('Christopher')
+        solo_duplicado = self._libro(1, [iniciales])
+        ambos = self._libro(2, [completo, iniciales, otro])
+
+        author_dedup.run()
+        [proposal] = author_dedup.load_proposals()
+        libro_ids = author_dedup.merge(proposal)
+
+        self.assertEqual(sorted(libro_ids), sorted([solo_duplicado.pk, ambos.pk]))
+        self.assertFalse(Autor.objects.filter(pk=iniciales.pk).exists())
+        self.assertTrue(Tombstone.objects.filter(model=Tombstone.AUTOR, object_id=iniciales.pk).exists())
+        self.assertEqual(list(solo_duplicado.autores.values_list('pk', flat=True)), [completo.pk])
+        self.assertEqual(set(ambos.autores.values_list('pk', flat=True)), {completo.pk, otro.pk})
+        self.assertEqual(services.list_autores().get(pk=completo.pk).book_count, 2)
+        self.assertEqual(
+            [autor['id'] for autor in LibroListado.objects.get(pk=solo_duplicado.pk).autores], [str(completo.pk)]
+        )
+        # Aplicarla otra vez no hace nada
+        self.assertEqual(author_dedup.merge(proposal), [])
+
+    def test_no_se_fusiona_consigo_mismo(self, *_):
+        autor = self._autor('John')
+        with self.assertRaises(BusinessValidationError):
+            services.merge_autores(target=autor, duplicates=[autor])
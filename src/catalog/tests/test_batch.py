@@ -0,0 +1,81 @@
+# src/catalog/tests/test_batch.py
+
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from catalog import caching
+from catalog.models import Autor, Libro
+
+
+class BatchGetTests(APITestCase):
+    """
+    Tests de los endpoints multi-get (/libros/batch/, /autores/batch/).
+    """
+    fixtures = ['initial_data.json']
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.url = reverse('libro-batch')
+        for namespace in (caching.AUTOR_DETAIL, caching.LIBRO_DETAIL):
+            caching.invalidate_detail(namespace)
+        self.libros = list(Libro.objects.order_by('title'))
+
+    def _get(self, ids):
+        return self.client.get(self.url, {'ids': ','.join(str(pk) for pk in ids)})
+
+    def test_orden_pedido_y_marcas_de_no_encontrado(self):
+        inexistente = uuid.uuid4()
+        ids = [self.libros[2].id, inexistente, self.libros[0].id]
+
+        # usuario + libros (id__in) + prefetch de autores
+        with self.assertNumQueries(3):
+            response = self._get(ids)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual([item['id'] for item in data], [str(pk) for pk in ids])
+        self.assertEqual([item['found'] for item in data], [True, False, True])
+        self.assertIsNone(data[1]['data'])
+        self.assertEqual(data[0]['data']['title'], self.libros[2].title)
+        self.assertTrue(data[0]['data']['autores'])
+
+    def test_sirve_desde_el_cache_de_detalles(self):
+        # Uno ya cacheado por el retrieve normal
+        self.client.get(reverse('libro-detail', args=[self.libros[0].id]))
+        with self.assertNumQueries(3):
+            self._get([libro.id for libro in self.libros])
+
+        # Todos cacheados: solo la consulta del usuario
+        with self.assertNumQueries(1):
+            response = self._get([libro.id for libro in self.libros])
+        self.assertTrue(all(item['found'] for item in response.data['data']))
+
+        # Y el retrieve aprovecha lo cacheado por el batch
+        with self.assertNumQueries(1):
+            self.client.get(reverse('libro-detail', args=[self.libros[1].id]))
+
+    def test_autores(self):
+        autores = list(Autor.objects.order_by('last_name'))
+        response = self.client.get(reverse('autor-batch'), {'ids': f'{autores[1].id}, {autores[0].id}'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['data']['last_name'] for item in response.data['data']],
+            [autores[1].last_name, autores[0].last_name]
+        )
+
+    def test_ids_invalidos_o_demasiados(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._get(['no-es-un-uuid']).status_code, status.HTTP_400_BAD_REQUEST)
+
+        with override_settings(CATALOG_BATCH={**settings.CATALOG_BATCH, 'MAX_IDS': 2}):
+            response = self._get([libro.id for libro in self.libros[:3]])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,140 @@
+# src/catalog/tests/test_change_events.py
+
+import datetime
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django_redis import get_redis_connection
+
+from catalog import events, services
+from catalog.models import Autor, Libro
+
+TEST_STREAM = 'test_catalog_change_events'
+
+
+@override_settings(CHANGE_EVENTS={**settings.CHANGE_EVENTS, 'ENABLED': True, 'STREAM': TEST_STREAM})
+class ChangeEventsTests(TestCase):
+    """
+    Tests de la publicación de eventos de cambio en el Redis Stream y del
+    consumidor con grupo.
+    """
+    fixtures = ['initial_data.json']
+
+    def setUp(self):
+        self.redis = get_redis_connection('default')
+        self.redis.delete(TEST_STREAM)
+
+    def _stream(self):
+        return [events._decode(entry_id, fields) for entry_id, fields in self.redis.xrange(TEST_STREAM)]
+
+    def test_eventos_de_una_transaccion_van_juntos_tras_el_commit(self):
+        libro = services.get_libro(pk=Libro.objects.first().pk)
+        otro_autor = Autor.objects.exclude(libros=libro).first()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            services.update_libro(libro=libro, data={'title': 'Otro', 'autores': [otro_autor.pk]})
+            # Nada se publica antes del commit
+            self.assertEqual(self._stream(), [])
+            autor = services.create_autor(data={'first_name': 'Ana', 'last_name': 'Pérez'})
+
+        stream = self._stream()
+        self.assertEqual([(e['entity'], e['op']) for e in stream], [('libro', 'update'), ('autor', 'create')])
+        self.assertEqual(stream[0]['id'], str(libro.pk))
+        self.assertEqual(stream[0]['fields'], ['title', 'autores'])
+        self.assertEqual(stream[0]['version'], events.version_of(libro.updated_at))
+        self.assertEqual(stream[1]['id'], str(autor.pk))
+        self.assertEqual(stream[0]['tx'], stream[1]['tx'])
+
+    def test_sin_cambios_o_con_rollback_no_hay_eventos(self):
+        autor = Autor.objects.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            services.update_autor(autor=autor, data={'first_name': autor.first_name})
+        self.assertEqual(self._stream(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    services.update_autor(autor=autor, data={'first_name': 'Revertido'})
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(self._stream(), [])
+
+    def test_borrar_autor_publica_sus_libros(self):
+        autor = Autor.objects.filter(libros__isnull=False).first()
+        libro_ids = {str(pk) for pk in autor.libros.values_list('pk', flat=True)}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            services.delete_autor(autor=autor)
+
+        stream = self._stream()
+        self.assertEqual((stream[0]['entity'], stream[0]['op']), ('autor', 'delete'))
+        self.assertEqual({e['id'] for e in stream[1:]}, libro_ids)
+        self.assertTrue(all(e['fields'] == ['autores'] for e in stream[1:]))
+
+    def test_el_admin_publica_altas_ediciones_y_borrados(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password123'))
+        libro = Libro.objects.first()
+        otro_autor = Autor.objects.exclude(libros=libro).first()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('admin:catalog_autor_add'), {'first_name': 'Ana', 'last_name': 'Pérez'})
+            autor = Autor.objects.get(last_name='Pérez')
+            self.client.post(reverse('admin:catalog_autor_change', args=[autor.pk]),
+                             {'first_name': 'Ana', 'last_name': 'Pérez', 'biography': 'Bio'})
+            self.client.post(reverse('admin:catalog_libro_change', args=[libro.pk]), {
+                'title': libro.title, 'summary': libro.summary or '', 'isbn': libro.isbn,
+                'publication_date': libro.publication_date.isoformat(), 'autores': [otro_autor.pk],
+            })
+            self.client.post(reverse('admin:catalog_autor_delete', args=[autor.pk]), {'post': 'yes'})
+
+        stream = self._stream()
+        self.assertEqual([(e['entity'], e['op'], e['fields']) for e in stream], [
+            ('autor', 'create', ['first_name', 'last_name']),
+            ('autor', 'update', ['biography']),
+            ('libro', 'update', ['autores']),
+            ('autor', 'delete', []),
+        ])
+        self.assertEqual(stream[2]['id'], str(libro.pk))
+        self.assertEqual(stream[2]['version'], events.version_of(Libro.objects.get(pk=libro.pk).updated_at))
+
+    def test_upsert_solo_publica_lo_que_cambia(self):
+        libro = Libro.objects.prefetch_related('autores').first()
+        item = {
+            'title': libro.title, 'summary': libro.summary, 'isbn': libro.isbn,
+            'publication_date': libro.publication_date, 'autores': [a.pk for a in libro.autores.all()],
+        }
+        nuevo = {**item, 'isbn': '9780000000001', 'publication_date': datetime.date(2000, 1, 1)}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            services.upsert_libros(items=[item, nuevo])
+
+        stream = self._stream()
+        self.assertEqual([e['op'] for e in stream], ['create'])
+        self.assertEqual(stream[0]['id'], str(Libro.objects.get(isbn='9780000000001').pk))
+
+    def test_consumidor_con_grupo_confirma_y_reclama(self):
+        events.ensure_group('indexer', start_id='0')
+        with self.captureOnCommitCallbacks(execute=True):
+            services.update_autor(autor=Autor.objects.first(), data={'biography': 'Nueva'})
+
+        # Un consumidor falla: el evento queda pendiente
+        failing = events.ChangeEventConsumer('indexer', 'c1', block_ms=10)
+
+        def fail(batch):
+            raise RuntimeError
+
+        with self.assertRaises(RuntimeError):
+            failing.poll(fail)
+        self.assertEqual(self.redis.xpending(TEST_STREAM, 'indexer')['pending'], 1)
+
+        # Otro consumidor lo reclama y lo confirma
+        received = []
+        other = events.ChangeEventConsumer('indexer', 'c2', block_ms=10, claim_idle_ms=0)
+        self.assertEqual(other.poll(received.extend), 1)
+        self.assertEqual(received[0]['fields'], ['biography'])
+        self.assertEqual(self.redis.xpending(TEST_STREAM, 'indexer')['pending'], 0)
+        self.assertEqual(other.poll(received.extend), 0)
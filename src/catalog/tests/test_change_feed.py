@@ -0,0 +1,162 @@
+# src/catalog/tests/test_change_feed.py
+
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from catalog import services, tasks
+from catalog.models import Autor, Libro, Tombstone
+
+
+@override_settings(CHANGE_FEED={**settings.CHANGE_FEED, 'SETTLE_SECONDS': 0})
+@mock.patch.object(tasks.warm_list_cache, 'apply_async')
+class ChangeFeedTests(APITestCase):
+    """
+    Tests del feed de cambios (/libros/changes/, /autores/changes/).
+    """
+    fixtures = ['initial_data.json']
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def _sync(self, name, since=None, limit=None):
+        """
+        Recorre el feed hasta el final; devuelve los cambios y el último cursor.
+        """
+        changes = []
+        while True:
+            params = {}
+            if since:
+                params['since'] = since
+            if limit:
+                params['limit'] = limit
+            response = self.client.get(reverse(f'{name}-changes'), params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            data = response.data['data']
+            changes += data['results']
+            since = data['next_cursor']
+            if not data['has_more']:
+                return changes, since
+
+    def test_sync_inicial_paginado_sin_repetidos(self, _):
+        changes, cursor = self._sync('libro', limit=2)
+
+        ids = [change['id'] for change in changes]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids), {str(pk) for pk in Libro.objects.values_list('pk', flat=True)})
+        self.assertTrue(all(change['op'] == 'upsert' and change['data']['autores'] for change in changes))
+
+        # Sin cambios nuevos, el cursor no devuelve nada
+        changes, _ = self._sync('libro', since=cursor)
+        self.assertEqual(changes, [])
+
+    def test_modificaciones_y_borrados_desde_el_cursor(self, _):
+        _, cursor = self._sync('libro')
+        libros = list(Libro.objects.order_by('title'))
+        otro_autor = Autor.objects.exclude(libros=libros[1]).first()
+
+        self.client.patch(reverse('libro-detail', args=[libros[0].id]), {'title': 'Nuevo título'}, format='json')
+        # Cambiar solo los autores también cuenta como modificación
+        self.client.patch(reverse('libro-detail', args=[libros[1].id]),
+                          {'autores': [str(otro_autor.id)]}, format='json')
+        self.client.delete(reverse('libro-detail', args=[libros[2].id]))
+
+        changes, _ = self._sync('libro', since=cursor)
+        by_id = {change['id']: change for change in changes}
+        self.assertEqual(len(changes), 3)
+        self.assertEqual(by_id[str(libros[0].id)]['data']['title'], 'Nuevo título')
+        self.assertEqual(by_id[str(libros[1].id)]['op'], 'upsert')
+        self.assertEqual(by_id[str(libros[2].id)], {'op': 'delete', 'id': str(libros[2].id), 'data': None})
+
+    def test_borrar_un_autor_marca_sus_libros(self, _):
+        _, autores_cursor = self._sync('autor')
+        _, libros_cursor = self._sync('libro')
+        autor = Autor.objects.filter(libros__isnull=False).first()
+        libro_ids = {str(pk) for pk in autor.libros.values_list('pk', flat=True)}
+
+        self.client.delete(reverse('autor-detail', args=[autor.id]))
+
+        changes, _ = self._sync('autor', since=autores_cursor)
+        self.assertEqual(changes, [{'op': 'delete', 'id': str(autor.id), 'data': None}])
+        changes, _ = self._sync('libro', since=libros_cursor)
+        self.assertEqual({change['id'] for change in changes}, libro_ids)
+
+    def test_borrados_desde_el_admin(self, _):
+        _, autores_cursor = self._sync('autor')
+        _, libros_cursor = self._sync('libro')
+        autor = Autor.objects.filter(libros__isnull=False).first()
+        libro_ids = {str(pk) for pk in autor.libros.values_list('pk', flat=True)}
+        otro_libro = Libro.objects.exclude(autores=autor).first()
+
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password123'))
+        self.client.post(reverse('admin:catalog_autor_delete', args=[autor.id]), {'post': 'yes'})
+        self.client.post(reverse('admin:catalog_libro_changelist'), {
+            'action': 'delete_selected', 'post': 'yes', '_selected_action': [otro_libro.id],
+        })
+
+        changes, _ = self._sync('autor', since=autores_cursor)
+        self.assertEqual(changes, [{'op': 'delete', 'id': str(autor.id), 'data': None}])
+        changes, _ = self._sync('libro', since=libros_cursor)
+        by_id = {change['id']: change for change in changes}
+        self.assertEqual(set(by_id), libro_ids | {str(otro_libro.id)})
+        self.assertEqual(by_id[str(otro_libro.id)]['op'], 'delete')
+        self.assertTrue(all(by_id[libro_id]['op'] == 'upsert' for libro_id in libro_ids))
+
+    def test_cursor_expirado_o_invalido(self, _):
+        hace_un_anio = timezone.now() - timedelta(days=365)
+        viejo = services.encode_change_cursor(hace_un_anio, Libro.objects.first().pk, hace_un_anio)
+        response = self.client.get(reverse('libro-changes'), {'since': viejo})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+        response = self.client.get(reverse('libro-changes'), {'since': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('libro-changes'), {'limit': settings.CHANGE_FEED['MAX_LIMIT'] + 1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_no_sirve_cambios_sin_asentar(self, _):
+        _, cursor = self._sync('libro')
+        libro = Libro.objects.first()
+        self.client.patch(reverse('libro-detail', args=[libro.id]), {'title': 'Reciente'}, format='json')
+
+        with override_settings(CHANGE_FEED={**settings.CHANGE_FEED, 'SETTLE_SECONDS': 60}):
+            changes, _ = self._sync('libro', since=cursor)
+        self.assertEqual(changes, [])
+
+    def test_no_sirve_cambios_posteriores_a_una_escritura_sin_commit(self, _):
+        _, cursor = self._sync('libro')
+
+        # Otra conexión abre una transacción con escrituras y no hace commit
+        other = connection.get_new_connection(connection.get_connection_params())
+        self.addCleanup(other.close)
+        with other.cursor() as other_cursor:
+            other_cursor.execute('SELECT pg_current_xact_id()')
+
+        libro = Libro.objects.first()
+        self.client.patch(reverse('libro-detail', args=[libro.id]), {'title': 'Reciente'}, format='json')
+        changes, cursor_after = self._sync('libro', since=cursor)
+        self.assertEqual(changes, [])
+
+        other.rollback()
+        changes, _ = self._sync('libro', since=cursor_after)
+        self.assertEqual([change['id'] for change in changes], [str(libro.id)])
+
+    def test_prune_tombstones(self, _):
+        old = Tombstone.objects.create(model=Tombstone.LIBRO, object_id=Libro.objects.first().pk,
+                                       deleted_at=timezone.now() - timedelta(days=365))
+        recent = Tombstone.objects.create(model=Tombstone.LIBRO, object_id=Libro.objects.last().pk)
+
+        tasks.prune_tombstones()
+
+        self.assertFalse(Tombstone.objects.filter(pk=old.pk).exists())
+        self.assertTrue(Tombstone.objects.filter(pk=recent.pk).exists())
@@ -0,0 +1,127 @@
+# src/catalog/tests/test_coauthors.py
+
+import uuid
+from datetime import date
+from unittest import mock
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from catalog import coauthors, services, tasks
+from catalog.coauthor_graph import CoauthorGraph
+from catalog.models import Autor
+
+
+@mock.patch.object(tasks.update_coauthor_graph, 'apply_async')
+@mock.patch.object(tasks.warm_list_cache, 'apply_async')
+class CoauthorGraphTests(APITestCase):
+    """
+    Tests del grafo de co-autoría precalculado y de /autores/{id}/coautores/.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        self.a, self.b, self.c, self.d, self.solo = [
+            Autor.objects.create(first_name=name, last_name='Autor', birth_date=date(1950, 1, 1))
+            for name in ('Ana', 'Bruno', 'Carla', 'Diego', 'Sola')
+        ]
+        self.libros = [
+            self._libro(i, autores)
+            for i, autores in enumerate([
+                [self.a, self.b], [self.a, self.b], [self.b, self.c], [self.c, self.d], [self.solo],
+            ])
+        ]
+        coauthors._redis().delete(coauthors.DIRTY_KEY)
+        coauthors.rebuild()
+
+    def _libro(self, i, autores):
+        return services.create_libro(data={
+            'title': f'Libro {i}', 'isbn': f'978000000{i:04d}', 'publication_date': date(2000, 1, 1),
+            'autores': [autor.pk for autor in autores],
+        })
+
+    def _get(self, autor, **params):
+        return self.client.get(reverse('autor-coautores', args=[autor.pk]), params)
+
+    def _pairs(self, items, weight):
+        return [(item['full_name'], item[weight]) for item in items]
+
+    def _assert_igual_a_reconstruir(self):
+        graph = coauthors.get_graph()
+        expected = CoauthorGraph.from_rows(coauthors._fetch_edges(), coauthors._fetch_names())
+        for array in ('ids', 'indptr', 'indices', 'weights'):
+            np.testing.assert_array_equal(getattr(graph, array), getattr(expected, array))
+        self.assertEqual(graph.names, expected.names)
+
+    def test_coautores_y_segundo_grado(self, *_):
+        data = self._get(self.b).data['data']
+        self.assertEqual(self._pairs(data['coautores'], 'libros_compartidos'),
+                         [('Ana Autor', 2), ('Carla Autor', 1)])
+        self.assertEqual(self._pairs(data['segundo_grado'], 'coautores_en_comun'), [('Diego Autor', 1)])
+
+        data = self._get(self.a, limit=1).data['data']
+        self.assertEqual(data['coautores'][0]['id'], str(self.b.pk))
+        self.assertEqual(self._pairs(data['segundo_grado'], 'coautores_en_comun'), [('Carla Autor', 1)])
+
+    def test_la_consulta_no_usa_la_db(self, *_):
+        self._get(self.b)
+        with CaptureQueriesContext(connection) as queries:
+            response = self._get(self.b)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q['sql'] for q in queries.captured_queries if 'catalog_' in q['sql']])
+
+    def test_autor_sin_coautores_inexistente_y_limite(self, *_):
+        response = self._get(self.solo)
+        self.assertEqual(response.data['data'], {'coautores': [], 'segundo_grado': []})
+
+        response = self.client.get(reverse('autor-coautores', args=[uuid.uuid4()]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self._get(self.a, limit=1000).status_code, 400)
+
+    def test_sin_grafo_no_se_construye_en_la_peticion(self, *_):
+        coauthors._cache().delete(coauthors.GRAPH_KEY)
+        with mock.patch.object(tasks.rebuild_coauthor_graph, 'apply_async') as rebuild_apply_async, \
+                mock.patch.object(coauthors, '_fetch_edges') as fetch_edges:
+            responses = [self._get(self.a), self._get(self.b)]
+            missing = self.client.get(reverse('autor-coautores', args=[uuid.uuid4()]))
+
+        self.assertEqual([response.status_code for response in responses], [503, 503])
+        self.assertEqual(responses[0].data['code'], 'warming_up')
+        self.assertEqual(missing.status_code, 404)
+        fetch_edges.assert_not_called()
+        # Una sola construcción programada para todas las peticiones
+        rebuild_apply_async.assert_called_once_with()
+
+        tasks.rebuild_coauthor_graph()
+        self.assertEqual(self._get(self.a).status_code, 200)
+
+    def test_actualizacion_incremental(self, _, update_apply_async):
+        # Cada escritura marca a los autores afectados y programa la tarea
+        with self.captureOnCommitCallbacks(execute=True):
+            nuevo = self._libro(9, [self.a, self.c, self.solo])
+        update_apply_async.assert_called()
+        self.assertEqual(coauthors.apply_pending(), 3)
+        self._assert_igual_a_reconstruir()
+        data = self._get(self.solo).data['data']
+        self.assertEqual(self._pairs(data['coautores'], 'libros_compartidos'), [('Ana Autor', 1), ('Carla Autor', 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            services.update_libro(libro=services.get_libro(pk=nuevo.pk), data={'autores': [self.a.pk, self.d.pk]})
+            services.delete_libro(libro=services.get_libro(pk=self.libros[0].pk))
+            services.update_autor(autor=self.c, data={'first_name': 'Carolina'})
+            services.delete_autor(autor=self.b)
+        coauthors.apply_pending()
+        self._assert_igual_a_reconstruir()
+
+        data = self._get(self.a).data['data']
+        self.assertEqual(self._pairs(data['coautores'], 'libros_compartidos'), [('Diego Autor', 1)])
+        self.assertEqual(self._pairs(data['segundo_grado'], 'coautores_en_comun'), [('Carolina Autor', 1)])
+        self.assertEqual(coauthors.apply_pending(), 0)
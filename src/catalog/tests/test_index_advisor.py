@@ -0,0 +1,28 @@
+# src/catalog/tests/test_index_advisor.py
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class IndexAdvisorTests(TestCase):
+    """
+    Tests del comando index_advisor.
+    """
+    fixtures = ['initial_data.json']
+
+    def test_recorre_las_formas_declaradas_y_propone_indices(self):
+        out = StringIO()
+        call_command('index_advisor', min_rows=1, stdout=out)
+        output = out.getvalue()
+
+        # Filtro x ordenamiento declarados en los ViewSets
+        self.assertIn('/libros/?autores__id=', output)
+        self.assertIn('ordering=title', output)
+        self.assertIn('/autores/?last_name=', output)
+        # Con 1 fila de umbral, ordenar por título sin índice es un problema
+        # (el listado de libros lee el modelo de lectura)
+        self.assertIn("catalog_librolistado (title", output)
+        # El filtro por autor es contención JSONB (índice GIN): no se propone B-tree
+        self.assertNotIn("catalog_librolistado (autores", output)
@@ -0,0 +1,302 @@
+# src/catalog/tests/test_list_cache.py
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from redis import Redis
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from catalog import caching, tasks
+from catalog.models import Autor, Libro
+from catalog.views import AutorViewSet
+
+
+class ListCacheTestCase(APITestCase):
+    """
+    Base: usuario autenticado y caché de listados/detalles vacío.
+    """
+    fixtures = ['initial_data.json']
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.autores_url = reverse('autor-list')
+
+        caching.flush_hits()
+        for namespace in (caching.AUTORES_LIST, caching.LIBROS_LIST):
+            caching._redis().delete(caching._hits_key(namespace))
+            caching._cache().delete_pattern(f'{namespace}_')
+            cache.delete(f'list_cache_warm_scheduled_{namespace}')
+        for namespace in (caching.AUTOR_DETAIL, caching.LIBRO_DETAIL):
+            caching.invalidate_detail(namespace)
+        tag_keys = list(caching._redis().scan_iter(caching._tag_key('*')))
+        for namespace in (caching.AUTOR_FRAGMENT, caching.LIBRO_FRAGMENT):
+            tag_keys += caching._redis().scan_iter(f'{namespace}:*')
+        if tag_keys:
+            caching._redis().delete(*tag_keys)
+
+
+class ListCacheWarmingTests(ListCacheTestCase):
+    """
+    Tests del ranking de consultas y del recalentamiento del caché de listados.
+    """
+
+    def test_ranking_de_consultas_mas_pedidas(self):
+        """
+        Cada petición al listado suma en el ranking de su consulta.
+        """
+        for _ in range(3):
+            self.client.get(self.autores_url, {'ordering': 'birth_date'})
+        self.client.get(self.autores_url)
+
+        caching.flush_hits()
+        hot = caching.hot_query_strings(caching.AUTORES_LIST, 10)
+        self.assertEqual(hot[0], ('ordering=birth_date', 3.0))
+        self.assertEqual(hot[1], ('', 1.0))
+
+    def test_listado_caliente_solo_lee_los_fragmentos_de_redis(self):
+        """
+        Con el listado en el L1, la petición solo va a Redis a por los
+        fragmentos: el limitador y la vista comparten la lectura y el
+        ranking se suma en el proceso.
+        """
+        self.client.get(self.autores_url)
+        self.client.get(self.autores_url)
+        # Reinicia los plazos de volcado para que no caigan en la petición
+        caching.flush_hits()
+        caching._cache().flush_stats()
+
+        commands = []
+        execute_command = Redis.execute_command
+
+        def spy(client, *args, **kwargs):
+            commands.append(args[0])
+            return execute_command(client, *args, **kwargs)
+
+        # Sin el throttling de DRF, que tiene su propio GET/SET por petición
+        with mock.patch.object(AutorViewSet, 'get_throttles', return_value=[]), \
+                mock.patch.object(Redis, 'execute_command', spy):
+            response = self.client.get(self.autores_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(commands, ['MGET'])
+
+        caching.flush_hits()
+        self.assertEqual(caching.hot_query_strings(caching.AUTORES_LIST, 1), [('', 3.0)])
+
+    def test_rafaga_de_escrituras_programa_un_solo_recalentamiento(self):
+        """
+        Varias escrituras seguidas programan una única tarea (debounce).
+        """
+        with mock.patch.object(tasks.warm_list_cache, 'apply_async') as apply_async:
+            for i in range(5):
+                self.client.post(self.autores_url, {'first_name': f'Autor {i}', 'last_name': 'Nuevo'}, format='json')
+
+        apply_async.assert_called_once()
+        self.assertEqual(apply_async.call_args.kwargs['args'], [caching.AUTORES_LIST])
+
+    def test_recalentamiento_repuebla_las_consultas_calientes(self):
+        """
+        Tras invalidar, la tarea vuelve a cachear las consultas más pedidas
+        y la siguiente petición no consulta la tabla de autores.
+        """
+        self.client.get(self.autores_url, {'ordering': 'birth_date'})
+        with mock.patch.object(tasks.warm_list_cache, 'apply_async'):
+            self.client.post(self.autores_url, {'first_name': 'Ursula K.', 'last_name': 'Le Guin'}, format='json')
+        self.assertIsNone(caching.get_list(caching.AUTORES_LIST, 'ordering=birth_date'))
+
+        tasks.warm_list_cache(caching.AUTORES_LIST)
+
+        # Solo la consulta del usuario autenticado (JWT)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.autores_url, {'ordering': 'birth_date'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], Autor.objects.count())
+        # El listado cacheado se cuenta con len(): siempre exacto
+        self.assertFalse(response.data['count_is_estimate'])
+
+    def test_recalentamiento_descarta_resultado_viejo(self):
+        """
+        Si hay otra escritura mientras la tarea calcula, no guarda el resultado.
+        """
+        def write_during_warm(request):
+            # Simula una escritura concurrente mientras la tarea calcula
+            caching._redis().incr(caching._generation_key(caching.AUTORES_LIST))
+            return []
+
+        self.client.get(self.autores_url)
+        with mock.patch('catalog.views.AutorViewSet.get_list_items', side_effect=write_during_warm):
+            caching._cache().delete_pattern(f'{caching.AUTORES_LIST}_')
+            tasks.warm_list_cache(caching.AUTORES_LIST)
+
+        self.assertIsNone(caching.get_list(caching.AUTORES_LIST, ''))
+
+    def test_detalle_cacheado_se_invalida_al_actualizar(self):
+        """
+        El detalle se sirve desde el caché y una actualización lo invalida.
+        """
+        autor = Autor.objects.get(last_name='Tolkien')
+        detail_url = reverse('autor-detail', args=[autor.id])
+        self.client.get(detail_url)
+
+        # Solo la consulta del usuario autenticado (JWT)
+        with self.assertNumQueries(1):
+            self.client.get(detail_url)
+
+        with mock.patch.object(tasks.warm_list_cache, 'apply_async'):
+            self.client.patch(detail_url, {'first_name': 'John Ronald Reuel'}, format='json')
+
+        response = self.client.get(detail_url)
+        self.assertEqual(response.data['data']['first_name'], 'John Ronald Reuel')
+
+
+@mock.patch.object(tasks.warm_list_cache, 'apply_async')
+class TagInvalidationTests(ListCacheTestCase):
+    """
+    Tests de la invalidación por etiquetas: una escritura solo borra las
+    entradas que la contienen o en las que podría aparecer.
+    """
+
+    def _cache_libros(self, params):
+        query_string = self.client.get(reverse('libro-list'), params).wsgi_request.GET.urlencode()
+        self.assertIsNotNone(caching.get_list(caching.LIBROS_LIST, query_string))
+        return query_string
+
+    def _cached(self, namespace, query_string):
+        return caching.has_list(namespace, query_string)
+
+    def test_editar_biografia_solo_invalida_los_listados_del_autor(self, _):
+        tolkien = Autor.objects.get(last_name='Tolkien')
+        orwell = Autor.objects.get(last_name='Orwell')
+        de_tolkien = self._cache_libros({'autores__id': str(tolkien.id)})
+        de_orwell = self._cache_libros({'autores__id': str(orwell.id)})
+        busqueda = self._cache_libros({'search': 'soledad'})
+        self.client.get(self.autores_url)
+
+        self.client.patch(reverse('autor-detail', args=[tolkien.id]), {'biography': 'Filólogo.'}, format='json')
+
+        self.assertFalse(self._cached(caching.LIBROS_LIST, de_tolkien))
+        self.assertFalse(self._cached(caching.AUTORES_LIST, ''))
+        self.assertTrue(self._cached(caching.LIBROS_LIST, de_orwell))
+        # La biografía no participa en la búsqueda de libros
+        self.assertTrue(self._cached(caching.LIBROS_LIST, busqueda))
+
+    def test_renombrar_autor_invalida_las_busquedas_de_libros(self, _):
+        orwell = Autor.objects.get(last_name='Orwell')
+        busqueda = self._cache_libros({'search': 'Blair'})
+
+        self.client.patch(reverse('autor-detail', args=[orwell.id]), {'last_name': 'Blair'}, format='json')
+
+        self.assertFalse(self._cached(caching.LIBROS_LIST, busqueda))
+        response = self.client.get(reverse('libro-list'), {'search': 'Blair'})
+        self.assertEqual(response.data['count'], 1)
+
+    def test_libro_nuevo_invalida_los_listados_en_los_que_puede_aparecer(self, _):
+        tolkien = Autor.objects.get(last_name='Tolkien')
+        orwell = Autor.objects.get(last_name='Orwell')
+        de_tolkien = self._cache_libros({'autores__id': str(tolkien.id)})
+        de_orwell = self._cache_libros({'autores__id': str(orwell.id)})
+        anos_50 = self._cache_libros({'publication_date__gte': '1950-01-01', 'publication_date__lte': '1959-12-31'})
+        anos_30 = self._cache_libros({'publication_date__gte': '1930-01-01', 'publication_date__lte': '1939-12-31'})
+        todos = self._cache_libros({})
+
+        self.client.post(reverse('libro-list'), {
+            'title': 'El Silmarillion', 'isbn': '9780618391110',
+            'publication_date': '1955-09-15', 'autores': [str(tolkien.id)],
+        }, format='json')
+
+        self.assertFalse(self._cached(caching.LIBROS_LIST, de_tolkien))
+        self.assertFalse(self._cached(caching.LIBROS_LIST, anos_50))
+        self.assertFalse(self._cached(caching.LIBROS_LIST, todos))
+        self.assertTrue(self._cached(caching.LIBROS_LIST, de_orwell))
+        self.assertTrue(self._cached(caching.LIBROS_LIST, anos_30))
+
+        response = self.client.get(reverse('libro-list'), {'autores__id': str(tolkien.id)})
+        self.assertEqual(response.data['count'], 3)
+
+    def test_detalle_de_libro_se_invalida_solo_con_sus_autores(self, _):
+        hobbit = Libro.objects.get(title='El hobbit')
+        novela = Libro.objects.get(title='1984')
+        for libro in (hobbit, novela):
+            self.client.get(reverse('libro-detail', args=[libro.id]))
+
+        tolkien = Autor.objects.get(last_name='Tolkien')
+        self.client.patch(reverse('autor-detail', args=[tolkien.id]), {'first_name': 'J.R.R.'}, format='json')
+
+        self.assertIsNone(caching.get_detail(caching.LIBRO_DETAIL, hobbit.id))
+        self.assertIsNotNone(caching.get_detail(caching.LIBRO_DETAIL, novela.id))
+        response = self.client.get(reverse('libro-detail', args=[hobbit.id]))
+        self.assertEqual(response.data['data']['autores'][0]['first_name'], 'J.R.R.')
+
+    def test_sin_etiquetas_se_vacia_el_namespace(self, _):
+        orwell = Autor.objects.get(last_name='Orwell')
+        tolkien = Autor.objects.get(last_name='Tolkien')
+        de_orwell = self._cache_libros({'autores__id': str(orwell.id)})
+
+        with override_settings(LIST_CACHE={**settings.LIST_CACHE, 'TAG_INVALIDATION': False}):
+            self.client.patch(reverse('autor-detail', args=[tolkien.id]), {'biography': 'Filólogo.'}, format='json')
+
+        self.assertFalse(self._cached(caching.LIBROS_LIST, de_orwell))
+
+
+@mock.patch.object(tasks.warm_list_cache, 'apply_async')
+class FragmentCacheTests(ListCacheTestCase):
+    """
+    Tests del caché de fragmentos JSON por objeto con el que se montan
+    las páginas de los listados.
+    """
+
+    def test_otra_consulta_reutiliza_los_fragmentos(self, _):
+        """
+        Un orden distinto consulta solo los IDs: los objetos ya se
+        serializaron para la primera consulta.
+        """
+        first = self.client.get(self.autores_url, {'ordering': 'last_name'})
+
+        # Usuario (JWT) + IDs del listado, sin leer ni serializar autores
+        with self.assertNumQueries(2):
+            second = self.client.get(self.autores_url, {'ordering': '-last_name'})
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second['Content-Type'], 'application/json')
+        self.assertEqual(
+            sorted(autor['id'] for autor in second.json()['results']),
+            sorted(autor['id'] for autor in first.json()['results']),
+        )
+
+    def test_la_respuesta_es_igual_a_serializar(self, _):
+        """
+        La página montada con fragmentos es idéntica a re-serializarla.
+        """
+        url = reverse('libro-list')
+        self.client.get(url, {'ordering': 'title'})
+        cached = self.client.get(url, {'ordering': 'title'}).content
+
+        caching._cache().delete_pattern(f'{caching.LIBROS_LIST}_')
+        with override_settings(LIST_CACHE={**settings.LIST_CACHE, 'FRAGMENTS': False}):
+            fresh = self.client.get(url, {'ordering': 'title'}).content
+        self.assertEqual(cached, fresh)
+
+    def test_renombrar_autor_cambia_la_version_del_libro(self, _):
+        """
+        El libro muestra a sus autores anidados: renombrar uno cambia su
+        versión y la página no usa el fragmento viejo.
+        """
+        libro = Libro.objects.filter(autores__isnull=False).first()
+        autor = libro.autores.first()
+        url = reverse('libro-list')
+        self.client.get(url, {'isbn': libro.isbn})
+
+        self.client.patch(reverse('autor-detail', args=[autor.id]), {'first_name': 'Renombrado'}, format='json')
+
+        response = self.client.get(url, {'isbn': libro.isbn})
+        nombres = [a['first_name'] for a in response.json()['results'][0]['autores'] if a['id'] == str(autor.id)]
+        self.assertEqual(nombres, ['Renombrado'])
+        # La API navegable sigue funcionando (renderiza los datos parseados)
+        self.assertEqual(response.data['results'][0]['isbn'], libro.isbn)
@@ -0,0 +1,93 @@
+# src/catalog/tests/test_read_model.py
+
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from catalog import caching, serializers, services, tasks
+from catalog.models import Autor, Libro, LibroListado
+
+
+@mock.patch.object(tasks.warm_list_cache, 'apply_async')
+class LibroListadoTests(APITestCase):
+    """
+    Tests del modelo de lectura del listado de libros (LibroListado).
+    """
+    fixtures = ['initial_data.json']
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.orwell = Autor.objects.get(last_name='Orwell')
+        self.tolkien = Autor.objects.get(last_name='Tolkien')
+        caching.invalidate_lists(caching.LIBROS_LIST)
+
+    def _listado(self, libro):
+        return serializers.LibroListadoOutputSerializer(LibroListado.objects.get(pk=libro.pk)).data
+
+    def _assert_igual_al_libro(self, libro):
+        libro = services.get_libro(pk=libro.pk)
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(self._listado(libro)),
+            renderer.render(serializers.LibroOutputSerializer(libro).data),
+        )
+
+    def test_mismo_json_que_el_libro(self, _):
+        for libro in Libro.objects.all():
+            self._assert_igual_al_libro(libro)
+
+    def test_el_listado_lee_una_sola_tabla(self, _):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('libro-list'), {'search': 'Tolkien', 'ordering': 'publication_date'})
+        self.assertEqual(
+            [libro['title'] for libro in response.data['results']],
+            ['El hobbit', 'El Señor de los Anillos: La Comunidad del Anillo'],
+        )
+        # El listado y, si faltan fragmentos, la lectura de esas filas
+        listado = [q['sql'] for q in queries.captured_queries if LibroListado._meta.db_table in q['sql']]
+        self.assertTrue(listado)
+        for sql in listado:
+            self.assertNotIn('JOIN', sql)
+
+        response = self.client.get(reverse('libro-list'), {'autores__id': str(self.orwell.id)})
+        self.assertEqual([libro['title'] for libro in response.data['results']], ['1984'])
+
+    def test_las_escrituras_mantienen_el_modelo(self, _):
+        response = self.client.post(reverse('libro-list'), {
+            'title': 'Animal Farm', 'isbn': '9780451526342', 'publication_date': '1945-08-17',
+            'autores': [str(self.orwell.id), str(self.tolkien.id)],
+        }, format='json')
+        libro = Libro.objects.get(pk=response.data['data']['id'])
+        self._assert_igual_al_libro(libro)
+
+        # Renombrar a un autor reordena y actualiza sus libros
+        self.client.patch(reverse('autor-detail', args=[self.tolkien.id]), {'last_name': 'Abbott'}, format='json')
+        self.assertEqual([autor['last_name'] for autor in self._listado(libro)['autores']], ['Abbott', 'Orwell'])
+        self._assert_igual_al_libro(libro)
+        response = self.client.get(reverse('libro-list'), {'search': 'Abbott'})
+        self.assertEqual(response.data['count'], 3)
+
+        # Borrar un autor lo quita de sus libros
+        self.client.delete(reverse('autor-detail', args=[self.tolkien.id]))
+        self._assert_igual_al_libro(libro)
+
+        self.client.delete(reverse('libro-detail', args=[libro.id]))
+        self.assertFalse(LibroListado.objects.filter(pk=libro.pk).exists())
+
+    def test_rebuild(self, _):
+        LibroListado.objects.all().delete()
+        call_command('rebuild_libro_listado', chunk_size=2, stdout=StringIO())
+
+        self.assertEqual(LibroListado.objects.count(), Libro.objects.count())
+        for libro in Libro.objects.all():
+            self._assert_igual_al_libro(libro)
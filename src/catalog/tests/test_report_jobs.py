@@ -0,0 +1,93 @@
+# src/catalog/tests/test_report_jobs.py
+
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from catalog import tasks
+from catalog.models import Autor
+from config.celery import app as celery_app
+
+
+class ReportJobAPITests(APITestCase):
+    """
+    Tests de integración para los jobs de reportes (encolar, estado y resultado).
+    """
+    fixtures = ['initial_data.json']
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+
+        self.autor_tolkien = Autor.objects.get(last_name='Tolkien')
+        self.report_url = reverse('autor-generate-report', args=[self.autor_tolkien.id])
+        cache.delete(f'report_job_autor_{self.autor_tolkien.id}')
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_job_completo_estado_y_resultado(self):
+        """
+        POST devuelve el job, el estado pasa a SUCCESS y el resultado es el reporte.
+        """
+        celery_app.conf.task_always_eager = True
+        try:
+            with mock.patch.object(tasks.generate_author_report, 'store_eager_result', True):
+                response = self.client.post(self.report_url)
+        finally:
+            celery_app.conf.task_always_eager = False
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job_id = response.data['data']['job_id']
+
+        job = self.client.get(reverse('report-job-detail', args=[job_id]))
+        self.assertEqual(job.data['data']['status'], 'SUCCESS')
+        self.assertEqual(job.data['data']['author_id'], str(self.autor_tolkien.id))
+
+        result = self.client.get(reverse('report-job-result', args=[job_id]))
+        self.assertEqual(result.status_code, status.HTTP_200_OK)
+        report = json.loads(b''.join(result.streaming_content))
+        self.assertEqual(len(report['libros']), 2)
+
+    def test_peticiones_concurrentes_comparten_job(self):
+        """
+        Mientras un job está en curso, pedir otro reporte del mismo autor
+        devuelve el mismo job y no encola otra tarea.
+        """
+        with mock.patch.object(tasks.generate_author_report, 'apply_async') as apply_async:
+            first = self.client.post(self.report_url)
+            second = self.client.post(self.report_url)
+
+        self.assertEqual(apply_async.call_count, 1)
+        self.assertEqual(first.data['data']['job_id'], second.data['data']['job_id'])
+        self.assertEqual(second.data['data']['status'], 'PENDING')
+
+    def test_resultado_no_listo(self):
+        """
+        Pedir el resultado de un job sin terminar devuelve 409.
+        """
+        with mock.patch.object(tasks.generate_author_report, 'apply_async'):
+            job_id = self.client.post(self.report_url).data['data']['job_id']
+
+        response = self.client.get(reverse('report-job-result', args=[job_id]))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['code'], 'not_ready')
+
+    def test_job_inexistente(self):
+        response = self.client.get(reverse('report-job-detail', args=['no-existe']))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
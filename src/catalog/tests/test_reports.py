@@ -0,0 +1,91 @@
+# src/catalog/tests/test_reports.py
+
+import json
+import shutil
+import tempfile
+
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from catalog.models import Autor, Libro
+from catalog import reports, tasks
+
+
+class ReportTests(TestCase):
+    """
+    Tests para la generación de reportes de autores.
+    """
+    fixtures = ['initial_data.json']
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        self.autor_tolkien = Autor.objects.get(last_name='Tolkien')
+        self.autor_orwell = Autor.objects.get(last_name='Orwell')
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _read(self, path):
+        with default_storage.open(path) as f:
+            return json.load(f)
+
+    def test_reporte_contiene_libros_coautores_y_timeline(self):
+        """
+        El reporte incluye los libros ordenados, los co-autores y la línea de tiempo.
+        """
+        # Orwell pasa a ser co-autor de 'El hobbit'
+        Libro.objects.get(title='El hobbit').autores.add(self.autor_orwell)
+
+        result = tasks.generate_author_report(str(self.autor_tolkien.id))
+        report = self._read(result['path'])
+
+        self.assertFalse(result['cached'])
+        self.assertEqual([l['title'] for l in report['libros']][0], 'El hobbit')
+        self.assertEqual(report['coautores'][0]['full_name'], 'George Orwell')
+        self.assertEqual(report['coautores'][0]['shared_books'], 1)
+        self.assertEqual(report['timeline'], [{'year': 1937, 'libros': 1}, {'year': 1954, 'libros': 1}])
+
+    def test_reporte_sin_cambios_se_reutiliza(self):
+        """
+        Si el autor y sus libros no cambiaron, se devuelve el reporte guardado.
+        """
+        first = tasks.generate_author_report(str(self.autor_tolkien.id))
+        second = tasks.generate_author_report(str(self.autor_tolkien.id))
+
+        self.assertTrue(second['cached'])
+        self.assertEqual(first['path'], second['path'])
+
+    def test_reporte_se_regenera_si_cambia_un_libro(self):
+        """
+        Editar un libro del autor invalida el reporte anterior.
+        """
+        first = tasks.generate_author_report(str(self.autor_tolkien.id))
+        libro = Libro.objects.get(title='El hobbit')
+        libro.title = 'El hobbit (edición anotada)'
+        libro.save()
+        second = tasks.generate_author_report(str(self.autor_tolkien.id))
+
+        self.assertFalse(second['cached'])
+        self.assertNotEqual(first['path'], second['path'])
+        self.assertFalse(default_storage.exists(first['path']))
+
+    def test_autor_inexistente(self):
+        result = tasks.generate_author_report('00000000-0000-0000-0000-000000000000')
+        self.assertIn('error', result)
+
+    def test_batch_usa_consultas_por_lote(self):
+        """
+        El modo batch hace un número fijo de consultas por lote, no por autor.
+        """
+        for i in range(20):
+            Autor.objects.create(first_name=f'Autor{i}', last_name='Batch')
+        ids = list(Autor.objects.values_list('id', flat=True))
+
+        # huellas + libros de los autores + autores de esos libros
+        with self.assertNumQueries(3):
+            results = list(reports.generate_reports(ids, chunk_size=len(ids)))
+
+        self.assertEqual(len(results), len(ids))
+        self.assertEqual(tasks.generate_author_reports_batch([str(i) for i in ids]), {'generated': 0, 'reused': len(ids)})
@@ -0,0 +1,118 @@
+# src/catalog/tests/test_similar_books.py
+
+import uuid
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from catalog import services, similar_books, tasks
+from catalog.models import Autor, LibroSimilares
+from catalog.tfidf import tokenize
+
+
+@mock.patch.object(tasks.update_similar_books, 'apply_async')
+@mock.patch.object(tasks.warm_list_cache, 'apply_async')
+class SimilarBooksTests(APITestCase):
+    """
+    Tests de los libros similares (TF-IDF) y de /libros/{id}/similar/.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        self.autor = Autor.objects.create(first_name='Ana', last_name='Autor', birth_date=date(1950, 1, 1))
+        self.dragones, self.dragones_2, self.cocina, self.jardin = [
+            self._libro(i, title, summary)
+            for i, (title, summary) in enumerate([
+                ('Dragones del norte', 'Una saga de dragones, magos y reinos helados.'),
+                ('El regreso de los dragones', 'Los magos del reino vuelven a enfrentarse a los dragones.'),
+                ('Cocina mediterránea', 'Recetas de aceite de oliva, tomate y pescado.'),
+                ('Jardinería urbana', 'Cultivar tomate y hierbas en el balcón.'),
+            ])
+        ]
+        similar_books._redis().delete(similar_books.DIRTY_KEY)
+        similar_books.rebuild()
+
+    def _libro(self, i, title, summary):
+        return services.create_libro(data={
+            'title': title, 'summary': summary, 'isbn': f'978100000{i:04d}',
+            'publication_date': date(2000, 1, 1), 'autores': [self.autor.pk],
+        })
+
+    def _get(self, libro, **params):
+        return self.client.get(reverse('libro-similar', args=[libro.pk]), params)
+
+    def _titles(self, libro, **params):
+        return [item['libro']['title'] for item in self._get(libro, **params).data['data']]
+
+    def test_tokenize(self, *_):
+        self.assertEqual(tokenize('El Dragón y LOS magos, 2ª edición'), ['dragon', 'magos', '2a', 'edicion'])
+
+    def test_similares_ordenados_por_score(self, *_):
+        data = self._get(self.dragones).data['data']
+        self.assertEqual(data[0]['libro']['title'], 'El regreso de los dragones')
+        self.assertEqual([item['score'] for item in data], sorted((item['score'] for item in data), reverse=True))
+        # Comparten autor: todos se parecen algo, pero la cocina más a la jardinería (tomate)
+        self.assertEqual(self._titles(self.cocina)[0], 'Jardinería urbana')
+        self.assertEqual(len(self._titles(self.dragones, limit=1)), 1)
+
+    def test_inexistente_y_limite(self, *_):
+        response = self.client.get(reverse('libro-similar', args=[uuid.uuid4()]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self._get(self.dragones, limit=1000).status_code, 400)
+
+        # Un libro borrado desaparece de las listas aunque siga precalculado
+        services.delete_libro(libro=services.get_libro(pk=self.dragones_2.pk))
+        self.assertNotIn('El regreso de los dragones', self._titles(self.dragones))
+
+    def test_actualizacion_incremental(self, _, update_apply_async):
+        with self.captureOnCommitCallbacks(execute=True):
+            nuevo = self._libro(9, 'Dragones y magos', 'El último reino de los dragones.')
+        update_apply_async.assert_called()
+        # Antes de procesarlo no tiene similares (pero existe)
+        self.assertEqual(self._get(nuevo).data['data'], [])
+
+        self.assertEqual(similar_books.apply_pending(), 1)
+        self.assertEqual(set(self._titles(nuevo)[:2]), {'Dragones del norte', 'El regreso de los dragones'})
+        self.assertIn('Dragones y magos', self._titles(self.dragones)[:2])
+        self.assertEqual(similar_books.apply_pending(), 0)
+
+        # Al cambiar su texto se revectoriza con el mismo vocabulario
+        with self.captureOnCommitCallbacks(execute=True):
+            services.update_libro(libro=services.get_libro(pk=nuevo.pk), data={
+                'title': 'Cocina con tomate', 'summary': 'Recetas de pescado.',
+            })
+        similar_books.apply_pending()
+        self.assertEqual(self._titles(nuevo)[0], 'Cocina mediterránea')
+
+        # La reconstrucción deja el mismo resultado para el libro modificado
+        incremental = LibroSimilares.objects.get(pk=nuevo.pk).vecinos
+        similar_books.rebuild()
+        self.assertEqual([v['id'] for v in LibroSimilares.objects.get(pk=nuevo.pk).vecinos][:1],
+                         [v['id'] for v in incremental][:1])
+
+    def test_renombrar_o_borrar_autor_marca_sus_libros(self, _, update_apply_async):
+        otro = Autor.objects.create(first_name='Otro', last_name='Autor', birth_date=date(1950, 1, 1))
+        libro_ids = {str(libro.pk) for libro in (self.dragones, self.dragones_2, self.cocina, self.jardin)}
+
+        # Cambiar solo la biografía no toca el texto de los libros
+        with self.captureOnCommitCallbacks(execute=True):
+            services.update_autor(autor=self.autor, data={'biography': 'Bio'})
+            services.update_autor(autor=otro, data={'first_name': 'Nadie'})
+        self.assertEqual(similar_books._redis().smembers(similar_books.DIRTY_KEY), set())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            services.update_autor(autor=self.autor, data={'last_name': 'Escritora'})
+        self.assertEqual({m.decode() for m in similar_books._redis().smembers(similar_books.DIRTY_KEY)}, libro_ids)
+
+        similar_books._redis().delete(similar_books.DIRTY_KEY)
+        with self.captureOnCommitCallbacks(execute=True):
+            services.delete_autor(autor=self.autor)
+        self.assertEqual({m.decode() for m in similar_books._redis().smembers(similar_books.DIRTY_KEY)}, libro_ids)
+        update_apply_async.assert_called()
@@ -0,0 +1,115 @@
+# src/catalog/tests/test_upsert.py
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from catalog import caching, tasks
+from catalog.models import Autor, Libro
+
+
+@mock.patch.object(tasks.warm_list_cache, 'apply_async')
+class LibroUpsertTests(APITestCase):
+    """
+    Tests del upsert idempotente de libros por ISBN.
+    """
+    fixtures = ['initial_data.json']
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.orwell = Autor.objects.get(last_name='Orwell')
+        self.tolkien = Autor.objects.get(last_name='Tolkien')
+        self.batch_url = reverse('libro-upsert-batch')
+
+    def _url(self, isbn):
+        return reverse('libro-upsert-by-isbn', args=[isbn])
+
+    def test_crea_y_repetir_es_idempotente(self, _):
+        body = {'title': 'Animal Farm', 'publication_date': '1945-08-17', 'autores': [str(self.orwell.id)]}
+
+        response = self.client.put(self._url('9780451526342'), body, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(response.data['data']['created'])
+        libro = Libro.objects.get(isbn='9780451526342')
+        updated_at = libro.updated_at
+
+        # El reintento no crea otro libro ni cambia nada
+        response = self.client.put(self._url('9780451526342'), body, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['data']['created'])
+        self.assertEqual(response.data['data']['libro']['id'], str(libro.id))
+        self.assertEqual(Libro.objects.filter(isbn='9780451526342').count(), 1)
+        libro.refresh_from_db()
+        self.assertEqual(libro.updated_at, updated_at)
+
+    def test_actualiza_y_reconcilia_autores(self, _):
+        libro = Libro.objects.get(title='1984')
+        response = self.client.put(self._url(libro.isbn), {
+            'title': '1984 (edición anotada)', 'publication_date': '1949-06-08',
+            'autores': [str(self.tolkien.id)],
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['data']['created'])
+        libro.refresh_from_db()
+        self.assertEqual(libro.title, '1984 (edición anotada)')
+        self.assertEqual(list(libro.autores.all()), [self.tolkien])
+        self.assertEqual(
+            [autor['last_name'] for autor in response.data['data']['libro']['autores']], ['Tolkien']
+        )
+
+    def test_isbn_del_cuerpo_distinto_al_de_la_url(self, _):
+        response = self.client.put(self._url('9780451526342'), {
+            'title': 'X', 'isbn': '1111111111111', 'publication_date': '2000-01-01',
+            'autores': [str(self.orwell.id)],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_lote_en_una_sentencia(self, _):
+        existente = Libro.objects.get(title='El hobbit')
+        libros = [
+            {'title': 'El hobbit', 'isbn': existente.isbn, 'publication_date': '1937-09-21',
+             'autores': [str(self.tolkien.id)]},
+            {'title': 'Animal Farm', 'isbn': '9780451526342', 'publication_date': '1945-08-17',
+             'autores': [str(self.orwell.id), str(self.tolkien.id)]},
+        ]
+        # usuario + autores + SAVEPOINT + upsert + DELETE + INSERT de autores
+        # + modelo de lectura + RELEASE
+        with self.assertNumQueries(8):
+            response = self.client.put(self.batch_url, {'libros': libros}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['created'] for r in response.data['data']], [False, True])
+        self.assertEqual(response.data['data'][0]['libro']['id'], str(existente.id))
+        self.assertEqual(Libro.objects.get(isbn='9780451526342').autores.count(), 2)
+
+    def test_lote_con_isbn_repetido_o_autor_inexistente(self, _):
+        libro = {'title': 'X', 'isbn': '9780451526342', 'publication_date': '2000-01-01',
+                 'autores': [str(self.orwell.id)]}
+        response = self.client.put(self.batch_url, {'libros': [libro, libro]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        libro = {**libro, 'autores': ['00000000-0000-0000-0000-000000000000']}
+        response = self.client.put(self.batch_url, {'libros': [libro]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Libro.objects.filter(isbn='9780451526342').exists())
+
+    def test_invalida_los_listados_del_autor(self, _):
+        caching.invalidate_lists(caching.LIBROS_LIST)
+        response = self.client.get(reverse('libro-list'), {'autores__id': str(self.orwell.id)})
+        query_string = response.wsgi_request.GET.urlencode()
+        self.assertEqual(response.data['count'], 1)
+
+        self.client.put(self._url('9780451526342'), {
+            'title': 'Animal Farm', 'publication_date': '1945-08-17', 'autores': [str(self.orwell.id)],
+        }, format='json')
+
+        self.assertFalse(caching.has_list(caching.LIBROS_LIST, query_string))
+        response = self.client.get(reverse('libro-list'), {'autores__id': str(self.orwell.id)})
+        self.assertEqual(response.data['count'], 2)
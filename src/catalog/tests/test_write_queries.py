@@ -0,0 +1,94 @@
+# src/catalog/tests/test_write_queries.py
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from catalog import services, tasks
+from catalog.models import Autor, Libro
+from core.exceptions import DuplicateResourceError
+
+
+@mock.patch.object(tasks.warm_list_cache, 'apply_async')
+class WriteQueryCountTests(APITestCase):
+    """
+    Cuenta las consultas de cada escritura. En todas hay una consulta del
+    usuario autenticado (JWT), y las de libros van en un SAVEPOINT propio
+    (en producción es el BEGIN/COMMIT de la transacción).
+    """
+    fixtures = ['initial_data.json']
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.orwell = Autor.objects.get(last_name='Orwell')
+        self.tolkien = Autor.objects.get(last_name='Tolkien')
+        self.libro = Libro.objects.get(title='1984')
+        self.libro_url = reverse('libro-detail', args=[self.libro.id])
+
+    def test_crear_libro(self, _):
+        # usuario + SAVEPOINT + validación + INSERT libro + INSERT autores
+        # + modelo de lectura + RELEASE
+        with self.assertNumQueries(7):
+            response = self.client.post(reverse('libro-list'), {
+                'title': 'Animal Farm', 'isbn': '9780451526342', 'publication_date': '1945-08-17',
+                'autores': [str(self.orwell.id), str(self.tolkien.id)],
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [autor['last_name'] for autor in response.data['data']['autores']], ['Orwell', 'Tolkien']
+        )
+
+    def test_actualizar_campos_de_libro(self, _):
+        # usuario + libro + autores (prefetch) + SAVEPOINT + UPDATE
+        # + modelo de lectura + RELEASE
+        with self.assertNumQueries(7):
+            response = self.client.patch(self.libro_url, {'title': 'Mil novecientos ochenta y cuatro'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['autores'][0]['last_name'], 'Orwell')
+
+    def test_reemplazar_libro(self, _):
+        # ... + validación + UPDATE + DELETE y INSERT solo de las filas que cambian
+        # + modelo de lectura
+        with self.assertNumQueries(10):
+            response = self.client.put(self.libro_url, {
+                'title': '1984', 'isbn': '9780451524936', 'publication_date': '1949-06-08',
+                'autores': [str(self.tolkien.id)],
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([autor['last_name'] for autor in response.data['data']['autores']], ['Tolkien'])
+        self.assertEqual(list(self.libro.autores.all()), [self.tolkien])
+
+    def test_libro_sin_cambios_no_escribe(self, _):
+        # usuario + libro + autores (prefetch) + SAVEPOINT + RELEASE
+        with self.assertNumQueries(5):
+            response = self.client.patch(self.libro_url, {'title': '1984'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_crear_y_actualizar_autor(self, _):
+        with self.assertNumQueries(2):
+            response = self.client.post(reverse('autor-list'), {'first_name': 'Aldous', 'last_name': 'Huxley'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # usuario + autor + SAVEPOINT + UPDATE + modelo de lectura de sus libros + RELEASE
+        with self.assertNumQueries(6):
+            response = self.client.patch(reverse('autor-detail', args=[self.orwell.id]), {'biography': 'Ensayista.'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_servicio_devuelve_autores_cargados(self, _):
+        libro = services.create_libro(data={
+            'title': 'Homage to Catalonia', 'isbn': '9780156421171', 'publication_date': '1938-04-25',
+            'autores': [self.orwell.id],
+        })
+        with self.assertNumQueries(0):
+            self.assertEqual(list(libro.autores.all()), [self.orwell])
+
+    def test_isbn_duplicado_al_actualizar(self, _):
+        libro = services.get_libro(pk=Libro.objects.get(title='El hobbit').pk)
+        with self.assertRaises(DuplicateResourceError):
+            services.update_libro(libro=libro, data={'isbn': self.libro.isbn, 'autores': [self.tolkien.id]})
@@ -0,0 +1,215 @@
+# src/catalog/tfidf.py
+
+import io
+import re
+import unicodedata
+import uuid
+from collections import defaultdict
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# UUID en bytes (como en coauthor_graph)
+ID_DTYPE = np.dtype('V16')
+
+# Vecinos de un libro: [(id, similitud)] de más a menos parecido
+Neighbors = List[Tuple[uuid.UUID, float]]
+
+_TOKEN_RE = re.compile(r'[a-z0-9]{2,}')
+
+# Palabras vacías (español e inglés) que no distinguen un libro de otro
+STOPWORDS = frozenset("""
+    al como con de del el en es esta este la las lo los mas no para pero por que se sin sobre su sus un una y
+    and are as at be by for from in is it of on or that the this to with
+""".split())
+
+
+def _ids(libro_ids) -> np.ndarray:
+    return np.array([libro_id.bytes for libro_id in libro_ids], dtype=ID_DTYPE).reshape(-1)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Términos de un texto: en minúsculas, sin tildes y sin palabras vacías.
+    """
+    text = unicodedata.normalize('NFKD', text.lower()).encode('ascii', 'ignore').decode()
+    return [token for token in _TOKEN_RE.findall(text) if token not in STOPWORDS]
+
+
+class TfidfIndex:
+    """
+    Vectores TF-IDF (tf sublineal, normalizados a 1) de los libros, en una
+    matriz dispersa CSR con una fila por libro, más el vocabulario y el IDF
+    con los que se calcularon. Los libros nuevos se vectorizan con ese
+    mismo vocabulario (los términos que no estaban se ignoran hasta la
+    próxima reconstrucción).
+
+    'kth_scores' guarda, por fila, la similitud de su k-ésimo vecino: un
+    libro nuevo solo entra en la lista de los libros para los que la supera.
+    """
+
+    def __init__(self, ids: np.ndarray, terms: np.ndarray, idf: np.ndarray,
+                 matrix: sparse.csr_matrix, kth_scores: np.ndarray):
+        self.ids = ids
+        self.terms = terms
+        self.idf = idf
+        self.matrix = matrix
+        self.kth_scores = kth_scores
+        self.vocabulary: Dict[str, int] = {term: i for i, term in enumerate(terms.tolist())}
+        self._rows = {libro_id: row for row, libro_id in enumerate(ids.tolist())}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, libro_id: uuid.UUID):
+        return libro_id.bytes in self._rows
+
+    # --- Construcción ---
+
+    @classmethod
+    def fit(cls, libro_ids: Sequence[uuid.UUID], texts: Sequence[str]) -> 'TfidfIndex':
+        ids = _ids(libro_ids)
+        documents = [tokenize(text) for text in texts]
+        terms = np.array(sorted({token for document in documents for token in document}), dtype=str)
+        index = cls(ids, terms, np.ones(len(terms)), sparse.csr_matrix((0, len(terms))), np.zeros(0))
+        counts = index._counts(documents)
+        # Cada (libro, término) aparece una sola vez en la CSR
+        df = np.bincount(counts.indices, minlength=len(terms))
+        index.idf = np.log((1 + len(documents)) / (1 + df)) + 1
+        index.matrix = index._weight(counts)
+        index.kth_scores = np.zeros(len(ids), dtype=np.float32)
+        return index
+
+    def _counts(self, documents: Sequence[List[str]]) -> sparse.csr_matrix:
+        rows, cols = [], []
+        for row, document in enumerate(documents):
+            for token in document:
+                col = self.vocabulary.get(token)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        # Los pares repetidos se suman: queda la frecuencia de cada término
+        counts = sparse.coo_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(len(documents), len(self.terms))
+        ).tocsr()
+        counts.sum_duplicates()
+        return counts
+
+    def _weight(self, counts: sparse.csr_matrix) -> sparse.csr_matrix:
+        if counts.shape[0] == 0:
+            return counts
+        matrix = counts.copy()
+        matrix.data = (1 + np.log(matrix.data)) * self.idf[matrix.indices]
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix, dtype=np.float32)
+
+    def _upsert(self, libro_ids: Sequence[uuid.UUID], texts: Sequence[str]) -> np.ndarray:
+        # Libros nuevos (se añaden al final) o modificados (se reemplaza su
+        # fila). Devuelve las filas que ocupan
+        ids = _ids(libro_ids)
+        vectors = self._weight(self._counts([tokenize(text) for text in texts]))
+        rows = np.array([self._rows.get(libro_id, -1) for libro_id in ids.tolist()], dtype=np.int64)
+        new = rows < 0
+        rows[new] = len(self.ids) + np.arange(new.sum())
+        total = len(self.ids) + int(new.sum())
+
+        # Sin bucles por fila: se anulan las filas reemplazadas y se suman
+        # los vectores nuevos colocados en su fila (P[rows[i], i] = 1)
+        matrix = sparse.vstack([self.matrix, sparse.csr_matrix((int(new.sum()), len(self.terms)))])
+        keep = np.ones(total, dtype=np.float32)
+        keep[rows] = 0
+        placement = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, np.arange(len(rows)))), shape=(total, len(rows))
+        )
+        self.matrix = sparse.csr_matrix(sparse.diags(keep) @ matrix + placement @ vectors, dtype=np.float32)
+        self.matrix.eliminate_zeros()
+
+        self.ids = np.concatenate([self.ids, ids[new]])
+        self.kth_scores = np.concatenate([self.kth_scores, np.zeros(int(new.sum()), dtype=np.float32)])
+        self._rows.update({libro_id: int(row) for libro_id, row in zip(ids[new].tolist(), rows[new].tolist())})
+        return rows
+
+    # --- Vecinos ---
+
+    def _similarities(self, rows: np.ndarray) -> np.ndarray:
+        # Similitud coseno (densa) de las filas con todos los libros; la de
+        # cada libro consigo mismo queda fuera (-1)
+        scores = (self.matrix[rows] @ self.matrix.T).toarray()
+        scores[np.arange(len(rows)), rows] = -1
+        return scores
+
+    def _top_k(self, rows: np.ndarray, scores: np.ndarray, k: int, min_score: float) -> Dict[uuid.UUID, Neighbors]:
+        # Los k más parecidos de cada fila (con similitud >= min_score);
+        # actualiza 'kth_scores' de esas filas
+        k = min(k, scores.shape[1])
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k] if k else np.zeros((len(rows), 0), int)
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind='stable')
+        candidates = np.take_along_axis(candidates, order, axis=1)
+        candidate_scores = np.take_along_axis(candidate_scores, order, axis=1)
+
+        result = {}
+        for row, neighbors, values in zip(rows.tolist(), candidates.tolist(), candidate_scores.tolist()):
+            kept = [
+                (self.libro_id(neighbor), value)
+                for neighbor, value in zip(neighbors, values) if value > 0 and value >= min_score
+            ]
+            self.kth_scores[row] = kept[-1][1] if k and len(kept) == k else min_score
+            result[self.libro_id(row)] = kept
+        return result
+
+    def libro_id(self, row: int) -> uuid.UUID:
+        return uuid.UUID(bytes=self.ids[row].tobytes())
+
+    def set_kth_score(self, libro_id: uuid.UUID, score: float):
+        self.kth_scores[self._rows[libro_id.bytes]] = score
+
+    def all_neighbors(self, k: int, min_score: float, chunk_cells: int) -> Iterator[Dict[uuid.UUID, Neighbors]]:
+        """
+        Vecinos de todos los libros, por bloques de filas: cada bloque
+        calcula una matriz densa de a lo sumo 'chunk_cells' similitudes.
+        """
+        chunk = max(1, chunk_cells // max(len(self.ids), 1))
+        for start in range(0, len(self.ids), chunk):
+            rows = np.arange(start, min(start + chunk, len(self.ids)))
+            yield self._top_k(rows, self._similarities(rows), k, min_score)
+
+    def update(self, libro_ids: Sequence[uuid.UUID], texts: Sequence[str], k: int,
+               min_score: float) -> Tuple[Dict[uuid.UUID, Neighbors], Dict[uuid.UUID, Neighbors]]:
+        """
+        Añade o reemplaza libros sin recalcular el resto. Devuelve sus
+        vecinos y, para los demás libros, los de estos que deben entrar en
+        su lista (los que superan su k-ésimo vecino actual).
+        """
+        rows = self._upsert(libro_ids, texts)
+        scores = self._similarities(rows)
+        own = self._top_k(rows, scores, k, min_score)
+
+        enters = (scores > self.kth_scores[np.newaxis, :]) & (scores > 0) & (scores >= min_score)
+        enters[:, rows] = False
+        others = defaultdict(list)
+        for i, j in zip(*np.nonzero(enters)):
+            others[self.libro_id(int(j))].append((self.libro_id(int(rows[i])), float(scores[i, j])))
+        return own, dict(others)
+
+    # --- Serialización ---
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer, ids=self.ids.view(np.uint8), terms=self.terms, idf=self.idf, kth_scores=self.kth_scores,
+            data=self.matrix.data, indices=self.matrix.indices, indptr=self.matrix.indptr,
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, content: bytes) -> 'TfidfIndex':
+        with np.load(io.BytesIO(content)) as arrays:
+            terms = arrays['terms']
+            matrix = sparse.csr_matrix(
+                (arrays['data'], arrays['indices'], arrays['indptr']),
+                shape=(len(arrays['indptr']) - 1, len(terms)),
+            )
+            return cls(arrays['ids'].view(ID_DTYPE), terms, arrays['idf'], matrix, arrays['kth_scores'])
@@ -8,6 +8,7 @@ router = DefaultRouter()
 
 router.register(r'autores', views.AutorViewSet, basename='autor')
 router.register(r'libros', views.LibroViewSet, basename='libro')
+router.register(r'report-jobs', views.ReportJobViewSet, basename='report-job')
 urlpatterns = [
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,20 +1,28 @@
 # src/catalog/views.py
 
+from django.conf import settings
 from rest_framework import viewsets, status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from . import services
 from . import serializers
+from . import caching
 from core.helpers import api_success_response
-from drf_spectacular.utils import extend_schema 
-from rest_framework.pagination import PageNumberPagination 
-from django.core.cache import cache 
+from core.exceptions import BusinessValidationError
+from core.profiling import ProfilingMixin
+from core.statement_timeout import StatementTimeoutMixin
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.types import OpenApiTypes
+from core.pagination import EstimatedCountPagination
+from django.http import FileResponse
+from django.urls import reverse
 from rest_framework.decorators import action 
-from . import tasks 
 from .models import Autor, Libro
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
+from .filters import LibroListadoFilterBackend, LibroListadoSearchFilter
 
-class AutorViewSet(viewsets.ViewSet):
+class AutorViewSet(ProfilingMixin, StatementTimeoutMixin, viewsets.ViewSet):
     """
     ViewSet para el CRUD de Autores.
     Utiliza la capa de servicios y los helpers de respuesta.
@@ -43,37 +51,59 @@ class AutorViewSet(viewsets.ViewSet):
         """
         Listar todos los autores que son paginados, cacheado y pueden ser filtrados.
         """
-        # 1. Clave de caché dinámica
-        cache_key = f'autores_list_{request.query_params.urlencode()}'
+        # 1. Clave de caché dinámica (según los query params)
+        query_string = request.query_params.urlencode()
         
         # 2. Intentar obtener el QUERYSET cacheado
-        cached_queryset = cache.get(cache_key)
+        cached_queryset = caching.get_list(caching.AUTORES_LIST, query_string, request)
 
-        if not cached_queryset:
+        if cached_queryset is None:
             # --- CACHE MISS ---
             # 3. Si no está en caché, hacemos el trabajo pesado
-            queryset = services.list_autores()
-
-            # 4. Aplicar filtros, búsqueda y ordenamiento
-            for backend in list(self.filter_backends):
-                queryset = backend().filter_queryset(request, queryset, self)
+            cached_queryset = self.get_list_items(request)
             
-            # 5. Convertir el queryset a una lista para cachearlo
-            cached_queryset = list(queryset)
-            
-            # 6. Guardar la lista (el resultado de la DB) en el caché
-            cache.set(cache_key, cached_queryset, timeout=300)
+            # 4. Guardar la lista (el resultado de la DB) en el caché
+            caching.set_list(caching.AUTORES_LIST, query_string, cached_queryset)
         
         # --- LÓGICA DE VISTA ---
-        # 7. Paginar la lista (ya sea del caché o recién consultada)
-        paginator = PageNumberPagination()
-        paginated_autores = paginator.paginate_queryset(cached_queryset, request)
+        # 5. Paginar la lista de entradas (ya sea del caché o recién consultada)
+        paginator = EstimatedCountPagination()
+        page = paginator.paginate_queryset(cached_queryset, request)
         
-        # 8. Serializar
-        serializer = serializers.AutorOutputSerializer(paginated_autores, many=True)
+        # 6. JSON de cada autor de la página (fragmentos cacheados o serializados)
+        fragments = self.get_list_fragments(page)
         
-        # 9. Devolver la respuesta paginada y con headers de Rate Limit
-        return paginator.get_paginated_response(serializer.data)
+        # 7. Montar la respuesta paginada con los fragmentos tal cual
+        return paginator.get_prerendered_response(
+            [fragments[entry.pk] for entry in page if entry.pk in fragments]
+        )
+
+    def get_list_items(self, request):
+        """
+        Ejecuta la consulta del listado (servicio + filtros, búsqueda y
+        ordenamiento) y devuelve sus entradas (ID y versión, en orden) para
+        poder cachearla. También la usa la tarea que recalienta el caché.
+        """
+        return services.list_autor_entries(self.get_list_queryset(request))
+
+    def get_list_fragments(self, entries):
+        """
+        JSON de cada entrada ({pk: bytes}), del caché de fragmentos o
+        serializando solo los que faltan.
+        """
+        return _render_fragments(
+            caching.AUTOR_FRAGMENT, entries, serializers.AutorOutputSerializer,
+            lambda ids: services.list_autores().filter(pk__in=ids)
+        )
+
+    def get_list_queryset(self, request):
+        """
+        Consulta del listado sin ejecutar (la usa también el index_advisor).
+        """
+        queryset = services.list_autores()
+        for backend in list(self.filter_backends):
+            queryset = backend().filter_queryset(request, queryset, self)
+        return queryset
 
     @extend_schema(
         summary="Crear un nuevo autor",
@@ -92,7 +122,7 @@ class AutorViewSet(viewsets.ViewSet):
         output_serializer = serializers.AutorOutputSerializer(autor)
         
         # --- 4. INVALIDACIÓN DE CACHÉ ---
-        cache.delete_pattern('autores_list_*')
+        caching.invalidate_autor(autor, created=True)
         # --- FIN INVALIDACIÓN ---
         
         return api_success_response(
@@ -106,11 +136,49 @@ class AutorViewSet(viewsets.ViewSet):
     )
     def retrieve(self, request, pk=None):
         """
-        Obtener un autor por su PK.
+        Obtener un autor por su PK (cacheado).
         """
-        autor = services.get_autor(pk=pk)
-        serializer = serializers.AutorOutputSerializer(autor)
-        return api_success_response(data=serializer.data)
+        data = caching.get_detail(caching.AUTOR_DETAIL, pk)
+        if data is None:
+            autor = services.get_autor(pk=pk)
+            data = serializers.AutorOutputSerializer(autor).data
+            caching.set_detail(caching.AUTOR_DETAIL, pk, data)
+        return api_success_response(data=data)
+
+    @extend_schema(
+        summary="Obtener varios autores por ID",
+        description=(
+            "Devuelve los autores pedidos en 'ids' (UUIDs separados por comas) en el mismo orden. "
+            "Los que no existen aparecen con found=false."
+        ),
+        parameters=[OpenApiParameter('ids', OpenApiTypes.STR, OpenApiParameter.QUERY, required=True)],
+        responses=serializers.AutorBatchItemOutputSerializer(many=True)
+    )
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        """
+        Multi-get de autores: una consulta para los que no están en caché.
+        """
+        return _batch_response(
+            request, caching.AUTOR_DETAIL, services.get_autores_by_ids, serializers.AutorOutputSerializer
+        )
+
+    @extend_schema(
+        summary="Feed de cambios de autores",
+        description=(
+            "Altas, modificaciones y borrados de autores en orden, para sincronización incremental. "
+            "Se empieza sin 'since' y se pide la siguiente página con el 'next_cursor' recibido. "
+            "Un cursor más antiguo que la retención de borrados responde 410: hay que resincronizar."
+        ),
+        parameters=[
+            OpenApiParameter('since', OpenApiTypes.STR, OpenApiParameter.QUERY),
+            OpenApiParameter('limit', OpenApiTypes.INT, OpenApiParameter.QUERY),
+        ],
+        responses=serializers.AutorChangeFeedOutputSerializer
+    )
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        return _changes_response(request, Autor, serializers.AutorOutputSerializer)
 
     @extend_schema(
         summary="Actualizar un autor",
@@ -122,6 +190,7 @@ class AutorViewSet(viewsets.ViewSet):
         Actualizar un autor existente.
         """
         autor = services.get_autor(pk=pk)
+        nombre = (autor.first_name, autor.last_name)
         
         serializer = serializers.AutorInputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -131,7 +200,11 @@ class AutorViewSet(viewsets.ViewSet):
         output_serializer = serializers.AutorOutputSerializer(autor_actualizado)
         
         # --- INVALIDACIÓN DE CACHÉ ---
-        cache.delete_pattern('autores_list_*')
+        # Los libros muestran los datos del autor anidados
+        caching.invalidate_autor(
+            autor_actualizado,
+            renamed=nombre != (autor_actualizado.first_name, autor_actualizado.last_name)
+        )
         # --- FIN INVALIDACIÓN ---
         
         return api_success_response(data=output_serializer.data)
@@ -146,6 +219,7 @@ class AutorViewSet(viewsets.ViewSet):
         Actualizar un autor existente (parcial).
         """
         autor = services.get_autor(pk=pk)
+        nombre = (autor.first_name, autor.last_name)
         
         serializer = serializers.AutorInputSerializer(data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
@@ -155,7 +229,10 @@ class AutorViewSet(viewsets.ViewSet):
         output_serializer = serializers.AutorOutputSerializer(autor_actualizado)
         
         # --- INVALIDACIÓN DE CACHÉ---
-        cache.delete_pattern('autores_list_*')
+        caching.invalidate_autor(
+            autor_actualizado,
+            renamed=nombre != (autor_actualizado.first_name, autor_actualizado.last_name)
+        )
         # --- FIN INVALIDACIÓN ---
         
         return api_success_response(data=output_serializer.data)
@@ -166,20 +243,25 @@ class AutorViewSet(viewsets.ViewSet):
         Eliminar un autor.
         """
         autor = services.get_autor(pk=pk)
+        autor_id = autor.pk
         services.delete_autor(autor=autor)
+        # delete() deja el pk de la instancia en None
+        autor.pk = autor_id
         
         # --- INVALIDACIÓN DE CACHÉ ---
-        cache.delete_pattern('autores_list_*')
-        cache.delete_pattern('libros_list_*') 
+        caching.invalidate_autor(autor, deleted=True)
         # --- FIN INVALIDACIÓN ---
         
         return Response(status=status.HTTP_204_NO_CONTENT)
         
     @extend_schema(
         summary="Generar reporte de autor",
-        description="Inicia una tarea asíncrona (10 seg) para generar un reporte.",
+        description=(
+            "Inicia una tarea asíncrona que genera el reporte del autor (libros, co-autores y línea de tiempo). "
+            "Devuelve el job para consultar su estado; si ya hay uno en curso para el autor, devuelve ese mismo."
+        ),
         request=None,
-        responses={202: {"description": "La generación del reporte ha comenzado."}}
+        responses={202: serializers.ReportJobOutputSerializer}
     )
     @action(detail=True, methods=['post'])
     def generate_report(self, request, pk=None):
@@ -187,14 +269,150 @@ class AutorViewSet(viewsets.ViewSet):
         Llama a una tarea Celery para generar un reporte.
         """
         autor = services.get_autor(pk=pk)
-        tasks.generate_author_report.delay(str(autor.id))
-        return Response(
-            {"status": "La generación del reporte ha comenzado."}, 
-            status=status.HTTP_202_ACCEPTED
+        job = services.enqueue_author_report(autor=autor)
+        return api_success_response(
+            data=_report_job_data(request, job),
+            status_code=status.HTTP_202_ACCEPTED
         )
 
 
-class LibroViewSet(viewsets.ViewSet):
+    @extend_schema(
+        summary="Co-autores de un autor",
+        description=(
+            "Co-autores ordenados por libros compartidos y conexiones de segundo grado (co-autores de sus "
+            "co-autores) ordenadas por co-autores en común. Se sirve de un grafo precalculado que se "
+            "actualiza unos segundos después de cada escritura. Mientras el grafo se construye "
+            "(primer despliegue) responde 503."
+        ),
+        parameters=[OpenApiParameter('limit', OpenApiTypes.INT, OpenApiParameter.QUERY)],
+        responses=serializers.CoautoresOutputSerializer
+    )
+    @action(detail=True, methods=['get'])
+    def coautores(self, request, pk=None):
+        input_serializer = serializers.CoautoresInputSerializer(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+        limit = input_serializer.validated_data.get('limit', settings.COAUTHOR_GRAPH['DEFAULT_LIMIT'])
+
+        related = services.get_coautores(pk=pk, limit=limit)
+        return api_success_response(data=serializers.CoautoresOutputSerializer(related).data)
+
+
+def _batch_response(request, namespace, fetch, output_serializer_class):
+    """
+    Resuelve un multi-get: lo que está en el caché de detalles se sirve de
+    ahí, el resto se carga con un solo 'fetch(ids=...)' y se cachea.
+    Responde en el orden pedido, con found=False para los que no existen.
+    """
+    input_serializer = serializers.BatchIdsInputSerializer(data=request.query_params)
+    input_serializer.is_valid(raise_exception=True)
+    ids = input_serializer.validated_data['ids']
+
+    found = caching.get_details(namespace, ids)
+    missing = [pk for pk in dict.fromkeys(ids) if pk not in found]
+    if missing:
+        loaded = {obj.pk: output_serializer_class(obj).data for obj in fetch(ids=missing)}
+        caching.set_details(namespace, loaded)
+        found.update(loaded)
+
+    return api_success_response(data=[
+        {'id': str(pk), 'found': pk in found, 'data': found.get(pk)} for pk in ids
+    ])
+
+
+def _render_fragments(namespace, entries, serializer_class, fetch):
+    """
+    JSON renderizado de cada entrada de un listado: {pk: bytes}. Lee los
+    fragmentos cacheados con un solo MGET, consulta y serializa solo los
+    que faltan ('fetch' recibe sus IDs) y los guarda para las siguientes
+    peticiones, sea cual sea su filtro u orden. Si un objeto se borró
+    después de cachear el listado, no aparece en el resultado.
+    """
+    use_cache = settings.LIST_CACHE['FRAGMENTS']
+    fragments = caching.get_fragments(namespace, entries) if use_cache else {}
+    missing = [entry for entry in entries if entry.pk not in fragments]
+    if not missing:
+        return fragments
+
+    objects = list(fetch([entry.pk for entry in missing]))
+    renderer = JSONRenderer()
+    rendered = {
+        obj.pk: renderer.render(data)
+        for obj, data in zip(objects, serializer_class(objects, many=True).data)
+    }
+    fragments.update(rendered)
+    if use_cache:
+        caching.set_fragments(namespace, {entry: rendered[entry.pk] for entry in missing if entry.pk in rendered})
+    return fragments
+
+
+def _changes_response(request, model, output_serializer_class):
+    """
+    Una página del feed de cambios de 'model' a partir del cursor 'since'.
+    """
+    input_serializer = serializers.ChangeFeedInputSerializer(data=request.query_params)
+    input_serializer.is_valid(raise_exception=True)
+    params = input_serializer.validated_data
+
+    page = services.list_changes(
+        model=model, since=params.get('since'),
+        limit=params.get('limit', settings.CHANGE_FEED['DEFAULT_LIMIT'])
+    )
+    return api_success_response(data={
+        'results': [
+            {'op': op, 'id': str(object_id), 'data': output_serializer_class(obj).data if obj else None}
+            for op, object_id, obj in page['changes']
+        ],
+        'next_cursor': services.encode_change_cursor(*page['next']),
+        'has_more': page['has_more'],
+    })
+
+
+def _report_job_data(request, job):
+    """
+    Serializa un job de reporte añadiendo las URLs de estado y resultado.
+    """
+    job = {
+        **job,
+        'status_url': request.build_absolute_uri(reverse('report-job-detail', args=[job['job_id']])),
+        'result_url': request.build_absolute_uri(reverse('report-job-result', args=[job['job_id']])),
+    }
+    return serializers.ReportJobOutputSerializer(job).data
+
+
+class ReportJobViewSet(StatementTimeoutMixin, viewsets.ViewSet):
+    """
+    ViewSet para consultar los jobs de reportes y descargar su resultado.
+    """
+    serializer_class = serializers.ReportJobOutputSerializer
+    job_id_parameter = OpenApiParameter('id', OpenApiTypes.UUID, OpenApiParameter.PATH)
+
+    @extend_schema(
+        summary="Estado de un job de reporte",
+        parameters=[job_id_parameter],
+        responses=serializers.ReportJobOutputSerializer
+    )
+    def retrieve(self, request, pk=None):
+        """
+        Devuelve el estado (PENDING, PROGRESS, SUCCESS, FAILURE) y el progreso.
+        """
+        job = services.get_report_job(job_id=pk)
+        return api_success_response(data=_report_job_data(request, job))
+
+    @extend_schema(
+        summary="Descargar el resultado de un job de reporte",
+        parameters=[job_id_parameter],
+        responses={(200, 'application/json'): OpenApiTypes.OBJECT}
+    )
+    @action(detail=True, methods=['get'])
+    def result(self, request, pk=None):
+        """
+        Devuelve el reporte terminado como un stream (409 si aún no está listo).
+        """
+        report_file = services.open_report_result(job_id=pk)
+        return FileResponse(report_file, content_type='application/json')
+
+
+class LibroViewSet(ProfilingMixin, StatementTimeoutMixin, viewsets.ViewSet):
     """
     ViewSet para el CRUD de Libros.
     """
@@ -216,6 +434,10 @@ class LibroViewSet(viewsets.ViewSet):
     
     # Ordenamiento
     ordering_fields = ['title', 'publication_date']
+
+    # Lo declarado arriba documenta los parámetros; el listado los aplica
+    # sobre el modelo de lectura (LibroListado) con estos backends
+    list_filter_backends = [LibroListadoFilterBackend, LibroListadoSearchFilter, OrderingFilter]
     
     
     @extend_schema(
@@ -227,29 +449,45 @@ class LibroViewSet(viewsets.ViewSet):
         Listar todos los libros (paginado, cacheado, filtrado).
         """
         # 1. Clave de caché dinámica
-        cache_key = f'libros_list_{request.query_params.urlencode()}'
+        query_string = request.query_params.urlencode()
         
         # 2. Intentar obtener el QUERYSET cacheado
-        cached_queryset = cache.get(cache_key)
+        cached_queryset = caching.get_list(caching.LIBROS_LIST, query_string, request)
         
-        if not cached_queryset:
+        if cached_queryset is None:
             # --- CACHE MISS ---
-            queryset = services.list_libros()
-
-            for backend in list(self.filter_backends):
-                queryset = backend().filter_queryset(request, queryset, self)
+            cached_queryset = self.get_list_items(request)
             
-            cached_queryset = list(queryset)
-            
-            cache.set(cache_key, cached_queryset, timeout=300)
+            caching.set_list(caching.LIBROS_LIST, query_string, cached_queryset)
         
         # --- LÓGICA DE VISTA ---
-        paginator = PageNumberPagination()
-        paginated_libros = paginator.paginate_queryset(cached_queryset, request)
+        paginator = EstimatedCountPagination()
+        page = paginator.paginate_queryset(cached_queryset, request)
         
-        serializer = serializers.LibroOutputSerializer(paginated_libros, many=True)
+        fragments = self.get_list_fragments(page)
         
-        return paginator.get_paginated_response(serializer.data)
+        return paginator.get_prerendered_response(
+            [fragments[entry.pk] for entry in page if entry.pk in fragments]
+        )
+
+    def get_list_items(self, request):
+        """
+        Ejecuta la consulta del listado con filtros, búsqueda y ordenamiento
+        y devuelve sus entradas (ID, versión y autores, en orden).
+        """
+        return services.list_libro_entries(self.get_list_queryset(request))
+
+    def get_list_fragments(self, entries):
+        return _render_fragments(
+            caching.LIBRO_FRAGMENT, entries, serializers.LibroListadoOutputSerializer,
+            lambda ids: services.get_libros_listado_by_ids(ids=ids)
+        )
+
+    def get_list_queryset(self, request):
+        queryset = services.list_libros_listado()
+        for backend in list(self.list_filter_backends):
+            queryset = backend().filter_queryset(request, queryset, self)
+        return queryset
 
     @extend_schema(
         summary="Crear un nuevo libro",
@@ -260,14 +498,14 @@ class LibroViewSet(viewsets.ViewSet):
         serializer = serializers.LibroInputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        libro = services.create_libro(data=serializer.validated_data)
-        
-        libro_creado = services.get_libro(pk=libro.pk)
+        # El servicio devuelve el libro con sus autores: no hace falta releerlo
+        libro_creado = services.create_libro(data=serializer.validated_data)
         output_serializer = serializers.LibroOutputSerializer(libro_creado)
         
         # --- 4. INVALIDACIÓN DE CACHÉ ---
-        cache.delete_pattern('libros_list_*')
-        cache.delete_pattern('autores_list_*')
+        caching.invalidate_libro(
+            libro_creado, autor_ids=[a.pk for a in libro_creado.autores.all()], created=True
+        )
         # --- FIN INVALIDACIÓN ---
         
         return api_success_response(
@@ -280,9 +518,48 @@ class LibroViewSet(viewsets.ViewSet):
         responses=serializers.LibroOutputSerializer
     )
     def retrieve(self, request, pk=None):
-        libro = services.get_libro(pk=pk)
-        serializer = serializers.LibroOutputSerializer(libro)
-        return api_success_response(data=serializer.data)
+        data = caching.get_detail(caching.LIBRO_DETAIL, pk)
+        if data is None:
+            libro = services.get_libro(pk=pk)
+            data = serializers.LibroOutputSerializer(libro).data
+            caching.set_detail(caching.LIBRO_DETAIL, pk, data)
+        return api_success_response(data=data)
+
+    @extend_schema(
+        summary="Obtener varios libros por ID",
+        description=(
+            "Devuelve los libros pedidos en 'ids' (UUIDs separados por comas) en el mismo orden. "
+            "Los que no existen aparecen con found=false."
+        ),
+        parameters=[OpenApiParameter('ids', OpenApiTypes.STR, OpenApiParameter.QUERY, required=True)],
+        responses=serializers.LibroBatchItemOutputSerializer(many=True)
+    )
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        """
+        Multi-get de libros: una consulta y un prefetch para los que no
+        están en caché.
+        """
+        return _batch_response(
+            request, caching.LIBRO_DETAIL, services.get_libros_by_ids, serializers.LibroOutputSerializer
+        )
+
+    @extend_schema(
+        summary="Feed de cambios de libros",
+        description=(
+            "Altas, modificaciones y borrados de libros en orden, para sincronización incremental. "
+            "Se empieza sin 'since' y se pide la siguiente página con el 'next_cursor' recibido. "
+            "Un cursor más antiguo que la retención de borrados responde 410: hay que resincronizar."
+        ),
+        parameters=[
+            OpenApiParameter('since', OpenApiTypes.STR, OpenApiParameter.QUERY),
+            OpenApiParameter('limit', OpenApiTypes.INT, OpenApiParameter.QUERY),
+        ],
+        responses=serializers.LibroChangeFeedOutputSerializer
+    )
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        return _changes_response(request, Libro, serializers.LibroOutputSerializer)
 
     @extend_schema(
         summary="Actualizar un libro ",
@@ -291,6 +568,8 @@ class LibroViewSet(viewsets.ViewSet):
     )
     def update(self, request, pk=None):
         libro = services.get_libro(pk=pk)
+        # Autores previos (del prefetch), para saber a quién cambia el book_count
+        old_autor_ids = [a.pk for a in libro.autores.all()]
         
         serializer = serializers.LibroInputSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -300,8 +579,10 @@ class LibroViewSet(viewsets.ViewSet):
         output_serializer = serializers.LibroOutputSerializer(libro_actualizado)
         
         # --- 4. INVALIDACIÓN DE CACHÉ ---
-        cache.delete_pattern('libros_list_*')
-        cache.delete_pattern('autores_list_*')
+        caching.invalidate_libro(
+            libro_actualizado, autor_ids=[a.pk for a in libro_actualizado.autores.all()],
+            old_autor_ids=old_autor_ids
+        )
         # --- FIN INVALIDACIÓN ---
         
         return api_success_response(data=output_serializer.data)
@@ -313,6 +594,8 @@ class LibroViewSet(viewsets.ViewSet):
     )
     def partial_update(self, request, pk=None):
         libro = services.get_libro(pk=pk)
+        # Autores previos (del prefetch), para saber a quién cambia el book_count
+        old_autor_ids = [a.pk for a in libro.autores.all()]
         
         serializer = serializers.LibroInputSerializer(data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
@@ -322,8 +605,10 @@ class LibroViewSet(viewsets.ViewSet):
         output_serializer = serializers.LibroOutputSerializer(libro_actualizado)
         
         # --- 4. INVALIDACIÓN DE CACHÉ ---
-        cache.delete_pattern('libros_list_*')
-        cache.delete_pattern('autores_list_*')
+        caching.invalidate_libro(
+            libro_actualizado, autor_ids=[a.pk for a in libro_actualizado.autores.all()],
+            old_autor_ids=old_autor_ids
+        )
         # --- FIN INVALIDACIÓN ---
         
         return api_success_response(data=output_serializer.data)
@@ -331,11 +616,97 @@ class LibroViewSet(viewsets.ViewSet):
     @extend_schema(summary="Eliminar un libro")
     def destroy(self, request, pk=None):
         libro = services.get_libro(pk=pk)
+        autor_ids = [a.pk for a in libro.autores.all()]
+        libro_id = libro.pk
         services.delete_libro(libro=libro)
+        # delete() deja el pk de la instancia en None
+        libro.pk = libro_id
         
         # --- 4. INVALIDACIÓN DE CACHÉ ---
-        cache.delete_pattern('libros_list_*')
-        cache.delete_pattern('autores_list_*')
+        caching.invalidate_libro(libro, autor_ids=autor_ids, deleted=True)
         # --- FIN INVALIDACIÓN ---
         
-        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @extend_schema(
+        summary="Libros similares",
+        description=(
+            "Los libros más parecidos por título, resumen y autores (similitud coseno de TF-IDF), "
+            "precalculados por un job en segundo plano. Un libro recién creado o modificado se "
+            "incorpora unos segundos después."
+        ),
+        parameters=[OpenApiParameter('limit', OpenApiTypes.INT, OpenApiParameter.QUERY)],
+        responses=serializers.LibroSimilarOutputSerializer(many=True)
+    )
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        input_serializer = serializers.SimilaresInputSerializer(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+        limit = input_serializer.validated_data.get('limit', settings.SIMILAR_BOOKS['DEFAULT_LIMIT'])
+
+        similares = services.get_libros_similares(pk=pk, limit=limit)
+        return api_success_response(data=serializers.LibroSimilarOutputSerializer(similares, many=True).data)
+
+    @extend_schema(
+        summary="Crear o actualizar un libro por ISBN",
+        operation_id="catalog_libros_by_isbn_upsert",
+        description=(
+            "Upsert idempotente sobre el ISBN: crea el libro si no existe o lo reemplaza si existe "
+            "(los autores quedan exactamente como los enviados). Repetir la petición es seguro. "
+            "Responde 201 si lo creó y 200 si lo actualizó."
+        ),
+        request=serializers.LibroInputSerializer,
+        responses={200: serializers.LibroUpsertOutputSerializer, 201: serializers.LibroUpsertOutputSerializer}
+    )
+    @action(detail=False, methods=['put'], url_path=r'by-isbn/(?P<isbn>[^/.]+)')
+    def upsert_by_isbn(self, request, isbn=None):
+        if 'isbn' in request.data and request.data['isbn'] != isbn:
+            raise BusinessValidationError(detail="El ISBN del cuerpo no coincide con el de la URL.")
+
+        serializer = serializers.LibroInputSerializer(data={**request.data, 'isbn': isbn})
+        serializer.is_valid(raise_exception=True)
+
+        [result] = services.upsert_libros(items=[serializer.validated_data])
+        _invalidate_upserts([result])
+
+        return api_success_response(
+            data=serializers.LibroUpsertOutputSerializer(result).data,
+            status_code=status.HTTP_201_CREATED if result['created'] else status.HTTP_200_OK
+        )
+
+    @extend_schema(
+        summary="Crear o actualizar libros por ISBN (lote)",
+        operation_id="catalog_libros_by_isbn_upsert_batch",
+        description=(
+            "Upsert idempotente de varios libros en una sola sentencia "
+            f"(máximo {serializers.LIBRO_UPSERT_MAX_BATCH} por petición). "
+            "Devuelve, en el mismo orden, cada libro y si se creó o se actualizó."
+        ),
+        request=serializers.LibroUpsertBatchInputSerializer,
+        responses=serializers.LibroUpsertOutputSerializer(many=True)
+    )
+    @action(detail=False, methods=['put'], url_path='by-isbn')
+    def upsert_batch(self, request):
+        serializer = serializers.LibroUpsertBatchInputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = services.upsert_libros(items=serializer.validated_data['libros'])
+        _invalidate_upserts(results)
+
+        return api_success_response(data=serializers.LibroUpsertOutputSerializer(results, many=True).data)
+
+
+def _invalidate_upserts(results):
+    """
+    Invalida el caché de todos los libros del upsert de una vez.
+    """
+    tags = set()
+    for result in results:
+        libro = result['libro']
+        tags |= caching.libro_tags(
+            libro,
+            autor_ids=[autor.pk for autor in libro.autores.all()],
+            old_autor_ids=result['old_autor_ids'],
+            created=result['created'],
+        )
+    caching.invalidate_libro_tags(tags)
@@ -1,5 +1,16 @@
 # src/config/__init__.py
 
-from .celery import app as celery_app
+# La app de Celery se carga al primer uso y no al importar 'config': un
+# worker web que solo sirve el catálogo no paga el import de Celery/kombu.
+# Los módulos de tareas importan config.celery, así que ya está registrada
+# antes de encolar cualquier tarea; 'celery -A config' la encuentra en
+# config.celery.
 
-__all__ = ('celery_app',)
\ No newline at end of file
+__all__ = ('celery_app',)
+
+
+def __getattr__(name):
+    if name == 'celery_app':
+        from .celery import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -51,7 +51,7 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     
     # Paginación
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.EstimatedCountPagination',
     'PAGE_SIZE': 10,
 
     'DEFAULT_FILTER_BACKENDS': [
@@ -94,6 +94,8 @@ REST_FRAMEWORK = {
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Mide la latencia de todo lo que va detrás (ver CONCURRENCY_LIMIT)
+    'core.concurrency.ConcurrencyLimitMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -133,6 +135,14 @@ DATABASES = {
 CACHES = {
     'default': env.cache_url('CACHE_URL')
 }
+# Códec de los valores (ver CACHE_CODEC): msgpack + zstd y métricas de tamaño.
+# Con CACHE_CODEC_ENABLED=False se vuelve a pickle (vaciar Redis antes: pickle
+# no lee los valores del códec)
+if env.bool('CACHE_CODEC_ENABLED', default=True):
+    CACHES['default'].setdefault('OPTIONS', {}).update({
+        'SERIALIZER': 'core.cache_codec.CodecSerializer',
+        'CLIENT_CLASS': 'core.cache_codec.SizeAccountingClient',
+    })
 
 
 # Password validation
@@ -168,6 +178,11 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Archivos generados por la app (ej. reportes de autores).
+# En producción se puede cambiar el storage por un object store.
+MEDIA_URL = 'media/'
+MEDIA_ROOT = env('MEDIA_ROOT', default=str(BASE_DIR / 'media'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -182,6 +197,27 @@ SPECTACULAR_SETTINGS = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ]
 }
+# --- Esquema OpenAPI precalculado (core.schema) ---
+# Se genera con 'python manage.py openapi_schema' y se sirve desde memoria;
+# 'python manage.py openapi_schema --check' falla si quedó desactualizado
+OPENAPI_SCHEMA = {
+    'PATH': BASE_DIR / 'openapi.json',
+    'PRECOMPUTED': env.bool('OPENAPI_SCHEMA_PRECOMPUTED', default=True),
+}
+
+# --- Presupuesto de arranque en frío (python manage.py profile_startup) ---
+STARTUP_BUDGET = {
+    # Tiempo total de imports (ms) hasta poder atender la primera petición/tarea
+    'IMPORT_MS': {
+        'wsgi': env.int('STARTUP_BUDGET_WSGI_MS', default=750),
+        'asgi': env.int('STARTUP_BUDGET_ASGI_MS', default=750),
+        'celery': env.int('STARTUP_BUDGET_CELERY_MS', default=850),
+    },
+    # El test de tiempos es opcional: mide ms absolutos y depende de la máquina.
+    # Que la web no cargue los módulos diferidos se comprueba siempre
+    'TIMING_TESTS': env.bool('STARTUP_BUDGET_TIMING_TESTS', default=False),
+}
+
 # --- Configuración de Celery ---
 # Se lee la URL del Broker desde la variable de entorno
 CELERY_BROKER_URL = env('CELERY_BROKER_URL')
@@ -193,6 +229,30 @@ CELERY_RESULT_BACKEND = env('CELERY_BROKER_URL')
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
+
+# Estado y metadatos de los jobs (ej. reportes) expiran en el backend
+CELERY_RESULT_EXPIRES = timedelta(hours=24)
+
+# Tareas periódicas (requiere el servicio 'beat')
+CELERY_BEAT_SCHEDULE = {
+    'prune-token-blacklist': {
+        'task': 'core.tasks.prune_token_blacklist',
+        'schedule': timedelta(hours=1),
+    },
+    'prune-tombstones': {
+        'task': 'catalog.tasks.prune_tombstones',
+        'schedule': timedelta(days=1),
+    },
+    'rebuild-similar-books': {
+        'task': 'catalog.tasks.rebuild_similar_books',
+        'schedule': timedelta(days=1),
+    },
+    'find-duplicate-autores': {
+        'task': 'catalog.tasks.find_duplicate_autores',
+        'schedule': timedelta(days=7),
+    },
+}
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
 
@@ -203,7 +263,195 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
 
+    # La blacklist vive en Redis (ver TOKEN_BLACKLIST), no en la DB
+    "TOKEN_REFRESH_SERIALIZER": "core.serializers.BlacklistTokenRefreshSerializer",
+
     # Defino el tipo de Header que esperamos (Bearer)
     "AUTH_HEADER_TYPES": ("Bearer",),
     "AUTH_HEADER_NAME": "HTTP_AUTHORIZATION",
-}
\ No newline at end of file
+}
+
+# --- Paginación con totales estimados (core.pagination) ---
+ESTIMATED_COUNT = {
+    # Por encima de estas filas (según el planificador) no se hace COUNT(*)
+    'THRESHOLD': env.int('ESTIMATED_COUNT_THRESHOLD', default=10000),
+}
+
+# --- Lectura en lote (/autores/batch/, /libros/batch/) ---
+CATALOG_BATCH = {
+    # Máximo de IDs por petición
+    'MAX_IDS': env.int('CATALOG_BATCH_MAX_IDS', default=100),
+}
+
+# --- Feed de cambios (/libros/changes/, /autores/changes/) ---
+CHANGE_FEED = {
+    'DEFAULT_LIMIT': 100,
+    'MAX_LIMIT': 1000,
+    # Días que se guardan los borrados: un cursor más viejo debe resincronizar
+    'TOMBSTONE_RETENTION_DAYS': env.int('CHANGE_FEED_TOMBSTONE_RETENTION_DAYS', default=30),
+    # Además de no pasar del inicio de la transacción con escrituras más antigua
+    # aún abierta, solo se sirven cambios con más de estos segundos: margen
+    # entre el reloj de la app (que pone updated_at) y el de Postgres
+    'SETTLE_SECONDS': env.int('CHANGE_FEED_SETTLE_SECONDS', default=5),
+}
+
+# --- Eventos de cambio (Redis Stream para consumidores internos) ---
+CHANGE_EVENTS = {
+    'ENABLED': env.bool('CHANGE_EVENTS_ENABLED', default=True),
+    # Clave "cruda" del Stream en Redis (sin el prefijo del cache de Django)
+    'STREAM': env('CHANGE_EVENTS_STREAM', default='catalog_change_events'),
+    # Longitud aproximada máxima del Stream (los eventos más viejos se descartan)
+    'MAXLEN': env.int('CHANGE_EVENTS_MAXLEN', default=100000),
+}
+
+# --- Caché de listados (autores/libros) ---
+LIST_CACHE = {
+    'TIMEOUT': 300,
+    # Cuántas de las consultas más pedidas se recalientan tras una escritura
+    'WARM_TOP_N': env.int('LIST_CACHE_WARM_TOP_N', default=20),
+    # Ventana (seg) que agrupa una ráfaga de escrituras en un solo recalentamiento
+    'WARM_DEBOUNCE': env.int('LIST_CACHE_WARM_DEBOUNCE', default=2),
+    # Máximo de consultas distintas en el ranking de frecuencias
+    'TRACK_MAX': 1000,
+    # Cada cuántos segundos cada worker suma sus peticiones al ranking en Redis
+    'HITS_FLUSH_INTERVAL': env.int('LIST_CACHE_HITS_FLUSH_INTERVAL', default=10),
+    # Recalentar tras las escrituras (se desactiva p. ej. para benchmarks)
+    'WARM_ENABLED': env.bool('LIST_CACHE_WARM_ENABLED', default=True),
+    # Invalidar por etiquetas (solo las entradas afectadas por la escritura)
+    # en lugar de vaciar el namespace entero
+    'TAG_INVALIDATION': env.bool('LIST_CACHE_TAG_INVALIDATION', default=True),
+    # Cachear el JSON de cada objeto por (ID, versión) y montar las páginas
+    # con esos fragmentos en lugar de re-serializar cada objeto
+    'FRAGMENTS': env.bool('LIST_CACHE_FRAGMENTS', default=True),
+    'FRAGMENT_TIMEOUT': env.int('LIST_CACHE_FRAGMENT_TIMEOUT', default=3600),
+}
+
+# --- Grafo de co-autoría (/autores/{id}/coautores/) ---
+COAUTHOR_GRAPH = {
+    'DEFAULT_LIMIT': 10,
+    'MAX_LIMIT': 100,
+    # Ventana (seg) que agrupa una ráfaga de escrituras en una sola actualización
+    'UPDATE_DEBOUNCE': env.int('COAUTHOR_GRAPH_UPDATE_DEBOUNCE', default=2),
+    # Máximo (seg) que se retiene el lock de construcción/actualización
+    'LOCK_TIMEOUT': 300,
+}
+
+# --- Libros similares (/libros/{id}/similar/) ---
+SIMILAR_BOOKS = {
+    # Vecinos precalculados por libro (y máximo de 'limit')
+    'TOP_K': env.int('SIMILAR_BOOKS_TOP_K', default=20),
+    'DEFAULT_LIMIT': 10,
+    # Similitud coseno mínima para considerar dos libros parecidos
+    'MIN_SCORE': env.float('SIMILAR_BOOKS_MIN_SCORE', default=0.05),
+    # Máximo de similitudes (celdas de una matriz densa) por bloque al recalcular todo
+    'CHUNK_CELLS': env.int('SIMILAR_BOOKS_CHUNK_CELLS', default=20_000_000),
+    # Ventana (seg) que agrupa una ráfaga de escrituras en una sola actualización
+    'UPDATE_DEBOUNCE': env.int('SIMILAR_BOOKS_UPDATE_DEBOUNCE', default=2),
+    'LOCK_TIMEOUT': 1800,
+}
+
+# --- Duplicados de autores (catalog/author_dedup.py) ---
+AUTHOR_DEDUP = {
+    # Similitud mínima (0 a 1) de los nombres de pila para proponer una fusión
+    'MIN_SCORE': env.float('AUTHOR_DEDUP_MIN_SCORE', default=0.85),
+    # Autores por bloque (mismo apellido y fecha de nacimiento) como máximo
+    'MAX_BLOCK_SIZE': 500,
+    # Filas por lectura al recorrer la tabla de autores
+    'CHUNK_SIZE': 5000,
+}
+
+# --- Límite de concurrencia adaptativo (core/concurrency.py) ---
+CONCURRENCY_LIMIT = {
+    'ENABLED': env.bool('CONCURRENCY_LIMIT_ENABLED', default=True),
+    # Límite AIMD por clase de endpoint (por worker). PRIORITY más baja =
+    # más prioritaria: las demás ceden cuando esta supera TARGET_MS
+    'CLASSES': {
+        'read': {'PRIORITY': 0, 'INITIAL_LIMIT': 64, 'MIN_LIMIT': 8, 'MAX_LIMIT': 256, 'TARGET_MS': 100},
+        'write': {'PRIORITY': 0, 'INITIAL_LIMIT': 32, 'MIN_LIMIT': 4, 'MAX_LIMIT': 128, 'TARGET_MS': 250},
+        'list': {'PRIORITY': 1, 'INITIAL_LIMIT': 16, 'MIN_LIMIT': 1, 'MAX_LIMIT': 64, 'TARGET_MS': 500},
+        'search': {'PRIORITY': 2, 'INITIAL_LIMIT': 8, 'MIN_LIMIT': 1, 'MAX_LIMIT': 32, 'TARGET_MS': 800},
+    },
+    # Factor de recorte ante congestión, como mucho una vez cada WINDOW segundos
+    'BACKOFF': 0.75,
+    'WINDOW': 1.0,
+    # Acciones de los ViewSets que consultan la DB a fondo (si no están en caché)
+    'EXPENSIVE_ACTIONS': ['list', 'changes'],
+    'SEARCH_PARAM': 'search',
+    # Función (request, view_func) -> bool: si un listado se responde desde el caché
+    'CACHED_CHECK': 'catalog.caching.is_cached_list',
+    # Segundos que se sugieren al cliente rechazado (cabecera Retry-After)
+    'RETRY_AFTER': 1,
+    # Errores 5xx de la aplicación (por su 'code') que no indican sobrecarga
+    # y no recortan el límite: p. ej. el grafo de co-autoría aún construyéndose
+    'IGNORED_ERROR_CODES': ['warming_up'],
+}
+
+# --- Límite de duración de las consultas (core/statement_timeout.py) ---
+STATEMENT_TIMEOUT = {
+    'ENABLED': env.bool('STATEMENT_TIMEOUT_ENABLED', default=True),
+    # statement_timeout (ms) de las acciones sin entrada en ACTIONS; 0 = sin límite
+    'DEFAULT_MS': env.int('STATEMENT_TIMEOUT_DEFAULT_MS', default=5000),
+    # Por acción de los ViewSets. 'search' es un listado con SEARCH_PARAM
+    'ACTIONS': {
+        'retrieve': 2000,
+        'batch': 2000,
+        'coautores': 2000,
+        'similar': 2000,
+        'list': 3000,
+        'search': env.int('STATEMENT_TIMEOUT_SEARCH_MS', default=2000),
+        # Exportaciones (feed de cambios, resultado de reportes) e importaciones
+        'changes': 15000,
+        'result': 30000,
+        'upsert_batch': 60000,
+    },
+    'SEARCH_PARAM': 'search',
+}
+
+# --- Perfilado bajo demanda (core/profiling.py) ---
+PROFILING = {
+    # Cabecera X-Profile (en request.META) o query param que lo activan (solo staff)
+    'HEADER': 'HTTP_X_PROFILE',
+    'QUERY_PARAM': '_profile',
+    # Segundos entre muestras del profiler
+    'SAMPLE_INTERVAL': 0.005,
+    # Segundos que el informe queda en el caché
+    'REPORT_TTL': 3600,
+    # Funciones y pilas que se muestran
+    'TOP': 30,
+    # SELECT (las más lentas) con EXPLAIN; ANALYZE las vuelve a ejecutar
+    'MAX_EXPLAIN': 20,
+    'EXPLAIN_ANALYZE': env.bool('PROFILING_EXPLAIN_ANALYZE', default=False),
+}
+
+# --- Códec del caché (core/cache_codec.py) ---
+CACHE_CODEC = {
+    # Los valores codificados a partir de este tamaño se comprimen con zstd
+    'COMPRESS_MIN_BYTES': env.int('CACHE_CODEC_COMPRESS_MIN_BYTES', default=1024),
+    'ZSTD_LEVEL': env.int('CACHE_CODEC_ZSTD_LEVEL', default=3),
+    # Histograma de tamaños por namespace (python manage.py cache_stats)
+    'HISTOGRAMS': env.bool('CACHE_CODEC_HISTOGRAMS', default=True),
+    'STATS_FLUSH_INTERVAL': 10,
+}
+
+# --- Caché en dos niveles (L1 en memoria del worker + L2 Redis) ---
+TIERED_CACHE = {
+    # Tamaño máximo (entradas) y TTL (seg) del LRU en memoria de cada worker
+    'L1_MAX_ENTRIES': env.int('TIERED_CACHE_L1_MAX_ENTRIES', default=512),
+    'L1_TIMEOUT': env.int('TIERED_CACHE_L1_TIMEOUT', default=30),
+    # Canal de Redis pub/sub por el que se difunden las invalidaciones
+    'CHANNEL': 'tiered_cache_invalidation',
+    # Cada cuántos segundos cada worker suma sus métricas en Redis
+    'STATS_FLUSH_INTERVAL': 10,
+}
+
+# --- Blacklist de Refresh Tokens (Redis + filtro de Bloom en proceso) ---
+TOKEN_BLACKLIST = {
+    # Pre-chequeo local: la mayoría de tokens válidos no van a Redis
+    'BLOOM_ENABLED': env.bool('TOKEN_BLACKLIST_BLOOM_ENABLED', default=True),
+    # Capacidad mínima; al reconstruirlo se usa HEADROOM x las entradas vigentes si es mayor
+    'BLOOM_CAPACITY': env.int('TOKEN_BLACKLIST_BLOOM_CAPACITY', default=100_000),
+    'BLOOM_HEADROOM': 2,
+    'BLOOM_ERROR_RATE': env.float('TOKEN_BLACKLIST_BLOOM_ERROR_RATE', default=0.001),
+    # Cada cuántos segundos el worker trae los jti añadidos por otros workers
+    'SYNC_INTERVAL': env.float('TOKEN_BLACKLIST_SYNC_INTERVAL', default=1.0),
+}
@@ -2,13 +2,13 @@
 
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 
 from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
 
-from core.views import CustomTokenObtainPairView
+from core.helpers import lazy_view
+from core.views import CustomTokenObtainPairView, ProfileReportView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -16,7 +16,11 @@ urlpatterns = [
     path('api/v1/auth/token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/v1/auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/v1/catalog/', include('catalog.urls')),
-    path('api/v1/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/v1/schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    path('api/v1/schema/redoc/', SpectacularSwaggerView.as_view(url_name='schema'), name='redoc'),
+    path('api/v1/profiles/<str:report_id>/', ProfileReportView.as_view(), name='profile-report'),
+    # drf-spectacular se importa al pedir el esquema, no al arrancar
+    path('api/v1/schema/', lazy_view('core.schema.PrecomputedSpectacularAPIView'), name='schema'),
+    path('api/v1/schema/swagger-ui/',
+         lazy_view('drf_spectacular.views.SpectacularSwaggerView', url_name='schema'), name='swagger-ui'),
+    path('api/v1/schema/redoc/',
+         lazy_view('drf_spectacular.views.SpectacularSwaggerView', url_name='schema'), name='redoc'),
 ]
\ No newline at end of file
@@ -0,0 +1,255 @@
+# src/core/cache_codec.py
+
+import datetime
+import decimal
+import pickle
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+
+import msgpack
+import zstandard
+from django.conf import settings
+from django.utils.module_loading import import_string
+from django_redis import get_redis_connection
+from django_redis.client import DefaultClient
+from django_redis.serializers.base import BaseSerializer
+
+HISTOGRAM_KEY = 'cache_size_histogram'
+
+# Primer byte de cada valor: formato y compresión. Los valores de pickle
+# (el serializer anterior) empiezan siempre por 0x80, así que conviven
+# con los nuevos durante el despliegue
+MSGPACK = 0x01
+MSGPACK_ZSTD = 0x02
+PICKLE = 0x03
+PICKLE_ZSTD = 0x04
+LEGACY_PICKLE = 0x80
+
+# Tipos extendidos de msgpack
+_EXT_UUID = 1
+_EXT_DATETIME = 2
+_EXT_DATE = 3
+_EXT_DECIMAL = 4
+_EXT_TUPLE = 5
+_EXT_NAMEDTUPLE = 6
+_EXT_SET = 7
+
+# Histograma de tamaños: potencias de 2 desde 128 bytes hasta 1 MiB
+BUCKETS = [2 ** exponent for exponent in range(7, 21)]
+
+
+def _conf(name):
+    return settings.CACHE_CODEC[name]
+
+
+def _is_namedtuple(value) -> bool:
+    return isinstance(value, tuple) and hasattr(type(value), '_fields')
+
+
+def _default(value):
+    # Con strict_types las subclases (OrderedDict, ReturnDict, tuplas con
+    # nombre...) llegan aquí en lugar de convertirse en silencio
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, uuid.UUID):
+        return msgpack.ExtType(_EXT_UUID, value.bytes)
+    if isinstance(value, datetime.datetime):
+        return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, datetime.date):
+        return msgpack.ExtType(_EXT_DATE, value.isoformat().encode())
+    if isinstance(value, decimal.Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(value).encode())
+    if _is_namedtuple(value) and '<' not in type(value).__qualname__:
+        # Se reconstruye importando la clase (no vale para clases locales)
+        cls = type(value)
+        return msgpack.ExtType(_EXT_NAMEDTUPLE, _packb([f'{cls.__module__}.{cls.__qualname__}', list(value)]))
+    if type(value) is tuple:
+        return msgpack.ExtType(_EXT_TUPLE, _packb(list(value)))
+    if isinstance(value, (set, frozenset)):
+        return msgpack.ExtType(_EXT_SET, _packb(list(value)))
+    raise TypeError(f"Tipo no soportado por msgpack: {type(value).__name__}")
+
+
+def _ext_hook(code, data):
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    if code == _EXT_DATETIME:
+        return datetime.datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return datetime.date.fromisoformat(data.decode())
+    if code == _EXT_DECIMAL:
+        return decimal.Decimal(data.decode())
+    if code == _EXT_NAMEDTUPLE:
+        path, fields = _unpackb(data)
+        return import_string(path)(*fields)
+    if code == _EXT_TUPLE:
+        return tuple(_unpackb(data))
+    if code == _EXT_SET:
+        return set(_unpackb(data))
+    return msgpack.ExtType(code, data)
+
+
+def _packb(value) -> bytes:
+    return msgpack.packb(value, default=_default, strict_types=True, use_bin_type=True)
+
+
+def _unpackb(data: bytes):
+    return msgpack.unpackb(data, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+
+
+class CodecSerializer(BaseSerializer):
+    """
+    Serializer de django-redis (OPTIONS['SERIALIZER']): msgpack con tipos
+    extendidos (UUID, fechas, Decimal, tuplas) y compresión zstd a partir de
+    CACHE_CODEC['COMPRESS_MIN_BYTES']. Lo que msgpack no sabe representar
+    se guarda con pickle (también comprimido). Lee las entradas de pickle
+    del serializer anterior, así que se puede desplegar sin vaciar Redis.
+    """
+
+    def __init__(self, options):
+        super().__init__(options=options)
+        self.min_compress = _conf('COMPRESS_MIN_BYTES')
+        self.level = _conf('ZSTD_LEVEL')
+        self._local = threading.local()
+
+    def _zstd(self):
+        # Los (des)compresores de zstandard no se comparten entre hilos
+        if not hasattr(self._local, 'compressor'):
+            self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+            self._local.decompressor = zstandard.ZstdDecompressor()
+        return self._local.compressor, self._local.decompressor
+
+    def dumps(self, value) -> bytes:
+        try:
+            payload, tag = _packb(value), MSGPACK
+        except (TypeError, ValueError, OverflowError):
+            payload, tag = pickle.dumps(value, pickle.HIGHEST_PROTOCOL), PICKLE
+        if len(payload) >= self.min_compress:
+            compressed = self._zstd()[0].compress(payload)
+            if len(compressed) < len(payload):
+                payload, tag = compressed, tag + 1
+        return bytes([tag]) + payload
+
+    def loads(self, value: bytes):
+        tag = value[0]
+        if tag == LEGACY_PICKLE:
+            return pickle.loads(value)
+        payload = value[1:]
+        if tag in (MSGPACK_ZSTD, PICKLE_ZSTD):
+            payload = self._zstd()[1].decompress(payload)
+            tag -= 1
+        if tag == MSGPACK:
+            return _unpackb(payload)
+        if tag == PICKLE:
+            return pickle.loads(payload)
+        raise ValueError(f"Formato de caché desconocido: {tag:#x}")
+
+
+# --- Histogramas de tamaño por namespace ---
+
+# Clave que se está escribiendo (DefaultClient.encode no la recibe)
+_current_key = ContextVar('cache_codec_current_key', default=None)
+
+_NAMESPACE_RE = re.compile(r'[A-Za-z]+(?:_[A-Za-z]+)?')
+
+
+def namespace_of(key) -> str:
+    """
+    Namespace de una clave para las métricas: sus dos primeras palabras
+    ('autores_list_page=2' -> 'autores_list', 'throttle_user_1' -> 'throttle_user').
+    """
+    match = _NAMESPACE_RE.match(str(key))
+    return match.group(0) if match else 'otros'
+
+
+def bucket_of(size: int) -> str:
+    for limit in BUCKETS:
+        if size <= limit:
+            return f'<={limit}'
+    return f'>{BUCKETS[-1]}'
+
+
+class SizeAccountingClient(DefaultClient):
+    """
+    Cliente de django-redis (OPTIONS['CLIENT_CLASS']) que anota el tamaño
+    de cada valor escrito en un histograma por namespace. Los contadores se
+    acumulan en el proceso y se suman en Redis cada STATS_FLUSH_INTERVAL seg.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sizes = Counter()
+        self._sizes_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def set(self, key, value, *args, **kwargs):
+        # set_many y add también pasan por aquí
+        token = _current_key.set(key)
+        try:
+            return super().set(key, value, *args, **kwargs)
+        finally:
+            _current_key.reset(token)
+
+    def encode(self, value):
+        encoded = super().encode(value)
+        key = _current_key.get()
+        # Los enteros van a Redis tal cual (para INCR) y no se anotan
+        if key is not None and isinstance(encoded, bytes) and _conf('HISTOGRAMS'):
+            self._record(namespace_of(key), len(encoded))
+        return encoded
+
+    def _record(self, namespace: str, size: int):
+        with self._sizes_lock:
+            self._sizes[f'{namespace}:{bucket_of(size)}'] += 1
+            self._sizes[f'{namespace}:count'] += 1
+            self._sizes[f'{namespace}:bytes'] += size
+            flush = time.monotonic() - self._last_flush >= _conf('STATS_FLUSH_INTERVAL')
+        if flush:
+            self.flush_sizes()
+
+    def flush_sizes(self):
+        """
+        Suma los contadores del proceso al hash global de Redis.
+        """
+        with self._sizes_lock:
+            sizes, self._sizes = self._sizes, Counter()
+            self._last_flush = time.monotonic()
+        if not sizes:
+            return
+        # Conexión directa: el hash de métricas no pasa por el serializer
+        pipe = self.get_client(write=True).pipeline(transaction=False)
+        for field, value in sizes.items():
+            pipe.hincrby(HISTOGRAM_KEY, field, value)
+        pipe.execute()
+
+
+def get_histograms() -> dict:
+    """
+    Histograma de tamaños (bytes ya codificados) por namespace, sumando
+    todos los workers: {namespace: {'count', 'bytes', 'avg_bytes', 'buckets': {bucket: n}}}.
+    """
+    raw = get_redis_connection('default').hgetall(HISTOGRAM_KEY)
+    by_namespace = {}
+    for field, value in raw.items():
+        namespace, stat = field.decode().rsplit(':', 1)
+        entry = by_namespace.setdefault(namespace, {'count': 0, 'bytes': 0, 'buckets': {}})
+        if stat in ('count', 'bytes'):
+            entry[stat] = int(value)
+        else:
+            entry['buckets'][stat] = int(value)
+
+    order = [bucket_of(limit) for limit in BUCKETS] + [f'>{BUCKETS[-1]}']
+    for entry in by_namespace.values():
+        entry['avg_bytes'] = entry['bytes'] / entry['count'] if entry['count'] else 0
+        entry['buckets'] = {bucket: entry['buckets'][bucket] for bucket in order if bucket in entry['buckets']}
+    return by_namespace
+
+
+def reset_histograms():
+    get_redis_connection('default').delete(HISTOGRAM_KEY)
@@ -0,0 +1,21 @@
+# src/core/checks.py
+
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+@register('openapi', deploy=True)
+def check_openapi_schema(app_configs, **kwargs):
+    """
+    En 'manage.py check --deploy': el esquema precalculado debe coincidir
+    con el código (si no, la API documentaría endpoints viejos).
+    """
+    if not settings.OPENAPI_SCHEMA['PRECOMPUTED']:
+        return []
+    # Import diferido: no cargar drf-spectacular en cada arranque
+    from . import schema
+
+    problem = schema.check_artifact()
+    if problem:
+        return [Error(problem, hint="Ejecuta 'python manage.py openapi_schema'.", id='core.E001')]
+    return []
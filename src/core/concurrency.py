@@ -0,0 +1,202 @@
+# src/core/concurrency.py
+
+import threading
+import time
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.module_loading import import_string
+from rest_framework.permissions import SAFE_METHODS
+
+from .exceptions import ServiceOverloadedError
+
+
+class AIMDLimiter:
+    """
+    Límite adaptativo de peticiones simultáneas de una clase de endpoint,
+    con AIMD (como el control de congestión de TCP): cada petición que
+    termina por debajo de su latencia objetivo suma 1/límite (en torno a
+    +1 por cada "ronda" de peticiones) y una que la supera o falla lo
+    multiplica por BACKOFF, como mucho una vez por ventana. Un límite que
+    no se está usando no crece.
+    """
+
+    def __init__(self, name: str, *, priority: int, initial_limit: int, min_limit: int, max_limit: int,
+                 target_ms: float, backoff: float, window: float):
+        self.name = name
+        self.priority = priority
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_ms = target_ms
+        self.backoff = backoff
+        self.window = window
+
+        self.limit = float(initial_limit)
+        self.inflight = 0
+        self.shed = 0
+        # Hasta cuándo (monotonic) se considera congestionada
+        self.congested_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.inflight >= int(self.limit):
+                self.shed += 1
+                return False
+            self.inflight += 1
+            return True
+
+    def release(self, latency_ms: float, *, failed: bool = False, pressure: bool = False, defer: bool = False):
+        """
+        Libera el hueco y ajusta el límite. 'pressure' indica que una clase
+        más prioritaria está congestionada: esta cede aunque vaya bien.
+        'defer' indica que hay clases menos prioritarias que aún pueden
+        ceder: esta se marca como congestionada pero no se recorta.
+        """
+        now = time.monotonic()
+        with self._lock:
+            inflight = self.inflight
+            self.inflight -= 1
+            overloaded = failed or latency_ms > self.target_ms
+            if overloaded:
+                self.congested_until = now + self.window
+            if (overloaded and not defer) or pressure:
+                if now - self._last_decrease >= self.window:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._last_decrease = now
+            elif not overloaded and inflight >= self.limit / 2:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def snapshot(self) -> Dict:
+        return {'limit': round(self.limit, 2), 'inflight': self.inflight, 'shed': self.shed}
+
+
+# --- Estado en proceso (uno por worker) ---
+
+_lock = threading.Lock()
+_limiters: Optional[Dict[str, AIMDLimiter]] = None
+
+
+def _conf(name):
+    return settings.CONCURRENCY_LIMIT[name]
+
+
+def get_limiters() -> Dict[str, AIMDLimiter]:
+    global _limiters
+    if _limiters is None:
+        with _lock:
+            if _limiters is None:
+                _limiters = {
+                    name: AIMDLimiter(
+                        name, priority=conf['PRIORITY'], initial_limit=conf['INITIAL_LIMIT'],
+                        min_limit=conf['MIN_LIMIT'], max_limit=conf['MAX_LIMIT'], target_ms=conf['TARGET_MS'],
+                        backoff=_conf('BACKOFF'), window=_conf('WINDOW'),
+                    )
+                    for name, conf in _conf('CLASSES').items()
+                }
+    return _limiters
+
+
+def reset_limiters():
+    """
+    Descarta los límites aprendidos (se recrean desde los settings).
+    """
+    global _limiters
+    with _lock:
+        _limiters = None
+
+
+def stats() -> Dict[str, Dict]:
+    return {name: limiter.snapshot() for name, limiter in get_limiters().items()}
+
+
+def classify(request, view_func) -> Optional[str]:
+    """
+    Clase de endpoint de una petición a un ViewSet de DRF (None para el
+    resto: admin, login, esquema). Los listados que se responden desde el
+    caché cuentan como lecturas baratas.
+    """
+    actions = getattr(view_func, 'actions', None)
+    if actions is None:
+        return None
+    if request.method not in SAFE_METHODS:
+        return 'write'
+    if actions.get(request.method.lower()) not in _conf('EXPENSIVE_ACTIONS'):
+        return 'read'
+    if import_string(_conf('CACHED_CHECK'))(request, view_func):
+        return 'read'
+    return 'search' if _conf('SEARCH_PARAM') in request.GET else 'list'
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Limita las peticiones simultáneas de cada clase de endpoint (lecturas
+    de detalle, escrituras, listados y búsquedas sin caché) con un límite
+    AIMD por clase, y rechaza al instante (503 con Retry-After) las que no
+    caben en vez de dejar que se acumulen sobre Postgres.
+
+    Ante congestión se recorta primero lo menos prioritario: cuando una
+    clase supera su latencia objetivo, las de menos prioridad (listados y
+    búsquedas) ceden, y ella solo se recorta cuando esas ya están en su
+    mínimo.
+
+    Los límites son por proceso: cada worker aprende los suyos.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        admitted = getattr(request, '_concurrency_admitted', None)
+        if admitted is not None:
+            limiter, started = admitted
+            now = time.monotonic()
+            latency_ms = (now - started) * 1000
+            others = get_limiters().values()
+            pressure = any(other.priority < limiter.priority and other.congested_until > now for other in others)
+            defer = any(other.priority > limiter.priority and other.limit > other.min_limit for other in others)
+            limiter.release(latency_ms, failed=_is_overload(response), pressure=pressure, defer=defer)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not _conf('ENABLED'):
+            return None
+        endpoint_class = classify(request, view_func)
+        if endpoint_class is None:
+            return None
+
+        limiter = get_limiters()[endpoint_class]
+        if not limiter.try_acquire():
+            return _overloaded_response()
+        request._concurrency_admitted = (limiter, time.monotonic())
+        return None
+
+
+def _is_overload(response) -> bool:
+    """
+    Si la respuesta cuenta como fallo por sobrecarga: cualquier 5xx salvo
+    los errores de la aplicación de IGNORED_ERROR_CODES, que responden
+    rápido y no dicen nada de la carga de Postgres.
+    """
+    if response.status_code < 500:
+        return False
+    data = getattr(response, 'data', None)
+    return not (isinstance(data, dict) and data.get('code') in _conf('IGNORED_ERROR_CODES'))
+
+
+def _overloaded_response() -> JsonResponse:
+    # Mismo formato que custom_exception_handler, sin pasar por DRF
+    response = JsonResponse(
+        {
+            'status': 'error',
+            'message': ServiceOverloadedError.default_detail,
+            'code': ServiceOverloadedError.default_code,
+            'details': ServiceOverloadedError.default_detail,
+        },
+        status=ServiceOverloadedError.status_code,
+    )
+    response['Retry-After'] = str(_conf('RETRY_AFTER'))
+    return response
@@ -5,6 +5,8 @@ from rest_framework.exceptions import APIException
 from rest_framework import status
 from rest_framework.response import Response
 
+from . import statement_timeout
+
 # --- 1. Definición de Excepciones Propias ---
 
 class BusinessValidationError(APIException):
@@ -35,6 +37,54 @@ class DuplicateResourceError(APIException):
     default_detail = 'El recurso ya existe.'
     default_code = 'conflict'
 
+class ResourceNotReadyError(APIException):
+    """
+    Excepción para recursos que todavía se están generando (409).
+    Ej: Pedir el resultado de un reporte cuya tarea no terminó.
+    """
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'El recurso todavía no está listo.'
+    default_code = 'not_ready'
+
+class CursorExpiredError(APIException):
+    """
+    Excepción para cursores de sincronización demasiado viejos (410).
+    Ej: Pedir cambios desde antes de la retención de borrados.
+    """
+    status_code = status.HTTP_410_GONE
+    default_detail = 'El cursor expiró; hay que sincronizar de nuevo desde cero.'
+    default_code = 'cursor_expired'
+
+
+class ServiceOverloadedError(APIException):
+    """
+    Excepción para peticiones rechazadas por sobrecarga (503).
+    Ej: El limitador de concurrencia no tiene hueco para un listado caro.
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'El servicio está sobrecargado; reintentar en unos segundos.'
+    default_code = 'overloaded'
+
+
+class ServiceWarmingUpError(APIException):
+    """
+    Excepción para datos precalculados que todavía se están construyendo (503).
+    Ej: Pedir co-autores antes de que exista el grafo de co-autoría.
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Los datos se están preparando; reintentar en unos segundos.'
+    default_code = 'warming_up'
+
+
+class QueryTimeoutError(APIException):
+    """
+    Excepción para consultas canceladas por statement_timeout (504).
+    Ej: Una búsqueda con un término muy común que recorre media tabla.
+    """
+    status_code = status.HTTP_504_GATEWAY_TIMEOUT
+    default_detail = 'La consulta tardó demasiado y se canceló; probar con filtros más específicos.'
+    default_code = 'query_timeout'
+
 
 # --- 2. Handler Estándar Global ---
 
@@ -43,6 +93,12 @@ def custom_exception_handler(exc, context):
     Manejador de excepciones global para DRF.
     Formatea todas las respuestas de error en un formato JSON estándar.
     """
+    # Consulta cancelada por Postgres (ver core/statement_timeout.py)
+    if statement_timeout.is_timeout(exc):
+        statement_timeout.record_timeout(context['view'], context['request'])
+        statement_timeout.rollback_if_aborted()
+        exc = QueryTimeoutError()
+
     # Primero, obtenemos la respuesta de error estándar de DRF
     response = exception_handler(exc, context)
 
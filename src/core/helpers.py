@@ -1,5 +1,9 @@
 # src/core/helpers.py
 
+import json
+
+from django.utils.module_loading import import_string
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework import status
 
@@ -13,4 +17,53 @@ def api_success_response(data, status_code=status.HTTP_200_OK):
             'data': data
         },
         status=status_code
-    )
\ No newline at end of file
+    )
+
+def lazy_view(dotted_path, **initkwargs):
+    """
+    Vista (de clase) que se importa en la primera petición y no al cargar
+    el URLconf. Para rutas poco usadas cuyo import es caro (ej. el esquema
+    OpenAPI). Solo para vistas de DRF (exentas de CSRF como APIView).
+    """
+    view = None
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(dotted_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    wrapper.csrf_exempt = True
+    return wrapper
+
+
+class PrerenderedJSONResponse(Response):
+    """
+    Response cuyo cuerpo JSON ya viene renderizado (bytes). Si el cliente
+    negocia JSON se envía tal cual; con otro renderer (ej. la API navegable)
+    o con 'indent' se renderiza 'data', que se obtiene parseando el cuerpo.
+    """
+
+    def __init__(self, content: bytes, **kwargs):
+        self.prerendered = content
+        super().__init__(None, **kwargs)
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = json.loads(self.prerendered)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def rendered_content(self):
+        renderer = getattr(self, 'accepted_renderer', None)
+        if isinstance(renderer, JSONRenderer) and not renderer.get_indent(
+            self.accepted_media_type, self.renderer_context or {}
+        ):
+            self['Content-Type'] = self.content_type or renderer.media_type
+            return self.prerendered
+        return super().rendered_content
@@ -0,0 +1,96 @@
+# src/core/management/commands/benchmark_cache_codec.py
+
+import pickle
+import time
+import uuid
+from datetime import date, datetime, timezone
+
+from django.core.management.base import BaseCommand
+from django_redis import get_redis_connection
+
+from catalog.models import Autor
+from catalog.services import ListEntry
+from core.cache_codec import CodecSerializer
+
+
+class Command(BaseCommand):
+    """
+    Compara pickle (el serializer anterior) con el códec del caché
+    (msgpack + zstd) sobre valores típicos del catálogo: tamaño, tiempo de
+    codificar/decodificar y memoria ocupada en Redis (MEMORY USAGE).
+    Uso: python manage.py benchmark_cache_codec --repeat 2000 --keys 200
+    """
+    help = "Benchmark del códec del caché: pickle vs msgpack + zstd."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=1000, help="Codificaciones por valor y formato.")
+        parser.add_argument('--keys', type=int, default=100, help="Copias guardadas en Redis para medir memoria.")
+
+    def handle(self, *args, **options):
+        codec = CodecSerializer(options={})
+        formats = {
+            'pickle': (lambda value: pickle.dumps(value, pickle.HIGHEST_PROTOCOL), pickle.loads),
+            'códec': (codec.dumps, codec.loads),
+        }
+        for name, value in self._values().items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for format_name, (dumps, loads) in formats.items():
+                encoded = dumps(value)
+                encode_us = self._time(lambda: dumps(value), options['repeat'])
+                decode_us = self._time(lambda: loads(encoded), options['repeat'])
+                memory = self._redis_memory(encoded, options['keys'])
+                self.stdout.write(
+                    f"  {format_name:<7} {len(encoded):>8} bytes  redis={memory:>8.0f} bytes/clave  "
+                    f"codificar={encode_us:>8.1f}µs  decodificar={decode_us:>8.1f}µs"
+                )
+
+    def _values(self):
+        now = datetime.now(timezone.utc)
+        autores = [
+            {
+                'id': str(uuid.uuid4()), 'first_name': f'Nombre {i}', 'last_name': f'Apellido {i}',
+                'full_name': f'Nombre {i} Apellido {i}', 'birth_date': '1900-01-01',
+                'biography': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 12,
+                'created_at': now.isoformat(),
+            }
+            for i in range(3)
+        ]
+        libro = {
+            'id': str(uuid.uuid4()), 'title': 'Un título de libro cualquiera',
+            'summary': 'Sed ut perspiciatis unde omnis iste natus error sit voluptatem. ' * 15,
+            'isbn': '9780000000000', 'publication_date': '1950-01-01', 'autores': autores,
+            'created_at': now.isoformat(),
+        }
+        return {
+            # Detalle cacheado (datos del serializer)
+            'detalle de libro': libro,
+            # Entradas de un listado cacheado (IDs, versión y autores)
+            'entradas de listado (1000)': [
+                ListEntry(uuid.uuid4(), str(i), (uuid.uuid4(), uuid.uuid4())) for i in range(1000)
+            ],
+            # Instancias de modelo: msgpack no las representa y van con pickle
+            'instancias de Autor (50)': [
+                Autor(id=uuid.uuid4(), first_name=f'Nombre {i}', last_name=f'Apellido {i}',
+                      biography='Lorem ipsum dolor sit amet. ' * 20, birth_date=date(1900, 1, 1))
+                for i in range(50)
+            ],
+        }
+
+    def _time(self, fn, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - started) / repeat * 1e6
+
+    def _redis_memory(self, encoded: bytes, keys: int) -> float:
+        redis = get_redis_connection('default')
+        names = [f'benchmark_cache_codec:{i}' for i in range(keys)]
+        pipe = redis.pipeline(transaction=False)
+        for name in names:
+            pipe.set(name, encoded, ex=60)
+        pipe.execute()
+        for name in names:
+            pipe.memory_usage(name)
+        usage = pipe.execute()
+        redis.delete(*names)
+        return sum(usage) / keys
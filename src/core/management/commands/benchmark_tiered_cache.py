@@ -0,0 +1,59 @@
+# src/core/management/commands/benchmark_tiered_cache.py
+
+import statistics
+import time
+import uuid
+from datetime import date
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from catalog.models import Autor
+from core.tiered_cache import TieredCache
+
+
+class Command(BaseCommand):
+    """
+    Compara lecturas de un listado cacheado solo en Redis contra el caché
+    en dos niveles (L1 en memoria + Redis).
+    Uso: python manage.py benchmark_tiered_cache --reads 5000 --items 100
+    """
+    help = "Benchmark de lecturas: Redis solo vs L1 + Redis."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reads', type=int, default=5000)
+        parser.add_argument('--items', type=int, default=100, help="Autores por listado cacheado.")
+
+    def handle(self, *args, **options):
+        # Un listado parecido a una página cacheada de /autores/
+        value = [
+            Autor(
+                id=uuid.uuid4(), first_name=f'Nombre {i}', last_name=f'Apellido {i}',
+                biography='Lorem ipsum dolor sit amet. ' * 20, birth_date=date(1900, 1, 1),
+            )
+            for i in range(options['items'])
+        ]
+        key = 'benchmark_tiered_cache'
+        tiered = TieredCache('benchmark')
+        tiered.set(key, value, timeout=60)
+
+        self._run('redis', lambda: cache.get(key), options['reads'])
+        self._run('l1 + redis', lambda: tiered.get(key), options['reads'])
+
+        tiered.delete(key)
+
+    def _run(self, name, read, total):
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(total):
+            t0 = time.perf_counter()
+            read()
+            latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        self.stdout.write(
+            f"{name:<12} {total / elapsed:>10.0f} lecturas/s  "
+            f"p50={statistics.median(latencies) * 1e6:.0f}µs  p99={p99 * 1e6:.0f}µs"
+        )
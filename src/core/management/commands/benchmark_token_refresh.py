@@ -0,0 +1,70 @@
+# src/core/management/commands/benchmark_token_refresh.py
+
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenRefreshView
+
+from core import token_blacklist
+from core.serializers import BlacklistTokenRefreshSerializer
+
+
+class Command(BaseCommand):
+    """
+    Mide el throughput de TokenRefreshView con cada estrategia de blacklist.
+    Uso: python manage.py benchmark_token_refresh --requests 2000
+    """
+    help = "Benchmark de TokenRefreshView (sin blacklist / Redis / Redis + Bloom)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        # Todo se hace dentro de una transacción que se revierte al final
+        with transaction.atomic():
+            user = User.objects.create_user(username='benchmark_refresh_user', password='x')
+
+            modes = [
+                ('sin blacklist', TokenRefreshSerializer, True),
+                ('redis', BlacklistTokenRefreshSerializer, False),
+                ('redis + bloom', BlacklistTokenRefreshSerializer, True),
+            ]
+            for name, serializer_class, bloom_enabled in modes:
+                self._run(name, user, serializer_class, bloom_enabled, total)
+
+            transaction.set_rollback(True)
+
+    def _run(self, name, user, serializer_class, bloom_enabled, total):
+        conf = {**settings.TOKEN_BLACKLIST, 'BLOOM_ENABLED': bloom_enabled}
+
+        with override_settings(TOKEN_BLACKLIST=conf):
+            token_blacklist.reset_filter()
+            view = TokenRefreshView.as_view(serializer_class=serializer_class, throttle_classes=[])
+            factory = APIRequestFactory()
+            tokens = [str(RefreshToken.for_user(user)) for _ in range(total)]
+
+            latencies = []
+            started = time.perf_counter()
+            for token in tokens:
+                request = factory.post('/api/v1/auth/token/refresh/', {'refresh': token}, format='json')
+                t0 = time.perf_counter()
+                response = view(request)
+                latencies.append(time.perf_counter() - t0)
+                assert response.status_code == 200, response.data
+            elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        self.stdout.write(
+            f"{name:<15} {total / elapsed:>9.0f} req/s  "
+            f"p50={statistics.median(latencies) * 1000:.2f}ms  p99={p99 * 1000:.2f}ms"
+        )
@@ -0,0 +1,80 @@
+# src/core/management/commands/benchmark_uuid_keys.py
+
+import io
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.ids import uuid7
+
+
+class Command(BaseCommand):
+    """
+    Compara claves primarias uuid4 vs uuid7 en PostgreSQL: throughput de
+    inserción (COPY por lotes) y tamaño final de los índices, tanto de la
+    tabla principal como de una tabla intermedia tipo libro-autor.
+    Uso: python manage.py benchmark_uuid_keys --rows 10000000 --batch 100000
+    """
+    help = "Benchmark de inserción y tamaño de índices: uuid4 vs uuid7."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000_000)
+        parser.add_argument('--batch', type=int, default=100_000)
+        parser.add_argument('--autores', type=int, default=10_000, help="Autores distintos en la tabla intermedia.")
+        parser.add_argument('--keep', action='store_true', help="No borrar las tablas al terminar.")
+
+    def handle(self, *args, **options):
+        for name, generator in (('uuid4', uuid.uuid4), ('uuid7', uuid7)):
+            self._run(name, generator, options)
+
+    def _run(self, name, generator, options):
+        table, through = f'benchmark_{name}_libro', f'benchmark_{name}_libro_autores'
+        autores = [generator() for _ in range(options['autores'])]
+        rng = random.Random(42)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {through}, {table}')
+            cursor.execute(f'CREATE TABLE {table} (id uuid PRIMARY KEY, title varchar(255) NOT NULL)')
+            cursor.execute(
+                f'CREATE TABLE {through} (libro_id uuid NOT NULL, autor_id uuid NOT NULL, '
+                f'UNIQUE (libro_id, autor_id))'
+            )
+            cursor.execute(f'CREATE INDEX {through}_autor_id ON {through} (autor_id)')
+
+            elapsed = 0.0
+            inserted = 0
+            while inserted < options['rows']:
+                size = min(options['batch'], options['rows'] - inserted)
+                libros, pares = io.StringIO(), io.StringIO()
+                for i in range(inserted, inserted + size):
+                    libro_id = generator()
+                    libros.write(f'{libro_id}\tLibro {i}\n')
+                    pares.write(f'{libro_id}\t{rng.choice(autores)}\n')
+                libros.seek(0)
+                pares.seek(0)
+
+                # Solo se mide la escritura, no la generación de las filas
+                t0 = time.perf_counter()
+                cursor.copy_expert(f'COPY {table} (id, title) FROM STDIN', libros)
+                cursor.copy_expert(f'COPY {through} (libro_id, autor_id) FROM STDIN', pares)
+                elapsed += time.perf_counter() - t0
+                inserted += size
+
+            cursor.execute(
+                'SELECT pg_relation_size(%s), pg_relation_size(%s), pg_relation_size(%s)',
+                [f'{table}_pkey', f'{through}_libro_id_autor_id_key', table],
+            )
+            pkey_size, through_size, table_size = cursor.fetchone()
+
+            if not options['keep']:
+                cursor.execute(f'DROP TABLE {through}, {table}')
+
+        mb = 1024 * 1024
+        self.stdout.write(
+            f"{name}: {inserted / elapsed:>9.0f} filas/s  "
+            f"tabla={table_size / mb:.1f}MB  pkey={pkey_size / mb:.1f}MB  "
+            f"intermedia(libro_id, autor_id)={through_size / mb:.1f}MB"
+        )
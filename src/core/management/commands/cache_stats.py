@@ -0,0 +1,42 @@
+# src/core/management/commands/cache_stats.py
+
+from django.core.management.base import BaseCommand
+
+from core import cache_codec, tiered_cache
+
+
+class Command(BaseCommand):
+    """
+    Muestra la tasa de aciertos por nivel del caché en dos niveles y el
+    histograma de tamaños de los valores escritos, por namespace.
+    Uso: python manage.py cache_stats [--reset]
+    """
+    help = "Tasa de aciertos de L1 (memoria) y L2 (Redis), sumando todos los workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Pone los contadores a cero.")
+
+    def handle(self, *args, **options):
+        stats = tiered_cache.get_stats()
+        if not stats:
+            self.stdout.write("Sin métricas todavía.")
+
+        for name, values in sorted(stats.items()):
+            self.stdout.write(
+                f"{name}: L1 {values['l1_hits']} aciertos ({values['l1_hit_ratio']:.1%}), "
+                f"L2 {values['l2_hits']} aciertos ({values['l2_hit_ratio']:.1%}), "
+                f"{values['misses']} fallos"
+            )
+
+        histograms = cache_codec.get_histograms()
+        if histograms:
+            self.stdout.write(self.style.MIGRATE_HEADING("Tamaños de los valores (bytes codificados):"))
+        for namespace, values in sorted(histograms.items()):
+            buckets = ', '.join(f'{bucket}: {count}' for bucket, count in values['buckets'].items())
+            self.stdout.write(
+                f"{namespace}: {values['count']} escrituras, media {values['avg_bytes']:.0f} bytes ({buckets})"
+            )
+
+        if options['reset']:
+            tiered_cache.reset_stats()
+            cache_codec.reset_histograms()
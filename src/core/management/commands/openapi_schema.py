@@ -0,0 +1,28 @@
+# src/core/management/commands/openapi_schema.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import schema
+
+
+class Command(BaseCommand):
+    """
+    Genera el esquema OpenAPI precalculado que sirve /api/v1/schema/.
+    Uso: python manage.py openapi_schema [--check]
+    """
+    help = "Genera (o con --check, verifica) el esquema OpenAPI precalculado."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help="No escribe nada; falla si el esquema guardado está desactualizado.")
+
+    def handle(self, *args, **options):
+        if options['check']:
+            problem = schema.check_artifact()
+            if problem:
+                raise CommandError(f"{problem} Ejecuta 'python manage.py openapi_schema'.")
+            self.stdout.write(self.style.SUCCESS("El esquema precalculado está al día."))
+            return
+
+        path = schema.write_artifact()
+        self.stdout.write(self.style.SUCCESS(f"Esquema escrito en {path}."))
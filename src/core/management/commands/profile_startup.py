@@ -0,0 +1,46 @@
+# src/core/management/commands/profile_startup.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import startup
+
+
+class Command(BaseCommand):
+    """
+    Mide el arranque en frío de los procesos web (wsgi/asgi) y del worker
+    de Celery: tiempo de imports por paquete y los módulos más caros.
+    Uso: python manage.py profile_startup [--entry wsgi] [--top 20] [--check]
+    """
+    help = "Tiempo de import por módulo de los puntos de entrada web y worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entry', choices=sorted(startup.ENTRY_POINTS), action='append',
+                            help="Punto de entrada a medir (repetible; por defecto todos).")
+        parser.add_argument('--top', type=int, default=15, help="Módulos/paquetes a listar.")
+        parser.add_argument('--check', action='store_true',
+                            help="Falla si se supera el presupuesto de arranque (STARTUP_BUDGET).")
+
+    def handle(self, *args, **options):
+        problems = []
+        for entry in options['entry'] or sorted(startup.ENTRY_POINTS):
+            profile = startup.profile_entry_point(entry)
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{entry}: {profile['total_ms']:.0f} ms de imports "
+                f"({len(profile['modules'])} módulos, {profile['wall_ms']:.0f} ms de proceso)"
+            ))
+
+            self.stdout.write("  Por paquete (tiempo propio):")
+            for package, own in startup.by_package(profile).most_common(options['top']):
+                self.stdout.write(f"    {own:8.1f} ms  {package}")
+
+            self.stdout.write("  Módulos más caros (acumulado, incluye sus imports):")
+            ranking = sorted(profile['modules'].items(), key=lambda item: item[1][1], reverse=True)
+            for name, (own, cumulative) in ranking[:options['top']]:
+                self.stdout.write(f"    {cumulative:8.1f} ms  {name}  (propio {own:.1f} ms)")
+
+            problems += startup.budget_problems(profile)
+
+        for problem in problems:
+            self.stdout.write(self.style.WARNING(problem))
+        if options['check'] and problems:
+            raise CommandError("Se superó el presupuesto de arranque.")
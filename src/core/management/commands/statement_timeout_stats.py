@@ -0,0 +1,31 @@
+# src/core/management/commands/statement_timeout_stats.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import statement_timeout
+
+
+class Command(BaseCommand):
+    """
+    Muestra cuántas consultas canceló statement_timeout por endpoint
+    (basename:acción), junto al límite que tiene cada acción.
+    Uso: python manage.py statement_timeout_stats [--reset]
+    """
+    help = "Consultas canceladas por statement_timeout, por endpoint, sumando todos los workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Pone los contadores a cero.")
+
+    def handle(self, *args, **options):
+        stats = statement_timeout.get_stats()
+        if not stats:
+            self.stdout.write("Sin consultas canceladas.")
+
+        conf = settings.STATEMENT_TIMEOUT
+        for key, count in sorted(stats.items(), key=lambda item: -item[1]):
+            action = key.rsplit(':', 1)[-1]
+            self.stdout.write(f"{key}: {count} canceladas (límite {conf['ACTIONS'].get(action, conf['DEFAULT_MS'])} ms)")
+
+        if options['reset']:
+            statement_timeout.reset_stats()
@@ -0,0 +1,135 @@
+# src/core/pagination.py
+
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from core.helpers import PrerenderedJSONResponse
+
+
+def estimate_count(queryset: QuerySet):
+    """
+    Estimación del planificador de PostgreSQL para el número de filas de
+    la consulta, sin ejecutarla: las filas estimadas por EXPLAIN. Incluso
+    sin filtros se pregunta al planificador y no a pg_class.reltuples, que
+    es de la última vez que se analizó la tabla; el planificador lo escala
+    al tamaño actual. None si no se puede estimar.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        sql, params = queryset.order_by().query.sql_with_params()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator que evita el COUNT(*) en resultados grandes: si la estimación
+    del planificador supera ESTIMATED_COUNT['THRESHOLD'] se usa como total
+    (y 'count_is_estimate' es True); por debajo se cuenta de verdad.
+
+    Con un total estimado cada página pide una fila de más para saber si
+    hay siguiente, y al llegar a la última el total pasa a ser exacto.
+    Listas y demás secuencias se cuentan siempre con len().
+    """
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, threshold=None):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.threshold = threshold if threshold is not None else settings.ESTIMATED_COUNT['THRESHOLD']
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate >= self.threshold:
+                self.count_is_estimate = True
+                return estimate
+        return super().count
+
+    def validate_number(self, number):
+        if not self.count_is_estimate:
+            return super().validate_number(number)
+        # Con un total estimado no se puede descartar una página por arriba
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return super().validate_number(number)
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        self.count  # Decide si el total es estimado
+        if not self.count_is_estimate:
+            return super().page(number)
+
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        items = list(self.object_list[bottom:bottom + self.per_page + 1])
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+
+        if has_more:
+            # Al menos hasta la página siguiente
+            self._set_count(max(self.count, bottom + self.per_page + 1), estimate=True)
+        else:
+            if not items and number > 1:
+                raise EmptyPage(self.error_messages['no_results'])
+            self._set_count(bottom + len(items), estimate=False)
+        return self._get_page(items, number, self)
+
+    def _set_count(self, count: int, *, estimate: bool):
+        self.__dict__['count'] = count
+        self.__dict__.pop('num_pages', None)
+        self.count_is_estimate = estimate
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    PageNumberPagination con EstimatedCountPaginator: la respuesta añade
+    'count_is_estimate' para que el cliente sepa si 'count' es aproximado.
+    """
+    django_paginator_class = EstimatedCountPaginator
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.page.paginator.count),
+            ('count_is_estimate', self.page.paginator.count_is_estimate),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_prerendered_response(self, fragments):
+        """
+        Como get_paginated_response, pero con los resultados ya renderizados
+        a JSON (un bytes por objeto): se insertan en el cuerpo sin parsearlos.
+        """
+        envelope = JSONRenderer().render(OrderedDict([
+            ('count', self.page.paginator.count),
+            ('count_is_estimate', self.page.paginator.count_is_estimate),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ]))
+        # 'results' va al final, como en get_paginated_response
+        return PrerenderedJSONResponse(envelope[:-1] + b',"results":[' + b','.join(fragments) + b']}')
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_estimate'] = {'type': 'boolean', 'example': False}
+        return response_schema
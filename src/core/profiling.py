@@ -0,0 +1,241 @@
+# src/core/profiling.py
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
+from django.urls import reverse
+from django.utils import timezone
+
+_REPORT_KEY = 'profile_report:{}'
+
+
+def _conf(name):
+    return settings.PROFILING[name]
+
+
+def requested(request) -> bool:
+    """
+    Si la petición pide el modo de perfilado (cabecera o query param).
+    """
+    return _conf('HEADER') in request.META or _conf('QUERY_PARAM') in request.GET
+
+
+def get_report(report_id: str) -> Optional[Dict[str, Any]]:
+    return cache.get(_REPORT_KEY.format(report_id))
+
+
+# --- Profiler por muestreo ---
+
+def _location(code) -> str:
+    # Ruta relativa al proyecto (o a site-packages) para que el informe se lea
+    filename = code.co_filename
+    if filename.startswith(str(settings.BASE_DIR)):
+        filename = os.path.relpath(filename, settings.BASE_DIR)
+    elif 'site-packages' in filename:
+        filename = filename.split('site-packages' + os.sep, 1)[1]
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+
+class Sampler:
+    """
+    Profiler por muestreo del hilo de la petición: otro hilo lee su pila
+    (sys._current_frames) cada 'interval' segundos y cuenta cuántas veces
+    aparece cada una. No instrumenta las llamadas, así que apenas altera
+    los tiempos que mide.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiling-sampler', daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_location(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+
+    def report(self, top: int) -> Dict[str, Any]:
+        """
+        Funciones con más muestras propias (en la cima de la pila) y
+        acumuladas (en cualquier punto de la pila), y las pilas más
+        frecuentes en formato "collapsed" (a;b;c N), que leen los
+        generadores de flame graphs.
+        """
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for function in set(stack):
+                total[function] += count
+        return {
+            'interval_ms': self.interval * 1000,
+            'samples': self.samples,
+            'own': [{'function': function, 'samples': count} for function, count in own.most_common(top)],
+            'total': [{'function': function, 'samples': count} for function, count in total.most_common(top)],
+            'stacks': [f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common(top)],
+        }
+
+
+# --- SQL ---
+
+class QueryCapture:
+    """
+    Wrapper de connection.execute_wrapper que registra cada consulta de la
+    petición con sus parámetros y su duración.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql, 'params': params, 'many': many, 'ms': (time.perf_counter() - started) * 1000,
+            })
+
+    def report(self, max_explain: int, analyze: bool) -> Dict[str, Any]:
+        """
+        Las consultas en orden, con el EXPLAIN de las SELECT más lentas
+        (una vez por SQL). Con 'analyze' se ejecutan de nuevo (EXPLAIN
+        ANALYZE), siempre en una transacción que se revierte.
+        """
+        explained = set()
+        for query in sorted(self.queries, key=lambda query: -query['ms']):
+            if len(explained) >= max_explain:
+                break
+            if query['many'] or query['sql'] in explained or not query['sql'].lstrip().upper().startswith('SELECT'):
+                continue
+            explained.add(query['sql'])
+            query['explain'] = _explain(query['sql'], query['params'], analyze)
+
+        return {
+            'count': len(self.queries),
+            'total_ms': round(sum(query['ms'] for query in self.queries), 3),
+            'queries': [
+                {**query, 'params': _printable(query['params']), 'ms': round(query['ms'], 3)}
+                for query in self.queries
+            ],
+        }
+
+
+def _explain(sql: str, params, analyze: bool) -> str:
+    options = '(ANALYZE, BUFFERS) ' if analyze else ''
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN {options}{sql}', params)
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+            transaction.set_rollback(True)
+        return plan
+    except DatabaseError as exc:
+        return f'EXPLAIN falló: {exc}'
+
+
+def _printable(params):
+    # El informe va al caché y sale como JSON: los parámetros, como texto
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: str(value) for key, value in params.items()}
+    return [str(value) for value in params]
+
+
+# --- Integración con las vistas ---
+
+class Profiling:
+    """
+    Perfilado de una petición: profiler por muestreo más captura del SQL,
+    entre start() y stop(). stop() guarda el informe en el caché y
+    devuelve su ID.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.sampler = Sampler(_conf('SAMPLE_INTERVAL'))
+        self.queries = QueryCapture()
+        self._stack = ExitStack()
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._stack.enter_context(connection.execute_wrapper(self.queries))
+        self._stack.enter_context(self.sampler)
+
+    def stop(self, response) -> str:
+        self._stack.close()
+        duration_ms = (time.perf_counter() - self.started) * 1000
+        report_id = uuid.uuid4().hex
+        report = {
+            'id': report_id,
+            'created_at': timezone.now().isoformat(),
+            'method': self.request.method,
+            'path': self.request.get_full_path(),
+            'user': self.request.user.get_username(),
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 3),
+            'profile': self.sampler.report(_conf('TOP')),
+            'sql': self.queries.report(_conf('MAX_EXPLAIN'), _conf('EXPLAIN_ANALYZE')),
+        }
+        cache.set(_REPORT_KEY.format(report_id), report, timeout=_conf('REPORT_TTL'))
+        return report_id
+
+
+class ProfilingMixin:
+    """
+    Modo de perfilado bajo demanda para ViewSets, solo para staff: con la
+    cabecera X-Profile (o el query param ?_profile) la petición se ejecuta
+    bajo Profiling y la respuesta indica dónde leer el informe
+    (X-Profile-Id / X-Profile-Url, vista de admin). Para el resto de
+    peticiones el único coste es buscar la marca en la petición.
+
+    ?_profile también cambia la clave del caché de listados, así que
+    perfila la consulta en frío.
+    """
+    _profiling = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if requested(request) and request.user.is_staff:
+            self._profiling = Profiling(request)
+            self._profiling.start()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self._profiling is None:
+            return response
+
+        # El renderizado (JSON) también es parte de la petición
+        if hasattr(response, 'render'):
+            response.render()
+        report_id = self._profiling.stop(response)
+        self._profiling = None
+        response['X-Profile-Id'] = report_id
+        response['X-Profile-Url'] = reverse('profile-report', args=[report_id])
+        return response
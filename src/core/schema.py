@@ -0,0 +1,130 @@
+# src/core/schema.py
+
+import hashlib
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+from drf_spectacular.renderers import OpenApiJsonRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+logger = logging.getLogger(__name__)
+
+# Esquema ya cargado y sus representaciones renderizadas (una por media type)
+_lock = threading.Lock()
+_schema = None
+_rendered = {}
+
+
+def _conf(name):
+    return settings.OPENAPI_SCHEMA[name]
+
+
+def generate_schema() -> dict:
+    """
+    Genera el esquema OpenAPI introspectando las vistas (lo costoso).
+    """
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(request=None, public=True)
+
+
+def render_artifact(schema: dict) -> bytes:
+    """
+    Representación canónica del esquema guardado en disco (JSON).
+    """
+    return OpenApiJsonRenderer().render(schema, renderer_context={'indent': 2}) + b'\n'
+
+
+def write_artifact() -> str:
+    path = _conf('PATH')
+    with open(path, 'wb') as f:
+        f.write(render_artifact(generate_schema()))
+    reset()
+    return str(path)
+
+
+def check_artifact():
+    """
+    Compara el esquema guardado con el que genera el código actual.
+    Devuelve None si está al día, o un mensaje explicando qué falta.
+    """
+    try:
+        with open(_conf('PATH'), 'rb') as f:
+            stored = f.read()
+    except FileNotFoundError:
+        return f"No existe el esquema precalculado ({_conf('PATH')})."
+    if stored != render_artifact(generate_schema()):
+        return f"El esquema precalculado ({_conf('PATH')}) no coincide con el código."
+    return None
+
+
+def _load() -> dict:
+    global _schema
+    if _schema is None:
+        with _lock:
+            if _schema is None:
+                try:
+                    with open(_conf('PATH'), 'rb') as f:
+                        _schema = json.loads(f.read())
+                except FileNotFoundError:
+                    # Sin artefacto se genera una sola vez por proceso
+                    logger.warning("Esquema OpenAPI precalculado no encontrado; se genera en memoria.")
+                    _schema = json.loads(render_artifact(generate_schema()))
+    return _schema
+
+
+def get_rendered(renderer):
+    """
+    Devuelve (contenido, etag) del esquema en el formato del renderer.
+    Se renderiza una vez por proceso y formato.
+    """
+    key = renderer.media_type
+    if key not in _rendered:
+        content = renderer.render(_load(), renderer.media_type, {})
+        etag = quote_etag(hashlib.sha256(content).hexdigest()[:32])
+        _rendered[key] = (content, etag)
+    return _rendered[key]
+
+
+def reset():
+    """
+    Descarta el esquema en memoria (se vuelve a leer del disco).
+    """
+    global _schema
+    with _lock:
+        _schema = None
+        _rendered.clear()
+
+
+class PrecomputedSpectacularAPIView(SpectacularAPIView):
+    """
+    SpectacularAPIView que sirve el esquema precalculado desde memoria, con
+    ETag (responde 304 si el cliente ya tiene esa versión). Con 'lang' o
+    'version' en la query, o con OPENAPI_SCHEMA['PRECOMPUTED'] desactivado,
+    se genera en el momento como siempre.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if not _conf('PRECOMPUTED') or request.GET.get('lang') or request.GET.get('version'):
+            return super().get(request, *args, **kwargs)
+
+        renderer = request.accepted_renderer
+        content, etag = get_rendered(renderer)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type = f'{content_type}; charset={renderer.charset}'
+            response = HttpResponse(content, content_type=content_type)
+            response['Content-Disposition'] = f'inline; filename="{self._get_filename(request, None)}"'
+        response['ETag'] = etag
+        # Se puede guardar, pero hay que revalidarlo (barato gracias al ETag)
+        response['Cache-Control'] = 'no-cache'
+        return response
@@ -1,10 +1,20 @@
 # src/core/serializers.py
 
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from .tokens import BlacklistRefreshToken
 
 class TokenOutputSerializer(serializers.Serializer):
     """
     Serializer para la respuesta del endpoint de login (Solo para Swagger).
     """
     access = serializers.CharField(read_only=True)
-    refresh = serializers.CharField(read_only=True)
\ No newline at end of file
+    refresh = serializers.CharField(read_only=True)
+
+
+class BlacklistTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Serializer del refresh que usa la blacklist en Redis.
+    Se activa desde SIMPLE_JWT['TOKEN_REFRESH_SERIALIZER'].
+    """
+    token_class = BlacklistRefreshToken
@@ -0,0 +1,83 @@
+# src/core/startup.py
+
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+
+# Lo que hace cada proceso antes de poder atender su primera petición/tarea.
+# Para la web incluye cargar el URLconf (y con él las vistas).
+ENTRY_POINTS = {
+    'wsgi': "import config.wsgi; from django.urls import get_resolver; get_resolver().url_patterns",
+    'asgi': "import config.asgi; from django.urls import get_resolver; get_resolver().url_patterns",
+    'celery': "from config.celery import app; app.loader.import_default_modules(); app.finalize()",
+}
+
+# Módulos que los procesos web no deben cargar al arrancar: se importan al
+# primer uso (Celery al encolar una tarea, drf-spectacular al pedir el esquema)
+WEB_DEFERRED_MODULES = (
+    'celery',
+    'kombu',
+    'drf_spectacular.views',
+    'drf_spectacular.generators',
+)
+
+
+def profile_entry_point(entry: str) -> dict:
+    """
+    Importa el punto de entrada en un proceso nuevo con 'python -X importtime'
+    y devuelve el tiempo total de imports y el detalle por módulo:
+    {'entry', 'total_ms', 'wall_ms', 'modules': {nombre: (propio_ms, acumulado_ms)}}.
+    """
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings')}
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', ENTRY_POINTS[entry]],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if process.returncode != 0:
+        raise RuntimeError(f"El punto de entrada '{entry}' falló:\n{process.stderr[-2000:]}")
+
+    modules = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(own) / 1000, int(cumulative) / 1000)
+
+    return {
+        'entry': entry,
+        'total_ms': sum(own for own, _ in modules.values()),
+        'wall_ms': wall_ms,
+        'modules': modules,
+    }
+
+
+def by_package(profile: dict) -> Counter:
+    """
+    Tiempo propio de import sumado por paquete de primer nivel (ms).
+    """
+    totals = Counter()
+    for name, (own, _) in profile['modules'].items():
+        totals[name.split('.')[0]] += own
+    return totals
+
+
+def budget_problems(profile: dict) -> list:
+    """
+    Lo que incumple el presupuesto de arranque (STARTUP_BUDGET): tiempo
+    total de imports y, en los procesos web, módulos que debían diferirse.
+    """
+    problems = []
+    budget = settings.STARTUP_BUDGET['IMPORT_MS'][profile['entry']]
+    if profile['total_ms'] > budget:
+        problems.append(f"{profile['entry']}: {profile['total_ms']:.0f} ms de imports (presupuesto {budget} ms)")
+    if profile['entry'] != 'celery':
+        loaded = [name for name in WEB_DEFERRED_MODULES if name in profile['modules']]
+        if loaded:
+            problems.append(f"{profile['entry']}: carga al arrancar módulos diferidos: {', '.join(loaded)}")
+    return problems
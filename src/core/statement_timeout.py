@@ -0,0 +1,147 @@
+# src/core/statement_timeout.py
+
+import logging
+from contextlib import ExitStack, contextmanager
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY = 'statement_timeout_stats'
+
+# SQLSTATE de una sentencia cancelada (statement_timeout o pg_cancel_backend)
+QUERY_CANCELED = '57014'
+
+# Estados de transacción de libpq (PQtransactionStatus), iguales en psycopg2 y psycopg
+_IDLE, _INTRANS, _INERROR = 0, 2, 3
+
+
+def _conf(name):
+    return settings.STATEMENT_TIMEOUT[name]
+
+
+def _transaction_status(conn) -> Optional[int]:
+    if conn.connection is None:
+        return None
+    return conn.connection.info.transaction_status
+
+
+class StatementTimeout:
+    """
+    Wrapper de connection.execute_wrapper que fija statement_timeout con
+    SET LOCAL al empezar cada transacción, antes de su primera consulta.
+    SET LOCAL dura lo que la transacción, así que el límite nunca pasa a
+    otra petición que reutilice la conexión. Las consultas en autocommit
+    (fuera de transaction.atomic) no se limitan.
+    """
+
+    def __init__(self, timeout_ms: int):
+        self.timeout_ms = timeout_ms
+        self.applied = False
+
+    def __call__(self, execute, sql, params, many, context):
+        conn = context['connection']
+        if conn.in_atomic_block and (not self.applied or _transaction_status(conn) == _IDLE):
+            # Con el cursor del driver: no vuelve a pasar por los wrappers
+            context['cursor'].cursor.execute('SET LOCAL statement_timeout = %s', [self.timeout_ms])
+            self.applied = True
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def statement_timeout(timeout_ms: int):
+    """
+    Cancela cualquier sentencia SQL del bloque que se ejecute en una
+    transacción y tarde más de 'timeout_ms'.
+    """
+    wrapper = StatementTimeout(timeout_ms)
+    try:
+        with connection.execute_wrapper(wrapper):
+            yield wrapper
+    finally:
+        # Si la transacción sigue abierta (un atomic() externo, ATOMIC_REQUESTS,
+        # los tests) el límite no debe aplicarse a lo que venga después
+        if wrapper.applied and _transaction_status(connection) == _INTRANS:
+            with connection.connection.cursor() as cursor:
+                cursor.execute('SET LOCAL statement_timeout TO DEFAULT')
+
+
+class StatementTimeoutMixin:
+    """
+    statement_timeout por acción para ViewSets (STATEMENT_TIMEOUT en los
+    settings): estricto para listados y búsquedas, generoso para
+    exportaciones e importaciones. Postgres cancela la consulta al
+    vencer, aunque el cliente ya se haya ido, y custom_exception_handler
+    responde 504.
+
+    Las lecturas se ejecutan en una transacción para que el límite cubra
+    todas sus consultas; no cuesta nada si se responden desde el caché
+    (la transacción se abre con la primera consulta). Las escrituras ya
+    abren las suyas en los servicios.
+    """
+    statement_timeout_key = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if not _conf('ENABLED'):
+            return super().dispatch(request, *args, **kwargs)
+
+        action = getattr(self, 'action_map', {}).get(request.method.lower())
+        if action == 'list' and _conf('SEARCH_PARAM') in request.GET:
+            action = 'search'
+        timeout_ms = _conf('ACTIONS').get(action, _conf('DEFAULT_MS'))
+        if not timeout_ms:
+            return super().dispatch(request, *args, **kwargs)
+
+        self.statement_timeout_key = f'{self.basename}:{action}'
+        with ExitStack() as stack:
+            stack.enter_context(statement_timeout(timeout_ms))
+            if request.method in SAFE_METHODS:
+                # Sin savepoint si ya hay una transacción abierta: nada que deshacer en una lectura
+                stack.enter_context(transaction.atomic(savepoint=False))
+            return super().dispatch(request, *args, **kwargs)
+
+
+# --- Consultas canceladas ---
+
+def is_timeout(exc) -> bool:
+    """
+    Si la excepción es una consulta cancelada por Postgres.
+    """
+    return isinstance(exc, OperationalError) and getattr(exc.__cause__, 'pgcode', None) == QUERY_CANCELED
+
+
+def rollback_if_aborted():
+    """
+    Si la consulta cancelada dejó abortada la transacción abierta (no la
+    revirtió ya un atomic() interno), la marca para revertirla al salir
+    en vez de confirmarla.
+    """
+    if connection.in_atomic_block and _transaction_status(connection) == _INERROR:
+        transaction.set_rollback(True)
+
+
+def record_timeout(view, request):
+    """
+    Cuenta la consulta cancelada por endpoint (basename:acción) en un hash
+    de Redis, sumando todos los workers.
+    """
+    key = getattr(view, 'statement_timeout_key', None) or 'other'
+    logger.warning("Consulta cancelada por statement_timeout (%s): %s %s", key, request.method, request.get_full_path())
+    try:
+        get_redis_connection('default').hincrby(STATS_KEY, key, 1)
+    except RedisError:
+        logger.exception("No se pudo registrar la métrica de statement_timeout")
+
+
+def get_stats() -> Dict[str, int]:
+    raw = get_redis_connection('default').hgetall(STATS_KEY)
+    return {field.decode(): int(value) for field, value in raw.items()}
+
+
+def reset_stats():
+    get_redis_connection('default').delete(STATS_KEY)
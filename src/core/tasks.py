@@ -0,0 +1,14 @@
+# src/core/tasks.py
+
+from celery import shared_task
+from config.celery import app  # noqa: F401  (registra la app antes de encolar)
+from . import token_blacklist
+
+@shared_task
+def prune_token_blacklist():
+    """
+    Tarea periódica (Celery Beat) que limpia el log de la blacklist
+    de Refresh Tokens ya expirados.
+    """
+    removed = token_blacklist.prune()
+    return f"{removed} entradas expiradas eliminadas de la blacklist."
@@ -0,0 +1,99 @@
+# src/core/tests/test_cache_codec.py
+
+import pickle
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django_redis import get_redis_connection
+
+from catalog.services import ListEntry
+from core import cache_codec
+from core.cache_codec import CodecSerializer
+
+
+class CodecSerializerTests(SimpleTestCase):
+    """
+    Tests del códec de valores del caché (msgpack + zstd, con pickle de respaldo).
+    """
+
+    def setUp(self):
+        self.codec = CodecSerializer(options={})
+
+    def test_ida_y_vuelta_con_tipos_extendidos(self):
+        value = {
+            'entries': [ListEntry(uuid.uuid4(), '1.2', (uuid.uuid4(),))],
+            'created_at': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            'birth_date': date(1903, 6, 25),
+            'price': Decimal('9.95'),
+            'pair': (1, 'a'),
+            'tags': {'a', 'b'},
+            1: None,
+        }
+        encoded = self.codec.dumps(value)
+
+        self.assertEqual(encoded[0], cache_codec.MSGPACK)
+        decoded = self.codec.loads(encoded)
+        self.assertEqual(decoded, value)
+        self.assertIsInstance(decoded['entries'][0], ListEntry)
+        self.assertIsInstance(decoded['pair'], tuple)
+
+    def test_lee_valores_del_serializer_anterior(self):
+        legacy = pickle.dumps({'a': [1, 2]}, pickle.HIGHEST_PROTOCOL)
+        self.assertEqual(self.codec.loads(legacy), {'a': [1, 2]})
+
+    def test_objetos_no_soportados_usan_pickle(self):
+        user = User(username='codec')
+        encoded = self.codec.dumps(user)
+
+        self.assertEqual(encoded[0], cache_codec.PICKLE)
+        self.assertEqual(self.codec.loads(encoded).username, 'codec')
+
+    def test_comprime_a_partir_del_umbral(self):
+        small = self.codec.dumps('x' * 10)
+        large = self.codec.dumps('x' * 10_000)
+
+        self.assertEqual(small[0], cache_codec.MSGPACK)
+        self.assertEqual(large[0], cache_codec.MSGPACK_ZSTD)
+        self.assertLess(len(large), 1000)
+        self.assertEqual(self.codec.loads(large), 'x' * 10_000)
+
+    @override_settings(CACHE_CODEC={'COMPRESS_MIN_BYTES': 10 ** 9, 'ZSTD_LEVEL': 3,
+                                    'HISTOGRAMS': True, 'STATS_FLUSH_INTERVAL': 10})
+    def test_umbral_configurable(self):
+        codec = CodecSerializer(options={})
+        self.assertEqual(codec.dumps('x' * 10_000)[0], cache_codec.MSGPACK)
+
+
+class SizeHistogramTests(SimpleTestCase):
+    """
+    Tests del histograma de tamaños por namespace.
+    """
+
+    def setUp(self):
+        if not isinstance(cache.client, cache_codec.SizeAccountingClient):
+            self.skipTest("CACHE_CODEC_ENABLED desactivado")
+
+    def _stats(self):
+        return cache_codec.get_histograms().get('codectest_ns', {'count': 0, 'bytes': 0, 'buckets': {}})
+
+    def test_anota_el_tamano_codificado(self):
+        before = self._stats()
+        cache.set('codectest_ns_1', 'x' * 200)
+        cache.set_many({'codectest_ns_2': 'a', 'codectest_ns_3': 'b'})
+        cache.client.flush_sizes()
+        after = self._stats()
+
+        self.assertEqual(after['count'] - before['count'], 3)
+        stored = get_redis_connection('default').strlen(cache.make_key('codectest_ns_1'))
+        self.assertGreaterEqual(after['bytes'] - before['bytes'], stored)
+        self.assertGreater(after['buckets'].get('<=256', 0), before['buckets'].get('<=256', 0))
+        cache.delete_many(['codectest_ns_1', 'codectest_ns_2', 'codectest_ns_3'])
+
+    def test_namespace_de_la_clave(self):
+        self.assertEqual(cache_codec.namespace_of('autores_list_page=2'), 'autores_list')
+        self.assertEqual(cache_codec.namespace_of('throttle_user_1'), 'throttle_user')
+        self.assertEqual(cache_codec.namespace_of(':1:'), 'otros')
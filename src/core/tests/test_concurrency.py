@@ -0,0 +1,133 @@
+# src/core/tests/test_concurrency.py
+
+import uuid
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from catalog import services, tasks
+from catalog.models import Autor
+from core import concurrency
+from core.exceptions import ServiceWarmingUpError
+
+
+class AIMDLimiterTests(SimpleTestCase):
+    """
+    Tests del límite AIMD de una clase de endpoint.
+    """
+
+    def _limiter(self, **kwargs):
+        params = dict(priority=1, initial_limit=4, min_limit=1, max_limit=8, target_ms=100, backoff=0.5, window=1.0)
+        return concurrency.AIMDLimiter('list', **{**params, **kwargs})
+
+    def test_rechaza_por_encima_del_limite(self):
+        limiter = self._limiter()
+        self.assertEqual([limiter.try_acquire() for _ in range(5)], [True] * 4 + [False])
+        self.assertEqual(limiter.snapshot(), {'limit': 4.0, 'inflight': 4, 'shed': 1})
+
+    def test_crece_aditivamente_y_recorta_una_vez_por_ventana(self):
+        limiter = self._limiter()
+        for _ in range(4):
+            limiter.try_acquire()
+        for _ in range(4):
+            limiter.release(10)
+        # Solo crece mientras se usa al menos la mitad del límite (4 y 3 en curso)
+        self.assertAlmostEqual(limiter.limit, 4 + 1 / 4 + 1 / 4.25)
+        grown = limiter.limit
+
+        with mock.patch.object(concurrency.time, 'monotonic', return_value=1000.0):
+            for _ in range(3):
+                limiter.try_acquire()
+                limiter.release(500)
+        self.assertAlmostEqual(limiter.limit, grown * 0.5)
+        self.assertEqual(limiter.congested_until, 1001.0)
+
+        # Si aún pueden ceder clases menos prioritarias, solo se marca congestionada
+        with mock.patch.object(concurrency.time, 'monotonic', return_value=1010.0):
+            limiter.try_acquire()
+            limiter.release(500, defer=True)
+        self.assertAlmostEqual(limiter.limit, grown * 0.5)
+        self.assertEqual(limiter.congested_until, 1011.0)
+
+        # La presión de una clase prioritaria también recorta, hasta MIN_LIMIT
+        with mock.patch.object(concurrency.time, 'monotonic', return_value=1012.0):
+            limiter.try_acquire()
+            limiter.release(10, pressure=True)
+        with mock.patch.object(concurrency.time, 'monotonic', return_value=1014.0):
+            limiter.try_acquire()
+            limiter.release(10, failed=True)
+        self.assertEqual(limiter.limit, 1)
+
+
+@mock.patch.object(tasks.warm_list_cache, 'apply_async')
+class ConcurrencyLimitMiddlewareTests(APITestCase):
+    """
+    Tests del middleware de límite de concurrencia.
+    """
+
+    def setUp(self):
+        concurrency.reset_limiters()
+        self.addCleanup(concurrency.reset_limiters)
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.autor = Autor.objects.create(first_name='Ana', last_name='Autor', birth_date=date(1950, 1, 1))
+
+    def _saturate(self, name):
+        limiter = concurrency.get_limiters()[name]
+        limiter.inflight = int(limiter.limit)
+        self.addCleanup(setattr, limiter, 'inflight', 0)
+
+    def test_los_listados_caros_se_rechazan_primero(self, *_):
+        cached = {'last_name': f'Cacheado {uuid.uuid4()}'}
+        self.assertEqual(self.client.get(reverse('autor-list'), cached).status_code, 200)
+        self._saturate('list')
+        self._saturate('search')
+
+        response = self.client.get(reverse('autor-list'), {'last_name': str(uuid.uuid4())})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(response.json()['code'], 'overloaded')
+        self.assertEqual(self.client.get(reverse('libro-list'), {'search': str(uuid.uuid4())}).status_code, 503)
+
+        # Las lecturas de detalle, las escrituras y los listados en caché pasan
+        self.assertEqual(self.client.get(reverse('autor-detail', args=[self.autor.pk])).status_code, 200)
+        self.assertEqual(self.client.get(reverse('autor-list'), cached).status_code, 200)
+        response = self.client.patch(reverse('autor-detail', args=[self.autor.pk]), {'biography': 'Nueva'})
+        self.assertEqual(response.status_code, 200)
+
+        stats = concurrency.stats()
+        self.assertEqual((stats['list']['shed'], stats['search']['shed'], stats['read']['shed']), (1, 1, 0))
+        self.assertEqual(stats['read']['inflight'], 0)
+
+    def test_solo_los_errores_de_sobrecarga_recortan(self, *_):
+        url = reverse('autor-coautores', args=[self.autor.pk])
+        limiter = concurrency.get_limiters()['read']
+        initial = limiter.limit
+
+        # El grafo aún construyéndose: 503 inmediato que no es congestión
+        with mock.patch.object(services, 'get_coautores', side_effect=ServiceWarmingUpError()):
+            self.assertEqual(self.client.get(url).status_code, 503)
+        self.assertEqual(limiter.limit, initial)
+        self.assertEqual(limiter.congested_until, 0.0)
+
+        with mock.patch.object(services, 'get_coautores', side_effect=RuntimeError('boom')):
+            self.assertEqual(self.client.get(url).status_code, 500)
+        # Las lecturas son prioritarias: se marcan congestionadas y ceden las demás
+        self.assertGreater(limiter.congested_until, 0.0)
+
+    def test_fuera_de_los_viewsets_no_se_limita(self, *_):
+        self._saturate('read')
+        self._saturate('write')
+        response = self.client.post(reverse('token_obtain_pair'), {'username': 'testuser', 'password': 'testpassword123'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_desactivado(self, *_):
+        self._saturate('read')
+        with self.settings(CONCURRENCY_LIMIT={**concurrency.settings.CONCURRENCY_LIMIT, 'ENABLED': False}):
+            self.assertEqual(self.client.get(reverse('autor-detail', args=[self.autor.pk])).status_code, 200)
@@ -0,0 +1,46 @@
+# src/core/tests/test_ids.py
+
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from catalog.models import Autor
+from core import ids
+from core.ids import uuid7, uuid7_timestamp_ms
+
+
+class UUID7Tests(SimpleTestCase):
+    """
+    Tests del generador de UUIDv7.
+    """
+
+    def test_version_variante_y_timestamp(self):
+        before = time.time_ns() // 1_000_000
+        value = uuid7()
+        after = time.time_ns() // 1_000_000
+
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, 'specified in RFC 4122')
+        self.assertTrue(before <= uuid7_timestamp_ms(value) <= after)
+
+    def test_crecientes_en_el_mismo_milisegundo(self):
+        with mock.patch.object(ids.time, 'time_ns', return_value=1_700_000_000_000_000_000):
+            values = [uuid7() for _ in range(10_000)]
+
+        # Más IDs que el contador de 12 bits: toma prestados milisegundos
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), len(values))
+
+    def test_reloj_que_retrocede_no_rompe_el_orden(self):
+        first = uuid7()
+        with mock.patch.object(ids.time, 'time_ns', return_value=0):
+            second = uuid7()
+        self.assertLess(first, second)
+
+
+class ModelIdTests(TestCase):
+
+    def test_los_modelos_usan_uuid7(self):
+        autor = Autor.objects.create(first_name='Ada', last_name='Lovelace')
+        self.assertEqual(autor.id.version, 7)
@@ -0,0 +1,89 @@
+# src/core/tests/test_pagination.py
+
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.paginator import EmptyPage
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.models import Autor
+from core.pagination import EstimatedCountPaginator, estimate_count
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    """
+    Tests del paginator con totales estimados por el planificador.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        Autor.objects.bulk_create([
+            Autor(first_name=f'Nombre {i}', last_name=f'Apellido {i:02d}', birth_date=datetime.date(1950, 1, 1))
+            for i in range(25)
+        ])
+        # Estadísticas al día: sin ellas las estimaciones dependen de cuándo pasó el autovacuum
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE catalog_autor')
+
+    def setUp(self):
+        self.queryset = Autor.objects.order_by('last_name')
+
+    def test_estimacion_del_planificador(self):
+        self.assertGreater(estimate_count(self.queryset), 0)
+        self.assertGreater(estimate_count(self.queryset.filter(last_name__startswith='Apellido')), 0)
+
+    def test_estimacion_con_estadisticas_viejas(self):
+        # reltuples sigue en 25 hasta el próximo ANALYZE; la estimación crece con la tabla
+        Autor.objects.bulk_create([
+            Autor(first_name=f'Nuevo {i}', last_name=f'Nuevo {i}', birth_date=datetime.date(1960, 1, 1))
+            for i in range(2000)
+        ])
+        self.assertGreater(estimate_count(self.queryset), 100)
+
+    def test_por_debajo_del_umbral_cuenta_exacto(self):
+        paginator = EstimatedCountPaginator(self.queryset, 10, threshold=10 ** 9)
+        self.assertEqual(paginator.count, 25)
+        self.assertFalse(paginator.count_is_estimate)
+
+    def test_total_estimado_sin_count(self):
+        paginator = EstimatedCountPaginator(self.queryset, 10, threshold=1)
+        # La página pide una fila de más en lugar de contar
+        with CaptureQueriesContext(connection) as queries:
+            page = paginator.page(1)
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
+        self.assertIn('LIMIT 11', queries.captured_queries[-1]['sql'])
+        self.assertTrue(paginator.count_is_estimate)
+        self.assertEqual(len(page), 10)
+        self.assertTrue(page.has_next())
+        self.assertEqual(page[0].last_name, 'Apellido 00')
+
+    def test_la_ultima_pagina_corrige_el_total(self):
+        paginator = EstimatedCountPaginator(self.queryset, 10, threshold=1)
+        page = paginator.page(3)
+        self.assertEqual(len(page), 5)
+        self.assertFalse(page.has_next())
+        self.assertEqual(paginator.count, 25)
+        self.assertFalse(paginator.count_is_estimate)
+
+        with self.assertRaises(EmptyPage):
+            EstimatedCountPaginator(self.queryset, 10, threshold=1).page(4)
+
+    def test_las_listas_se_cuentan_con_len(self):
+        paginator = EstimatedCountPaginator(list(self.queryset), 10, threshold=1)
+        self.assertEqual(paginator.count, 25)
+        self.assertFalse(paginator.count_is_estimate)
+
+    @override_settings(ESTIMATED_COUNT={'THRESHOLD': 1})
+    def test_changelist_del_admin(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'password123')
+        self.client.force_login(admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:catalog_autor_changelist'), {'p': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.context['cl'].paginator, EstimatedCountPaginator)
+        self.assertFalse(any(
+            'COUNT(' in query['sql'] and 'catalog_autor' in query['sql'] for query in queries.captured_queries
+        ))
@@ -0,0 +1,74 @@
+# src/core/tests/test_profiling.py
+
+import time
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from catalog import services
+from catalog.models import Autor
+from core import profiling
+
+
+class ProfilingTests(APITestCase):
+    """
+    Tests del perfilado bajo demanda (cabecera X-Profile) y de su informe.
+    """
+
+    def setUp(self):
+        self.staff = User.objects.create_user(username='staff', password='testpassword123', is_staff=True)
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.autor = Autor.objects.create(first_name='Ana', last_name='Autor', birth_date=date(1950, 1, 1))
+
+    def _login(self, user):
+        access = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def _get_autor(self, **extra):
+        return self.client.get(reverse('autor-detail', args=[self.autor.pk]), **extra)
+
+    def test_staff_obtiene_el_informe(self):
+        self._login(self.staff)
+        get_autor = services.get_autor
+
+        def slow_get_autor(**kwargs):
+            time.sleep(0.05)
+            return get_autor(**kwargs)
+
+        with mock.patch.object(services, 'get_autor', side_effect=slow_get_autor):
+            response = self._get_autor(HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['id'], str(self.autor.pk))
+
+        report = self.client.get(response['X-Profile-Url']).data['data']
+        self.assertEqual(report['id'], response['X-Profile-Id'])
+        self.assertEqual((report['status'], report['user']), (200, 'staff'))
+        self.assertGreater(report['profile']['samples'], 0)
+        self.assertTrue(any('slow_get_autor' in stack for stack in report['profile']['stacks']))
+
+        [query] = [query for query in report['sql']['queries'] if 'catalog_autor' in query['sql']]
+        self.assertEqual(query['params'], [str(self.autor.pk)])
+        self.assertIn('Scan', query['explain'])
+
+    def test_sin_marca_o_sin_staff_no_se_perfila(self):
+        self._login(self.user)
+        with mock.patch.object(profiling, 'Profiling') as profiling_class:
+            self.assertNotIn('X-Profile-Id', self._get_autor(HTTP_X_PROFILE='1'))
+            self._login(self.staff)
+            self.assertNotIn('X-Profile-Id', self._get_autor())
+        profiling_class.assert_not_called()
+
+        # El query param también lo activa
+        self.assertIn('X-Profile-Id', self.client.get(reverse('autor-list'), {'_profile': 1}))
+
+    def test_informe_solo_para_admin(self):
+        self._login(self.staff)
+        url = self._get_autor(HTTP_X_PROFILE='1')['X-Profile-Url']
+        self.assertEqual(self.client.get(reverse('profile-report', args=['no-existe'])).status_code, 404)
+
+        self._login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 403)
@@ -0,0 +1,70 @@
+# src/core/tests/test_schema.py
+
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from core import checks, schema
+
+
+class PrecomputedSchemaTests(SimpleTestCase):
+    """
+    Tests del esquema OpenAPI precalculado y de su comprobación.
+    """
+
+    def setUp(self):
+        schema.reset()
+        self.addCleanup(schema.reset)
+
+    def test_el_esquema_guardado_esta_al_dia(self):
+        # Si falla: ejecutar 'python manage.py openapi_schema' y commitear openapi.json
+        call_command('openapi_schema', '--check', stdout=mock.MagicMock())
+
+    def test_se_sirve_desde_memoria_con_etag(self):
+        with mock.patch.object(schema, 'generate_schema') as generate:
+            response = self.client.get(reverse('schema'), HTTP_ACCEPT='application/vnd.oai.openapi+json')
+            generate.assert_not_called()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('application/vnd.oai.openapi+json'))
+        with open(settings.OPENAPI_SCHEMA['PATH']) as f:
+            self.assertEqual(json.loads(response.content), json.load(f))
+
+        etag = response['ETag']
+        response = self.client.get(reverse('schema'), HTTP_ACCEPT='application/vnd.oai.openapi+json',
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Cada formato tiene su propio ETag
+        response = self.client.get(reverse('schema'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('application/vnd.oai.openapi'))
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detecta_un_esquema_desactualizado(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'openapi.json'
+            with override_settings(OPENAPI_SCHEMA={**settings.OPENAPI_SCHEMA, 'PATH': path}):
+                self.assertIn('No existe', schema.check_artifact())
+
+                path.write_text('{"openapi": "3.0.3", "paths": {}}\n')
+                self.assertIn('no coincide', schema.check_artifact())
+                self.assertEqual([error.id for error in checks.check_openapi_schema(None)], ['core.E001'])
+
+                schema.write_artifact()
+                self.assertIsNone(schema.check_artifact())
+
+    def test_listados_documentados(self):
+        # El @extend_schema del listado tiene que ir sobre 'list', no sobre un helper
+        with open(settings.OPENAPI_SCHEMA['PATH']) as f:
+            paths = json.load(f)['paths']
+        for path, summary in (('/api/v1/catalog/autores/', 'Listar autores'), ('/api/v1/catalog/libros/', 'Listar libros')):
+            operation = paths[path]['get']
+            self.assertEqual(operation['summary'], summary)
+            self.assertIn('200', operation['responses'])
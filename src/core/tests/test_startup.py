@@ -0,0 +1,33 @@
+# src/core/tests/test_startup.py
+
+from unittest import skipUnless
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from core import startup
+
+
+class ColdStartTests(SimpleTestCase):
+    """
+    Arranque en frío: cada punto de entrada dentro de su presupuesto de
+    imports (STARTUP_BUDGET) y sin cargar en la web lo que se difiere.
+    """
+
+    @skipUnless(settings.STARTUP_BUDGET['TIMING_TESTS'], "STARTUP_BUDGET_TIMING_TESTS no está activo")
+    def test_presupuesto_de_arranque(self):
+        for entry in startup.ENTRY_POINTS:
+            with self.subTest(entry=entry):
+                # La mejor de dos mediciones, para no depender de la carga de la máquina
+                profile = min((startup.profile_entry_point(entry) for _ in range(2)),
+                              key=lambda profile: profile['total_ms'])
+                self.assertEqual(startup.budget_problems(profile), [])
+
+    def test_la_web_no_carga_celery_ni_el_generador_de_esquemas(self):
+        for entry in ('wsgi', 'asgi'):
+            with self.subTest(entry=entry):
+                profile = startup.profile_entry_point(entry)
+                for name in startup.WEB_DEFERRED_MODULES:
+                    self.assertNotIn(name, profile['modules'])
+                # Sí carga lo que necesita para servir el catálogo
+                self.assertIn('catalog.views', profile['modules'])
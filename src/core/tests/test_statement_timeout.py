@@ -0,0 +1,86 @@
+# src/core/tests/test_statement_timeout.py
+
+from datetime import date
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from catalog import services, tasks
+from catalog.models import Autor
+from catalog.views import LibroViewSet
+from core import statement_timeout
+
+
+def _show_timeout():
+    with connection.cursor() as cursor:
+        cursor.execute('SHOW statement_timeout')
+        return cursor.fetchone()[0]
+
+
+def _sleep(seconds):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_sleep(%s)', [seconds])
+
+
+@mock.patch.object(tasks.warm_list_cache, 'apply_async')
+class StatementTimeoutTests(APITestCase):
+    """
+    Tests del statement_timeout por acción y de las consultas canceladas.
+    """
+
+    def setUp(self):
+        statement_timeout.reset_stats()
+        self.addCleanup(statement_timeout.reset_stats)
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.autor = Autor.objects.create(first_name='Ana', last_name='Autor', birth_date=date(1950, 1, 1))
+
+    def _timeouts(self, **actions):
+        conf = {**settings.STATEMENT_TIMEOUT, 'ACTIONS': {**settings.STATEMENT_TIMEOUT['ACTIONS'], **actions}}
+        return override_settings(STATEMENT_TIMEOUT=conf)
+
+    def test_limite_por_accion(self, _):
+        seen = []
+        get_autor = services.get_autor
+
+        def spy(**kwargs):
+            seen.append(_show_timeout())
+            return get_autor(**kwargs)
+
+        with self._timeouts(retrieve=1234), mock.patch.object(services, 'get_autor', side_effect=spy):
+            response = self.client.get(reverse('autor-detail', args=[self.autor.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(seen, ['1234ms'])
+        # SET LOCAL no sobrevive a la petición
+        self.assertEqual(_show_timeout(), '0')
+
+    def test_busqueda_cancelada_responde_504_y_se_cuenta(self, _):
+        def slow_items(view, request):
+            _sleep(1)
+
+        with self._timeouts(search=50), mock.patch.object(LibroViewSet, 'get_list_items', slow_items):
+            response = self.client.get(reverse('libro-list'), {'search': 'a'})
+
+        self.assertEqual(response.status_code, 504)
+        self.assertEqual(response.data['code'], 'query_timeout')
+        self.assertEqual(statement_timeout.get_stats(), {'libro:search': 1})
+
+    def test_escritura_cancelada_responde_504(self, _):
+        @transaction.atomic
+        def slow_update(**kwargs):
+            _sleep(1)
+
+        conf = {**settings.STATEMENT_TIMEOUT, 'DEFAULT_MS': 50}
+        with override_settings(STATEMENT_TIMEOUT=conf), mock.patch.object(services, 'update_autor', side_effect=slow_update):
+            response = self.client.patch(reverse('autor-detail', args=[self.autor.pk]), {'biography': 'Bio'})
+
+        self.assertEqual(response.status_code, 504)
+        self.assertEqual(statement_timeout.get_stats(), {'autor:partial_update': 1})
@@ -0,0 +1,103 @@
+# src/core/tests/test_tiered_cache.py
+
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from core import tiered_cache
+from core.tiered_cache import LRUCache, TieredCache, _MISSING
+
+
+class LRUCacheTests(SimpleTestCase):
+    """
+    Tests del LRU en memoria (L1).
+    """
+
+    def test_descarta_la_entrada_menos_usada(self):
+        lru = LRUCache(max_entries=2, timeout=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIs(lru.get('b'), _MISSING)
+        self.assertEqual(len(lru), 2)
+
+    def test_expira_por_ttl(self):
+        lru = LRUCache(max_entries=10, timeout=0.01)
+        lru.set('a', 1)
+        time.sleep(0.02)
+        self.assertIs(lru.get('a'), _MISSING)
+
+
+class TieredCacheTests(SimpleTestCase):
+    """
+    Tests del caché en dos niveles y de la invalidación por pub/sub.
+    """
+
+    def setUp(self):
+        self.key = 'test_tiered_cache_key'
+        cache.delete(self.key)
+
+    def _wait_until(self, condition, timeout=2):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if condition():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_segunda_lectura_sale_de_l1(self):
+        """
+        Una lectura de L2 se guarda en L1 y la siguiente no va a Redis.
+        """
+        tiered = TieredCache('test')
+        cache.set(self.key, [1, 2, 3])
+
+        self.assertEqual(tiered.get(self.key), [1, 2, 3])
+        self.assertEqual(tiered._stats['l2_hits'], 1)
+
+        cache.set(self.key, 'cambiado por fuera')
+        self.assertEqual(tiered.get(self.key), [1, 2, 3])
+        self.assertEqual(tiered._stats['l1_hits'], 1)
+
+    def test_invalidacion_llega_a_los_otros_workers(self):
+        """
+        Borrar una clave en un worker la descarta del L1 de los demás.
+        """
+        worker_a, worker_b = TieredCache('test'), TieredCache('test')
+        worker_a.set(self.key, 'valor')
+        self.assertEqual(worker_b.get(self.key), 'valor')
+
+        worker_a.delete(self.key)
+
+        self.assertTrue(self._wait_until(lambda: worker_b.l1.get(self.key) is _MISSING))
+        self.assertIsNone(worker_b.get(self.key))
+
+    def test_invalidacion_por_prefijo(self):
+        worker_a, worker_b = TieredCache('test'), TieredCache('test')
+        worker_a.set(f'{self.key}_1', 1)
+        worker_a.set(f'{self.key}_2', 2)
+        worker_b.get(f'{self.key}_1')
+
+        worker_a.delete_pattern(f'{self.key}_')
+
+        self.assertTrue(self._wait_until(lambda: len(worker_b.l1) == 0))
+        self.assertIsNone(worker_a.get(f'{self.key}_2'))
+
+    @override_settings(TIERED_CACHE={
+        'L1_MAX_ENTRIES': 10, 'L1_TIMEOUT': 60, 'CHANNEL': 'test_tiered_cache', 'STATS_FLUSH_INTERVAL': 0,
+    })
+    def test_metricas_por_nivel(self):
+        tiered_cache.reset_stats()
+        tiered = TieredCache('test_stats')
+        tiered.get(self.key)
+        cache.set(self.key, 1)
+        tiered.get(self.key)
+        tiered.get(self.key)
+
+        stats = tiered_cache.get_stats()['test_stats']
+        self.assertEqual((stats['l1_hits'], stats['l2_hits'], stats['misses']), (1, 1, 1))
+        self.assertEqual(stats['l2_hit_ratio'], 0.5)
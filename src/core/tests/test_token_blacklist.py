@@ -0,0 +1,123 @@
+# src/core/tests/test_token_blacklist.py
+
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core import token_blacklist
+
+
+class BloomFilterTests(TestCase):
+    """
+    Tests para el filtro de Bloom en proceso.
+    """
+
+    def test_sin_falsos_negativos(self):
+        """
+        Todo elemento añadido debe ser reportado como presente.
+        """
+        bloom = token_blacklist.BloomFilter(capacity=1000, error_rate=0.01)
+        items = [uuid.uuid4().hex for _ in range(1000)]
+        for item in items:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in items))
+
+    def test_tasa_de_falsos_positivos_acotada(self):
+        """
+        Con la capacidad respetada, los falsos positivos rondan el error pedido.
+        """
+        bloom = token_blacklist.BloomFilter(capacity=1000, error_rate=0.01)
+        for _ in range(1000):
+            bloom.add(uuid.uuid4().hex)
+        false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class TokenBlacklistTests(APITestCase):
+    """
+    Tests de integración de la rotación de Refresh Tokens con blacklist en Redis.
+    """
+
+    def setUp(self):
+        token_blacklist._redis().delete(token_blacklist.BLACKLIST_LOG_KEY)
+        token_blacklist.reset_filter()
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.refresh_url = reverse('token_refresh')
+
+    def test_refresh_rota_el_token(self):
+        """
+        Un refresh válido devuelve un access y un refresh nuevo.
+        """
+        refresh = RefreshToken.for_user(self.user)
+        response = self.client.post(self.refresh_url, {'refresh': str(refresh)}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('access', response.data)
+        self.assertNotEqual(response.data['refresh'], str(refresh))
+
+    def test_refresh_reutilizado_es_rechazado(self):
+        """
+        Tras la rotación, el Refresh Token anterior queda en la blacklist (401).
+        """
+        refresh = str(RefreshToken.for_user(self.user))
+        first = self.client.post(self.refresh_url, {'refresh': refresh}, format='json')
+        second = self.client.post(self.refresh_url, {'refresh': refresh}, format='json')
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_blacklist_detecta_jti_de_otro_worker(self):
+        """
+        Un jti añadido sin pasar por este proceso (otro worker) se detecta
+        al sincronizar el filtro, y el SET NX impide rotarlo dos veces.
+        """
+        refresh = RefreshToken.for_user(self.user)
+        jti = refresh['jti']
+        token_blacklist.is_blacklisted(jti)  # construye el filtro local
+
+        # Simulo el otro worker: escribe directo en Redis
+        token_blacklist._redis().set(f'{token_blacklist.BLACKLIST_KEY_PREFIX}{jti}', 1, ex=60)
+        token_blacklist._redis().xadd(token_blacklist.BLACKLIST_LOG_KEY, {'jti': jti})
+
+        self.assertFalse(token_blacklist.blacklist(jti, refresh['exp']))
+        token_blacklist.reset_filter()
+        self.assertTrue(token_blacklist.is_blacklisted(jti))
+
+    def test_filtro_se_dimensiona_con_las_entradas_vigentes(self):
+        """
+        Con más jti vigentes que BLOOM_CAPACITY, el filtro reconstruido no
+        nace lleno (no se vuelve a reconstruir en cada sincronización).
+        """
+        jtis = [uuid.uuid4().hex for _ in range(50)]
+        for jti in jtis:
+            token_blacklist._redis().xadd(token_blacklist.BLACKLIST_LOG_KEY, {'jti': jti})
+
+        conf = {**settings.TOKEN_BLACKLIST, 'BLOOM_CAPACITY': 10}
+        with override_settings(TOKEN_BLACKLIST=conf):
+            token_blacklist.is_blacklisted(uuid.uuid4().hex)
+
+        bloom = token_blacklist._bloom
+        self.assertEqual(bloom.capacity, 100)
+        self.assertFalse(bloom.is_full)
+        self.assertTrue(all(jti in bloom for jti in jtis))
+
+    def test_prune_elimina_entradas_expiradas(self):
+        """
+        El job de limpieza borra del log los jti cuyo token ya expiró.
+        """
+        log = token_blacklist.BLACKLIST_LOG_KEY
+        old_id = int((time.time() - 10 * 24 * 3600) * 1000)
+        token_blacklist._redis().xadd(log, {'jti': uuid.uuid4().hex}, id=f'{old_id}-0')
+        new_id = token_blacklist._redis().xadd(log, {'jti': uuid.uuid4().hex})
+
+        self.assertGreaterEqual(token_blacklist.prune(), 1)
+        remaining = [entry_id for entry_id, _ in token_blacklist._redis().xrange(log)]
+        self.assertNotIn(f'{old_id}-0'.encode(), remaining)
+        self.assertIn(new_id, remaining)
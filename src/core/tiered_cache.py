@@ -0,0 +1,270 @@
+# src/core/tiered_cache.py
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY = 'tiered_cache_stats'
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    LRU acotado en memoria del proceso, con TTL por entrada.
+    """
+
+    def __init__(self, max_entries: int, timeout: float):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.timeout)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TieredCache:
+    """
+    Caché de dos niveles: L1 es un LRU en memoria de cada worker y L2 es
+    CACHES['default'] (Redis). Las invalidaciones se publican por Redis
+    pub/sub para que todos los workers descarten su copia en L1.
+
+    Solo para datos de lectura (listados, detalles); contadores, locks o
+    throttling deben seguir usando el caché de Django directamente.
+    """
+
+    def __init__(self, name: str):
+        conf = settings.TIERED_CACHE
+        self.name = name
+        self.channel = f"{conf['CHANNEL']}:{name}"
+        self.l1 = LRUCache(conf['L1_MAX_ENTRIES'], conf['L1_TIMEOUT'])
+        self.stats_flush_interval = conf['STATS_FLUSH_INTERVAL']
+
+        # Cada invalidación incrementa la época: un valor leído de L2 antes
+        # de una invalidación no se guarda en L1 después de ella
+        self._epoch = 0
+        self._stats = {'l1_hits': 0, 'l2_hits': 0, 'misses': 0}
+        self._last_flush = time.monotonic()
+        self._listener_pid = None
+        self._listener_lock = threading.Lock()
+
+    # --- Lectura / escritura ---
+
+    def get(self, key, default=None):
+        self._ensure_listener()
+        value = self.l1.get(key)
+        if value is not _MISSING:
+            self._count('l1_hits')
+            return value
+
+        epoch = self._epoch
+        value = cache.get(key, _MISSING)
+        if value is _MISSING:
+            self._count('misses')
+            return default
+
+        self._count('l2_hits')
+        if epoch == self._epoch:
+            self.l1.set(key, value)
+        return value
+
+    def get_many(self, keys) -> dict:
+        """
+        Como get() para varias claves: lo que falta en L1 se pide a L2 en
+        una sola ida y vuelta. Devuelve solo las claves encontradas.
+        """
+        self._ensure_listener()
+        found, pending = {}, []
+        for key in keys:
+            value = self.l1.get(key)
+            if value is _MISSING:
+                pending.append(key)
+            else:
+                self._count('l1_hits')
+                found[key] = value
+        if not pending:
+            return found
+
+        epoch = self._epoch
+        values = cache.get_many(pending)
+        for key in pending:
+            self._count('l2_hits' if key in values else 'misses')
+        if epoch == self._epoch:
+            for key, value in values.items():
+                self.l1.set(key, value)
+        found.update(values)
+        return found
+
+    def set(self, key, value, timeout=None):
+        self._ensure_listener()
+        cache.set(key, value, timeout=timeout)
+        self.l1.set(key, value)
+
+    def replace(self, key, value, timeout=None):
+        """
+        Como set() para un valor que cambió: los demás workers descartan su
+        copia en L1 (set() solo rellena, no invalida).
+        """
+        self._ensure_listener()
+        cache.set(key, value, timeout=timeout)
+        self._invalidate(f'key:{key}')
+        self.l1.set(key, value)
+
+    def set_many(self, mapping: dict, timeout=None):
+        self._ensure_listener()
+        cache.set_many(mapping, timeout=timeout)
+        for key, value in mapping.items():
+            self.l1.set(key, value)
+
+    # --- Invalidación ---
+
+    def delete(self, key):
+        cache.delete(key)
+        self._invalidate(f'key:{key}')
+
+    def delete_many(self, keys):
+        """
+        Borra varias claves con un solo mensaje de invalidación.
+        """
+        if not keys:
+            return
+        cache.delete_many(keys)
+        self._invalidate('keys:' + '\n'.join(keys))
+
+    def delete_pattern(self, prefix: str):
+        """
+        Borra de ambos niveles todas las claves que empiezan por 'prefix'.
+        """
+        cache.delete_pattern(f'{prefix}*')
+        self._invalidate(f'prefix:{prefix}')
+
+    def _invalidate(self, message: str):
+        self._apply(message)
+        get_redis_connection('default').publish(self.channel, message)
+
+    def _apply(self, message: str):
+        self._epoch += 1
+        kind, _, target = message.partition(':')
+        if kind == 'key':
+            self.l1.delete(target)
+        elif kind == 'keys':
+            for key in target.split('\n'):
+                self.l1.delete(key)
+        else:
+            self.l1.delete_prefix(target)
+
+    # --- Suscripción pub/sub (un hilo por proceso) ---
+
+    def _ensure_listener(self):
+        # Se arranca de forma diferida y se relanza tras un fork (prefork de
+        # gunicorn/celery), porque los hilos no sobreviven al fork
+        if self._listener_pid == os.getpid():
+            return
+        with self._listener_lock:
+            if self._listener_pid == os.getpid():
+                return
+            self.l1.clear()
+            ready = threading.Event()
+            threading.Thread(target=self._listen, args=(ready,), daemon=True,
+                             name=f'tiered-cache-{self.name}').start()
+            ready.wait(timeout=1)
+            self._listener_pid = os.getpid()
+
+    def _listen(self, ready: threading.Event):
+        while True:
+            try:
+                pubsub = get_redis_connection('default').pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                ready.set()
+                for message in pubsub.listen():
+                    self._apply(message['data'].decode())
+            except Exception:
+                # Sin suscripción no sabríamos qué invalidar: vacío L1 y reintento
+                logger.exception("Suscripción de invalidación perdida (%s)", self.channel)
+                self._epoch += 1
+                self.l1.clear()
+                time.sleep(1)
+
+    # --- Métricas ---
+
+    def _count(self, stat: str):
+        self._stats[stat] += 1
+        if time.monotonic() - self._last_flush >= self.stats_flush_interval:
+            self.flush_stats()
+
+    def flush_stats(self):
+        """
+        Suma los contadores del proceso al hash global de Redis.
+        """
+        stats, self._stats = self._stats, {'l1_hits': 0, 'l2_hits': 0, 'misses': 0}
+        self._last_flush = time.monotonic()
+        pipe = get_redis_connection('default').pipeline(transaction=False)
+        for stat, value in stats.items():
+            if value:
+                pipe.hincrby(STATS_KEY, f'{self.name}:{stat}', value)
+        pipe.execute()
+
+
+def get_stats() -> dict:
+    """
+    Devuelve, por caché, los aciertos de cada nivel y su tasa de aciertos
+    (sumando todos los workers). La tasa de L2 es sobre las lecturas que
+    llegaron a L2, es decir, las que fallaron en L1.
+    """
+    raw = get_redis_connection('default').hgetall(STATS_KEY)
+    by_name = {}
+    for field, value in raw.items():
+        name, stat = field.decode().rsplit(':', 1)
+        by_name.setdefault(name, {'l1_hits': 0, 'l2_hits': 0, 'misses': 0})[stat] = int(value)
+
+    for stats in by_name.values():
+        total = sum(stats.values())
+        l2_total = stats['l2_hits'] + stats['misses']
+        stats['l1_hit_ratio'] = stats['l1_hits'] / total if total else 0.0
+        stats['l2_hit_ratio'] = stats['l2_hits'] / l2_total if l2_total else 0.0
+    return by_name
+
+
+def reset_stats():
+    get_redis_connection('default').delete(STATS_KEY)
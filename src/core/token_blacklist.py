@@ -0,0 +1,162 @@
+# src/core/token_blacklist.py
+
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django_redis import get_redis_connection
+from rest_framework_simplejwt.settings import api_settings
+
+# Claves "crudas" de Redis (sin el prefijo de versión del cache de Django)
+BLACKLIST_KEY_PREFIX = 'jwt_blacklist:'
+BLACKLIST_LOG_KEY = 'jwt_blacklist_log'
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom simple sobre un bytearray.
+    Nunca da falsos negativos: si dice que un jti NO está, no está.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(int(capacity), 1)
+        self.num_bits = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.num_hashes = max(int(round(self.num_bits / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.capacity = capacity
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Doble hashing (Kirsch-Mitzenmacher) a partir de un único digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def is_full(self) -> bool:
+        return self.count >= self.capacity
+
+
+# --- Estado en proceso (uno por worker) ---
+
+_lock = threading.Lock()
+_bloom = None
+_last_sync = 0.0
+_last_id = '0'
+
+
+def _conf(name):
+    return settings.TOKEN_BLACKLIST[name]
+
+
+def _redis():
+    return get_redis_connection('default')
+
+
+def _refresh_lifetime() -> float:
+    return api_settings.REFRESH_TOKEN_LIFETIME.total_seconds()
+
+
+def _rebuild_filter(now: float):
+    """
+    Reconstruye el filtro local desde el log (un Redis Stream).
+    Solo carga entradas que aún pueden corresponder a tokens vigentes, y
+    dimensiona el filtro según cuántas son (con margen para las que
+    lleguen): con una capacidad fija, si hay más entradas vigentes que
+    BLOOM_CAPACITY el filtro nacería lleno y se reconstruiría en cada
+    sincronización.
+    """
+    global _bloom, _last_id
+    cutoff_ms = int((now - _refresh_lifetime()) * 1000)
+    entries = _redis().xrange(BLACKLIST_LOG_KEY, min=cutoff_ms, max='+')
+    capacity = max(_conf('BLOOM_CAPACITY'), len(entries) * _conf('BLOOM_HEADROOM'))
+    bloom = BloomFilter(capacity, _conf('BLOOM_ERROR_RATE'))
+    last_id = '0'
+    for entry_id, fields in entries:
+        bloom.add(fields[b'jti'].decode())
+        last_id = entry_id.decode()
+    _bloom, _last_id = bloom, last_id
+
+
+def _sync_filter():
+    """
+    Trae al filtro local los jti añadidos por otros workers.
+    Como mucho una consulta a Redis cada SYNC_INTERVAL segundos, y solo
+    lee las entradas posteriores al último ID visto.
+    """
+    global _last_sync, _last_id
+    now = time.time()
+    if _bloom is not None and now - _last_sync < _conf('SYNC_INTERVAL'):
+        return
+
+    with _lock:
+        if _bloom is not None and now - _last_sync < _conf('SYNC_INTERVAL'):
+            return
+        if _bloom is None or _bloom.is_full:
+            _rebuild_filter(now)
+        else:
+            for entry_id, fields in _redis().xrange(BLACKLIST_LOG_KEY, min=f'({_last_id}', max='+'):
+                _bloom.add(fields[b'jti'].decode())
+                _last_id = entry_id.decode()
+        _last_sync = now
+
+
+def reset_filter():
+    """
+    Descarta el filtro local (se reconstruye en la próxima consulta).
+    """
+    global _bloom, _last_sync, _last_id
+    with _lock:
+        _bloom, _last_sync, _last_id = None, 0.0, '0'
+
+
+def is_blacklisted(jti: str) -> bool:
+    """
+    Indica si un jti está en la blacklist.
+    El filtro de Bloom descarta la mayoría de tokens válidos sin ir a Redis;
+    solo un "quizás" se confirma con un EXISTS.
+    """
+    if _conf('BLOOM_ENABLED'):
+        _sync_filter()
+        if jti not in _bloom:
+            return False
+    return bool(_redis().exists(f'{BLACKLIST_KEY_PREFIX}{jti}'))
+
+
+def blacklist(jti: str, exp: int) -> bool:
+    """
+    Añade un jti a la blacklist hasta que su token expire.
+    Usa SET NX: devuelve False si el jti ya estaba (token reutilizado),
+    por lo que dos rotaciones concurrentes del mismo token no pueden ganar ambas.
+    """
+    ttl = max(int(exp - time.time()), 1)
+
+    pipe = _redis().pipeline(transaction=False)
+    pipe.set(f'{BLACKLIST_KEY_PREFIX}{jti}', 1, ex=ttl, nx=True)
+    pipe.xadd(BLACKLIST_LOG_KEY, {'jti': jti})
+    created, _ = pipe.execute()
+
+    if _conf('BLOOM_ENABLED') and _bloom is not None:
+        _bloom.add(jti)
+    return bool(created)
+
+
+def prune() -> int:
+    """
+    Elimina del log las entradas de tokens que ya expiraron.
+    Las claves individuales expiran solas por su TTL.
+    """
+    cutoff_ms = int((time.time() - _refresh_lifetime()) * 1000)
+    return _redis().xtrim(BLACKLIST_LOG_KEY, minid=cutoff_ms, approximate=False)
@@ -0,0 +1,35 @@
+# src/core/tokens.py
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import token_blacklist
+
+
+class BlacklistRefreshToken(RefreshToken):
+    """
+    Refresh Token con blacklist en Redis (ver core/token_blacklist.py).
+    Reemplaza a la app 'token_blacklist' de simplejwt, que guarda
+    la blacklist en la DB y hace varias consultas por cada refresh.
+    """
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        self.check_blacklist()
+
+    def check_blacklist(self):
+        """
+        Lanza TokenError si el token está en la blacklist.
+        """
+        if token_blacklist.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        """
+        Añade el token a la blacklist. Si ya estaba (otra petición lo rotó
+        primero) lanza TokenError para que no se emitan dos tokens nuevos.
+        """
+        if not token_blacklist.blacklist(self.payload[api_settings.JTI_CLAIM], self.payload['exp']):
+            raise TokenError(_("Token is blacklisted"))
@@ -3,6 +3,12 @@
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from drf_spectacular.utils import extend_schema
+from drf_spectacular.types import OpenApiTypes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+from . import profiling
+from .exceptions import ResourceNotFoundError
+from .helpers import api_success_response
 from .serializers import TokenOutputSerializer
 
 @extend_schema(
@@ -15,4 +21,26 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     """
     Vista de login personalizada para aplicar un Rate Limiting estricto.
     """
-    throttle_scope = 'login_attempt'
\ No newline at end of file
+    throttle_scope = 'login_attempt'
+
+
+class ProfileReportView(APIView):
+    """
+    Informe de una petición perfilada (ver core/profiling.py), solo para
+    administradores.
+    """
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        summary="Informe de perfilado",
+        description=(
+            "Muestras del profiler y SQL (con EXPLAIN) de una petición hecha con la cabecera "
+            "X-Profile por un usuario staff. El ID viene en la cabecera X-Profile-Id de esa respuesta."
+        ),
+        responses=OpenApiTypes.OBJECT,
+    )
+    def get(self, request, report_id):
+        report = profiling.get_report(report_id)
+        if report is None:
+            raise ResourceNotFoundError(detail=f"Informe de perfilado {report_id} no encontrado o expirado.")
+        return api_success_response(data=report)